@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Benchmark TushareClient and tool calls against the local mock Tushare server - no token or network needed
+
+Starts benchmarks/mock_tushare.py in a subprocess, then drives client.query
+and TushareMCPServer.handle_call_tool at each concurrency level and reports
+p50/p99 latency, throughput, peak RSS and bytes serialized. With --baseline,
+exits 1 when p99 or throughput regressed by more than --tolerance.
+--record saves every mock response as fixtures; --replay serves a saved run
+from memory without starting the mock.
+
+Usage: python benchmarks/bench_client.py [--rows 5000] [--latency 20] [--calls 200] [--concurrency 1,8,32] [--json out.json] [--baseline base.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SCENARIOS = ("client", "tool")
+
+
+class Result(NamedTuple):
+    scenario: str
+    concurrency: int
+    calls: int
+    errors: int
+    p50_ms: float
+    p99_ms: float
+    throughput: float    # calls per second
+    peak_rss_mb: float   # process peak so far
+    bytes: int           # serialized tool output (0 for client calls)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of values (q in 0..100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), math.ceil(q / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def peak_rss_mb() -> float:
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def trading_days(count: int, start: str = "20100104") -> List[str]:
+    """Weekdays, the days the mock calendar marks open; one per call keeps requests distinct"""
+    days = []
+    day = datetime.strptime(start, "%Y%m%d")
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day.strftime("%Y%m%d"))
+        day += timedelta(days=1)
+    return days
+
+
+def start_mock(args) -> Tuple[subprocess.Popen, str]:
+    """Run the mock server in its own process so it shares neither the GIL nor the RSS being measured"""
+    command = [
+        sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_tushare.py"),
+        "--rows", str(args.rows), "--latency", str(args.latency), "--jitter", str(args.jitter),
+        "--error-rate", str(args.error_rate), "--http-error-rate", str(args.http_error_rate),
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    url = process.stdout.readline().strip()
+    if not url:
+        process.kill()
+        raise RuntimeError("Mock Tushare server did not start")
+    return process, url
+
+
+def configure(url: str, fixture_mode: str = "", fixture_path: str = ""):
+    """Point the shared settings at the mock and switch off everything that would hide upstream calls"""
+    from tushare_mcp_server.config import settings
+    settings.tushare_api_url = url
+    settings.fixture_mode = fixture_mode
+    settings.fixture_path = fixture_path
+    settings.tushare_token = "benchmark"
+    settings.tushare_tokens = {}
+    settings.cache_enabled = False
+    settings.rate_limit_enabled = False
+    settings.warehouse_enabled = False
+    settings.retry_base_delay = 0.01
+    settings.retry_max_delay = 0.1
+    # Injected errors are expected; retry and error logs would drown the report
+    logging.getLogger("tushare_mcp_server").setLevel(logging.CRITICAL)
+
+
+async def run_scenario(scenario: str, concurrency: int, calls: int, fmt: str = "json") -> Result:
+    from tushare_mcp_server.mcp_server import TushareMCPServer
+    server = TushareMCPServer()
+    client = server.client
+    # Warm up: calendar load and connection setup are not part of the measurement
+    await client.get_calendar()
+    await client.query("daily", {"trade_date": "20100104"})
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+    serialized = 0
+
+    async def one(trade_date: str):
+        nonlocal errors, serialized
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                if scenario == "client":
+                    await client.query("daily", {"trade_date": trade_date})
+                else:
+                    result = await server.handle_call_tool("daily", {"trade_date": trade_date, "format": fmt})
+                    text = result[0].text
+                    if text.startswith("Error"):
+                        errors += 1
+                    serialized += len(text.encode("utf-8"))
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(day) for day in trading_days(calls, "20100105")))
+    elapsed = time.perf_counter() - started
+    await server.close()
+    return Result(
+        scenario, concurrency, calls, errors,
+        round(percentile(latencies, 50), 2), round(percentile(latencies, 99), 2),
+        round(calls / elapsed, 1), round(peak_rss_mb(), 1), serialized,
+    )
+
+
+def regressions(results: List[Result], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """Scenarios whose p99 grew or throughput shrank by more than tolerance against the baseline"""
+    previous = {(row["scenario"], row["concurrency"]): row for row in baseline}
+    found = []
+    for result in results:
+        base = previous.get((result.scenario, result.concurrency))
+        if base is None:
+            continue
+        label = f"{result.scenario} x{result.concurrency}"
+        if result.p99_ms > base["p99_ms"] * (1 + tolerance):
+            found.append(f"{label}: p99 {base['p99_ms']}ms -> {result.p99_ms}ms")
+        if result.throughput < base["throughput"] * (1 - tolerance):
+            found.append(f"{label}: throughput {base['throughput']}/s -> {result.throughput}/s")
+    return found
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000, help="rows per mock response")
+    parser.add_argument("--latency", type=float, default=20.0, help="mean mock latency in ms")
+    parser.add_argument("--jitter", type=float, default=5.0, help="mock latency standard deviation in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of Tushare -2002 errors")
+    parser.add_argument("--http-error-rate", type=float, default=0.0, help="share of HTTP 503 responses")
+    parser.add_argument("--calls", type=int, default=200, help="calls per scenario and concurrency level")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated concurrency levels")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="client, tool or both")
+    parser.add_argument("--format", default="json", help="output format of tool calls")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="results file of a previous run to compare against")
+    parser.add_argument("--record", metavar="DIR", help="record mock responses as fixtures in DIR")
+    parser.add_argument("--replay", metavar="DIR", help="replay fixtures from DIR instead of starting the mock")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression (default 0.2)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.replay:
+        process, url = None, ""
+        configure(url, "replay", args.replay)
+    else:
+        process, url = start_mock(args)
+        configure(url, "record" if args.record else "", args.record or "")
+    try:
+        results = []
+        for scenario in [s.strip() for s in args.scenarios.split(",") if s.strip()]:
+            if scenario not in SCENARIOS:
+                raise ValueError(f"Unknown scenario: {scenario} (expected {', '.join(SCENARIOS)})")
+            for concurrency in [int(c) for c in args.concurrency.split(",")]:
+                results.append(asyncio.run(run_scenario(scenario, concurrency, args.calls, args.format)))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    if args.replay:
+        print(f"📊 Client benchmark: replaying {args.replay}")
+    else:
+        print(f"📊 Client benchmark: {args.rows} rows, {args.latency}ms mock latency, {args.error_rate + args.http_error_rate:.0%} errors")
+    print("=" * 86)
+    print(f"{'scenario':<9} {'conc':>5} {'calls':>6} {'errors':>7} {'p50 ms':>9} {'p99 ms':>9} {'calls/s':>9} {'RSS MB':>8} {'bytes':>14}")
+    for r in results:
+        print(
+            f"{r.scenario:<9} {r.concurrency:>5} {r.calls:>6} {r.errors:>7} {r.p50_ms:>9.2f} {r.p99_ms:>9.2f} "
+            f"{r.throughput:>9.1f} {r.peak_rss_mb:>8.1f} {r.bytes:>14,}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump([r._asdict() for r in results], f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        for line in found:
+            print(f"❌ Regression: {line}")
+        if found:
+            return 1
+        print(f"✅ Within {args.tolerance:.0%} of {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark tool result serialization - bytes and milliseconds per output format
+
+Usage: python benchmarks/bench_serialization.py [rows]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tushare_mcp_server.serialization import OUTPUT_FORMATS, orjson, serialize
+
+DAILY_FIELDS = ["ts_code", "trade_date", "open", "high", "low", "close", "pre_close", "change", "pct_chg", "vol", "amount"]
+
+def make_daily_payload(rows: int, codes: int = 20, seed: int = 42) -> dict:
+    """Synthetic daily bars shaped like the Tushare daily endpoint"""
+    rng = random.Random(seed)
+    items = []
+    per_code = max(1, rows // codes)
+    for c in range(codes):
+        ts_code = f"{c + 1:06d}.SZ"
+        close = rng.uniform(5, 50)
+        for d in range(per_code):
+            pre_close = close
+            close = round(pre_close * (1 + rng.gauss(0, 0.02)), 2)
+            high = round(max(pre_close, close) * (1 + rng.random() * 0.01), 2)
+            low = round(min(pre_close, close) * (1 - rng.random() * 0.01), 2)
+            change = round(close - pre_close, 2)
+            vol = round(rng.uniform(1e4, 2e6), 2)
+            items.append([
+                ts_code, f"{20240101 + d}", round(pre_close, 2), high, low, close, round(pre_close, 2),
+                change, round(change / pre_close * 100, 4), vol, round(vol * close / 10, 3),
+            ])
+    return {"fields": DAILY_FIELDS, "items": items[:rows], "has_more": False}
+
+def bench(data: dict, fmt: str, backend: str, repeat: int = 10):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = serialize(data, fmt, backend)
+        best = min(best, time.perf_counter() - start)
+    return len(text.encode("utf-8")), best * 1000
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 6000
+    data = make_daily_payload(rows)
+    backends = ["json"] + (["orjson"] if orjson is not None else [])
+
+    print(f"📊 Serialization benchmark: {len(data['items'])} daily rows")
+    print("=" * 60)
+    print(f"{'format':<12} {'backend':<8} {'bytes':>12} {'ms':>10}")
+    for fmt in OUTPUT_FORMATS:
+        for backend in backends:
+            if fmt in ("csv", "tsv") and backend != "json":
+                continue
+            size, ms = bench(data, fmt, backend)
+            label = backend if fmt not in ("csv", "tsv") else "-"
+            print(f"{fmt:<12} {label:<8} {size:>12,} {ms:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for api.tushare.pro serving synthetic fields/items payloads
+
+Every endpoint answers with daily-shaped bars of a fixed size, except
+trade_cal, which returns a weekday calendar for the requested range. Latency,
+Tushare error responses (code -2002) and HTTP 503s are injected at the
+configured rates, so client retries and breakers can be exercised offline.
+
+Usage: python benchmarks/mock_tushare.py [--port 0] [--rows 5000] [--latency 20] [--error-rate 0.01]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, NamedTuple, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_serialization import make_daily_payload
+
+
+class MockConfig(NamedTuple):
+    rows: int = 5000               # rows per response
+    latency_ms: float = 20.0       # mean server-side delay per request
+    jitter_ms: float = 5.0         # standard deviation of the delay
+    error_rate: float = 0.0        # share of requests answered with Tushare code -2002
+    http_error_rate: float = 0.0   # share of requests answered with HTTP 503
+    seed: int = 42
+
+
+def _calendar(params: Dict[str, Any]) -> Dict[str, Any]:
+    start = datetime.strptime(params.get("start_date") or "19901219", "%Y%m%d")
+    end = datetime.strptime(params.get("end_date") or f"{datetime.now().year}1231", "%Y%m%d")
+    items = []
+    day = start
+    while day <= end:
+        items.append([params.get("exchange") or "SSE", day.strftime("%Y%m%d"), 1 if day.weekday() < 5 else 0])
+        day += timedelta(days=1)
+    return {"fields": ["exchange", "cal_date", "is_open"], "items": items, "has_more": False}
+
+
+class MockTushare:
+    """Threaded HTTP server answering Tushare-style POST requests"""
+
+    def __init__(self, config: MockConfig = MockConfig(), host: str = "127.0.0.1", port: int = 0):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        # Bars are encoded once; the server should never be the bottleneck being measured
+        self.body = json.dumps(
+            {"code": 0, "msg": "", "data": make_daily_payload(config.rows, seed=config.seed)}, ensure_ascii=False
+        ).encode("utf-8")
+        self.requests = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; without TCP_NODELAY, Nagle plus
+            # delayed ACK stalls every response by ~40ms and the benchmark measures that
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                status, body = mock.respond(request)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def respond(self, request: Dict[str, Any]):
+        """Status and body for one decoded request"""
+        config = self.config
+        delay = max(0.0, self.rng.gauss(config.latency_ms, config.jitter_ms)) / 1000
+        roll = self.rng.random()
+        if delay:
+            time.sleep(delay)
+
+        failed = roll < config.http_error_rate + config.error_rate
+        if roll < config.http_error_rate:
+            status, body = 503, b'{"code": -1, "msg": "Service Unavailable"}'
+        elif failed:
+            status, body = 200, json.dumps({"code": -2002, "msg": "系统内部错误"}, ensure_ascii=False).encode("utf-8")
+        elif request.get("api_name") == "trade_cal":
+            status, body = 200, json.dumps({"code": 0, "msg": "", "data": _calendar(request.get("params") or {})}).encode("utf-8")
+        else:
+            status, body = 200, self.body
+        with self._lock:
+            self.requests += 1
+            self.errors += failed
+            self.bytes_sent += len(body)
+        return status, body
+
+    def start(self) -> "MockTushare":
+        """Serve from a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"requests": self.requests, "errors": self.errors, "bytes_sent": self.bytes_sent}
+
+
+def parse_args(argv=None):
+    defaults = MockConfig()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="0 picks a free port")
+    parser.add_argument("--rows", type=int, default=defaults.rows)
+    parser.add_argument("--latency", type=float, default=defaults.latency_ms, help="mean delay in ms")
+    parser.add_argument("--jitter", type=float, default=defaults.jitter_ms, help="delay standard deviation in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of Tushare -2002 errors")
+    parser.add_argument("--http-error-rate", type=float, default=0.0, help="share of HTTP 503 responses")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    return parser.parse_args(argv)
+
+
+def config_from_args(args) -> MockConfig:
+    return MockConfig(args.rows, args.latency, args.jitter, args.error_rate, args.http_error_rate, args.seed)
+
+
+def main():
+    args = parse_args()
+    mock = MockTushare(config_from_args(args), args.host, args.port)
+    # The first line is read by bench_client.py to find the port
+    print(mock.url, flush=True)
+    try:
+        mock.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -17,14 +17,17 @@ async def simple_demo():
     
     # Check if token is configured
     token = os.environ.get("TUSHARE_TOKEN", "")
-    if not token:
+    if not token and settings.fixture_mode != "replay":
         print("⚠️  TUSHARE_TOKEN not set. Showing demo without API calls.")
         print("To run full demo, set: export TUSHARE_TOKEN='your_token'")
         print("\n📋 What you can do with this server:")
         show_examples()
         return
     
-    print(f"✅ Using Tushare token: {token[:10]}...")
+    if token:
+        print(f"✅ Using Tushare token: {token[:10]}...")
+    else:
+        print(f"✅ Replaying recorded responses from {settings.fixture_path}")
     
     try:
         # Initialize client
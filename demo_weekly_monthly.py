@@ -6,13 +6,14 @@ Shows how to use the new weekly and monthly endpoints
 import os
 import asyncio
 from tushare_mcp_server.tushare_client import TushareClient
+from tushare_mcp_server.config import settings
 
 async def demo_weekly_monthly():
     """Demonstrate weekly and monthly stock data APIs"""
     
     # Get token from environment variable
     token = os.getenv('TUSHARE_TOKEN')
-    if not token:
+    if not token and settings.fixture_mode != "replay":
         print("❌ Error: TUSHARE_TOKEN environment variable not set!")
         print("   Please set your Tushare API token:")
         print("   export TUSHARE_TOKEN='your_tushare_api_token_here'")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for qfq/hfq price adjustment - runs offline against stubbed daily and adj_factor data
+"""
+import asyncio
+import json
+import sys
+from tests_support import offline_server
+from tushare_mcp_server import adjust
+from tushare_mcp_server.models import TushareResponse
+
+DAILY_FIELDS = ["ts_code", "trade_date", "open", "high", "low", "close", "pre_close", "change", "pct_chg", "vol"]
+
+# A 2-for-1 split on 20240104 halves the traded price and doubles the factor
+DAILY = [
+    ["000001.SZ", "20240105", 10.2, 10.4, 10.0, 10.3, 10.1, 0.2, 1.98, 2000.0],
+    ["000001.SZ", "20240104", 10.0, 10.2, 9.9, 10.1, 10.0, 0.1, 1.0, 2000.0],
+    ["000001.SZ", "20240103", 20.0, 20.2, 19.8, 20.0, 19.9, 0.1, 0.5, 1000.0],
+    ["000001.SZ", "20240102", 19.8, 20.0, 19.6, 19.9, 19.7, 0.2, 1.02, 1000.0],
+    ["600000.SH", "20240102", 7.0, 7.1, 6.9, 7.0, 7.0, 0.0, 0.0, 500.0],
+]
+FACTORS = {
+    "000001.SZ": [("20240102", 1.0), ("20240103", 1.0), ("20240104", 2.0), ("20240105", 2.0)],
+    "600000.SH": [],
+}
+
+def make_server():
+    calls = []
+
+    async def fake_query(name, params, fields=None):
+        calls.append((name, dict(params), fields))
+        if name == "daily":
+            return TushareResponse(code=0, data={"fields": DAILY_FIELDS, "items": [list(row) for row in DAILY]})
+        if name == "adj_factor":
+            rows = [
+                [params["ts_code"], date, factor] for date, factor in FACTORS[params["ts_code"]]
+                if params["start_date"] <= date <= params["end_date"]
+            ]
+            return TushareResponse(code=0, data={"fields": ["ts_code", "trade_date", "adj_factor"], "items": rows[::-1]})
+        raise AssertionError(name)
+
+    return offline_server(fake_query), calls
+
+def call(server, **arguments):
+    result = asyncio.run(server.handle_call_tool("daily", arguments))
+    return json.loads(result[0].text)
+
+def closes(payload, ts_code="000001.SZ"):
+    fields = payload["fields"]
+    rows = [dict(zip(fields, row)) for row in payload["items"]]
+    return [row["close"] for row in rows if row["ts_code"] == ts_code]
+
+def test_qfq_and_hfq():
+    """hfq scales by each bar's factor; qfq divides by the factor in force on end_date"""
+    print("Testing qfq/hfq...")
+    server, _ = make_server()
+    assert closes(call(server)) == [10.3, 10.1, 20.0, 19.9]
+    assert closes(call(server, adj="hfq")) == [20.6, 20.2, 20.0, 19.9]
+    assert closes(call(server, adj="qfq")) == [10.3, 10.1, 10.0, 9.95]
+    assert closes(call(server, adj="qfq", end_date="20240103")) == [20.6, 20.2, 20.0, 19.9]
+
+    rows = call(server, adj="qfq")
+    first = dict(zip(rows["fields"], rows["items"][2]))
+    assert first["change"] == round(first["close"] - first["pre_close"], 2)
+    assert first["vol"] == 1000.0 and first["pct_chg"] == 0.5
+
+    # A code without factors is returned as traded
+    assert closes(call(server, adj="qfq"), "600000.SH") == [7.0]
+    print("✅ Adjusted closes match pro_bar's arithmetic")
+
+def test_factor_cache():
+    """Factors are fetched once per code, then only from the last known date"""
+    print("\nTesting adj_factor cache...")
+    server, calls = make_server()
+    payload = call(server, adj="hfq", fields="trade_date,close")
+    assert payload["fields"] == ["trade_date", "close"]
+    assert [name for name, _, _ in calls] == ["daily", "adj_factor", "adj_factor"]
+    assert "ts_code" in calls[0][2] and "trade_date" in calls[0][2]
+
+    for _ in range(3):
+        call(server, adj="qfq")
+    assert sum(name == "adj_factor" for name, _, _ in calls) == 2
+    assert server.adjuster.stats() == {"codes": 2, "fetches": 2}
+
+    # A request past the last known factor refetches from that date once the TTL has passed
+    original = adjust.REFRESH_TTL
+    adjust.REFRESH_TTL = 0
+    try:
+        call(server, adj="qfq", end_date="20240108")
+    finally:
+        adjust.REFRESH_TTL = original
+    refetch = [params for name, params, _ in calls[-3:] if name == "adj_factor" and params["ts_code"] == "000001.SZ"]
+    assert refetch and refetch[0]["start_date"] == "20240105"
+    print(f"✅ {server.adjuster.stats()['fetches']} adj_factor fetches for {len(calls)} calls")
+
+def test_errors():
+    print("\nTesting errors...")
+    server, _ = make_server()
+    result = asyncio.run(server.handle_call_tool("daily", {"adj": "none"}))
+    assert result[0].text.startswith("Error: Unknown adj: none")
+    from tushare_mcp_server.mcp_server import TOOLS
+    schema = {tool.name: tool.inputSchema for tool in TOOLS}
+    assert "adj" in schema["weekly"]["properties"] and "adj" not in schema["adj_factor"]["properties"]
+    print("✅ Invalid adj rejected, adj only offered on bar endpoints")
+
+def main():
+    test_qfq_and_hfq()
+    test_factor_cache()
+    test_errors()
+    print("\n🎉 Adjustment tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
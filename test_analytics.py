@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test script for server-side analytics tools - runs offline against stubbed data
+"""
+import asyncio
+import json
+import math
+import statistics
+import sys
+import numpy as np
+from tests_support import offline_server
+from tushare_mcp_server.analytics import correlation_matrix, rolling_mean, rolling_std, run_analytics
+from tushare_mcp_server.models import TushareResponse
+
+DATES = [f"202401{d:02d}" for d in range(2, 32)][:20]
+RETURNS = {
+    "000001.SZ": [1.0, -2.0, 3.0, -1.0, 0.5, -4.0, 2.0, 1.0, -0.5, 0.0, 1.5, -1.0, 2.0, 0.5, -0.5, 1.0, 3.0, -2.0, 0.0, 1.0],
+    "600519.SH": [0.5, -1.0, 1.5, -0.5, 0.25, -2.0, 1.0, 0.5, -0.25, 0.0, 0.75, -0.5, 1.0, 0.25, -0.25, 0.5, 1.5, -1.0, 0.0, 0.5],
+    "000300.SH": [0.8, -1.2, 1.0, -0.2, 0.3, -2.5, 1.1, 0.4, -0.3, 0.1, 0.9, -0.6, 1.2, 0.2, -0.4, 0.6, 1.8, -1.1, 0.2, 0.4],
+}
+
+def bars(code):
+    rows, close = [], 10.0
+    for day, pct in zip(DATES, RETURNS[code]):
+        close = close * (1 + pct / 100)
+        rows.append([code, day, close, pct])
+    return rows[::-1]
+
+async def fake_fetch(name, params, fields):
+    codes = params["ts_code"].split(",")
+    items = [row for code in codes if code in RETURNS for row in bars(code)]
+    # 600519.SH is suspended on one day
+    items = [row for row in items if not (row[0] == "600519.SH" and row[1] == DATES[5])]
+    return TushareResponse(code=0, data={"fields": fields.split(","), "items": items})
+
+def by_code(data):
+    return {row[0]: dict(zip(data["fields"], row)) for row in data["items"]}
+
+def test_rolling_helpers():
+    """Cumulative-sum rolling windows match a direct computation and respect gaps"""
+    print("Testing rolling helpers...")
+    values = np.array([1.0, 2.0, 4.0, 8.0, np.nan, 3.0, 5.0, 7.0])
+    mean = rolling_mean(values, 3)
+    assert np.isnan(mean[:2]).all() and mean[2] == (1 + 2 + 4) / 3
+    assert np.isnan(mean[4:7]).all() and mean[7] == 5.0
+    std = rolling_std(values, 3)
+    assert math.isclose(std[3], statistics.stdev([2.0, 4.0, 8.0]))
+    print("✅ Rolling mean/std")
+
+def test_correlation_matrix():
+    """Pairwise-complete correlation equals np.corrcoef on fully observed columns"""
+    print("\nTesting correlation matrix...")
+    rng = np.random.default_rng(7)
+    x = rng.normal(size=(200, 4))
+    x[:, 1] += x[:, 0]
+    assert np.allclose(correlation_matrix(x), np.corrcoef(x, rowvar=False))
+    x[5, 2] = np.nan
+    mask = ~np.isnan(x[:, 2])
+    assert math.isclose(correlation_matrix(x)[0, 2], np.corrcoef(x[mask, 0], x[mask, 2])[0, 1])
+    print("✅ Correlation matrix")
+
+def test_tools():
+    """returns, drawdown, beta, correlation and rolling_stats over fetched bars"""
+    print("\nTesting analytics tools...")
+    codes = "000001.SZ,600519.SH"
+
+    returns = by_code(asyncio.run(run_analytics("returns", {"ts_code": codes}, fake_fetch)))
+    expected = math.prod(1 + r / 100 for r in RETURNS["000001.SZ"]) - 1
+    assert math.isclose(returns["000001.SZ"]["total_return"], expected, abs_tol=1e-6)
+    assert returns["000001.SZ"]["days"] == 20 and returns["600519.SH"]["days"] == 19
+    assert returns["000001.SZ"]["start_date"] == DATES[0]
+
+    drawdown = by_code(asyncio.run(run_analytics("drawdown", {"ts_code": codes}, fake_fetch)))
+    wealth = np.cumprod([1 + r / 100 for r in RETURNS["000001.SZ"]])
+    expected = (wealth / np.maximum.accumulate(np.maximum(wealth, 1.0)) - 1).min()
+    assert math.isclose(drawdown["000001.SZ"]["max_drawdown"], expected, abs_tol=1e-6)
+    assert drawdown["000001.SZ"]["trough_date"] == DATES[5]
+    assert drawdown["000001.SZ"]["peak_date"] == DATES[2]
+
+    beta = by_code(asyncio.run(run_analytics("beta", {"ts_code": codes, "index_code": "000300.SH"}, fake_fetch)))
+    x = np.array(RETURNS["000300.SH"]) / 100
+    y = np.array(RETURNS["000001.SZ"]) / 100
+    assert math.isclose(beta["000001.SZ"]["beta"], np.cov(x, y)[0, 1] / x.var(ddof=1), abs_tol=1e-4)
+    assert beta["600519.SH"]["observations"] == 19
+
+    corr = asyncio.run(run_analytics("correlation", {"ts_code": codes}, fake_fetch))
+    assert corr["fields"] == ["ts_code", "000001.SZ", "600519.SH"]
+    assert corr["items"][0][1] == 1.0 and math.isclose(corr["items"][0][2], 1.0, abs_tol=1e-4)
+
+    rolling = asyncio.run(run_analytics("rolling_stats", {"ts_code": "000001.SZ", "window": 5}, fake_fetch))
+    assert rolling["items"][0][1] == DATES[-1]
+    assert rolling["items"][-1][4] is None
+    print("✅ Analytics tools")
+
+def test_handle_call_tool():
+    """Analytics tools run through the MCP handler with query arguments"""
+    print("\nTesting handle_call_tool...")
+    async def fake_query(name, params, fields=None):
+        return await fake_fetch(name, params, fields)
+
+    server = offline_server(fake_query)
+    result = asyncio.run(server.handle_call_tool("returns", {"ts_code": "000001.SZ,600519.SH", "fields": "ts_code,total_return", "sort": "total_return desc"}))
+    payload = json.loads(result[0].text)
+    assert payload["fields"] == ["ts_code", "total_return"] and len(payload["items"]) == 2
+    error = asyncio.run(server.handle_call_tool("correlation", {"ts_code": "000001.SZ"}))
+    assert error[0].text == "Error: correlation requires at least two codes"
+    print("✅ Tool handler")
+
+def main():
+    test_rolling_helpers()
+    test_correlation_matrix()
+    test_tools()
+    test_handle_call_tool()
+    print("\n🎉 Analytics tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test script for the batch tool - runs offline against stubbed client methods
+"""
+import asyncio
+import json
+import sys
+import time
+from tests_support import offline_server
+from tushare_mcp_server.models import TushareResponse
+
+DAILY = {"fields": ["ts_code", "trade_date", "close"], "items": [["000001.SZ", "20240105", 9.27], ["000001.SZ", "20240104", 9.29]]}
+BASIC = {"fields": ["ts_code", "name"], "items": [["000001.SZ", "平安银行"]]}
+
+def make_server(delay=0.1):
+    async def fake_query(name, params, fields=None):
+        await asyncio.sleep(delay)
+        if name == "index_weight":
+            raise Exception("Tushare API error: 抱歉，您没有访问该接口的权限")
+        return TushareResponse(code=0, data={"daily": DAILY, "stock_basic": BASIC}[name])
+
+    return offline_server(fake_query)
+
+def test_batch_runs_concurrently():
+    """Sub-calls overlap, and failures are reported per call"""
+    print("Testing batch execution...")
+    server = make_server()
+    started = time.perf_counter()
+    result = asyncio.run(server.handle_call_tool("batch", {"calls": [
+        {"tool": "stock_basic", "arguments": {"ts_code": "000001.SZ"}},
+        {"tool": "daily", "arguments": {"ts_code": "000001.SZ", "limit": 1, "format": "columns"}, "id": "prices"},
+        {"tool": "index_weight", "arguments": {"index_code": "399300.SZ"}},
+        {"tool": "nope"},
+    ]}))
+    elapsed = time.perf_counter() - started
+    payload = json.loads(result[0].text)
+
+    assert elapsed < 0.3, f"calls ran sequentially ({elapsed:.2f}s)"
+    assert payload["succeeded"] == 2 and payload["failed"] == 2
+    first, second, third, fourth = payload["results"]
+    assert first == {"id": 0, "tool": "stock_basic", "data": BASIC}
+    assert second["id"] == "prices" and second["data"]["columns"]["close"] == [9.27]
+    assert "没有访问该接口的权限" in third["error"]
+    assert fourth["error"] == "Unknown tool: nope"
+    print(f"✅ 4 calls in {elapsed:.2f}s")
+
+def test_batch_validation():
+    """Empty, oversized and nested batches are rejected"""
+    print("\nTesting batch validation...")
+    server = make_server(delay=0)
+    empty = asyncio.run(server.handle_call_tool("batch", {"calls": []}))
+    assert empty[0].text.startswith("Error: batch requires")
+    too_many = asyncio.run(server.handle_call_tool("batch", {"calls": [{"tool": "daily"}] * 51}))
+    assert "at most 50" in too_many[0].text
+    nested = json.loads(asyncio.run(server.handle_call_tool("batch", {"calls": [{"tool": "batch"}]}))[0].text)
+    assert nested["results"][0]["error"] == "batch calls cannot be nested"
+    print("✅ Invalid batches rejected")
+
+def main():
+    test_batch_runs_concurrently()
+    test_batch_validation()
+    print("\n🎉 Batch tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
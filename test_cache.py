@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script for the on-disk response cache - runs offline without an API token
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+from tushare_mcp_server.cache import ResponseCache, make_cache_key, today_cst
+
+SAMPLE = {
+    "code": 0,
+    "msg": "",
+    "data": {
+        "fields": ["ts_code", "trade_date", "close"],
+        "items": [["000001.SZ", "20240105", 9.27], ["000001.SZ", "20240104", 9.29]],
+    },
+}
+
+def _new_cache(**kwargs) -> ResponseCache:
+    path = os.path.join(tempfile.mkdtemp(), "cache.sqlite3")
+    return ResponseCache(path, **kwargs)
+
+def test_cache_key_normalization():
+    """Equivalent requests share a key"""
+    print("Testing cache key normalization...")
+    a = make_cache_key("daily", {"ts_code": "000001.SZ", "start_date": "20240101", "end_date": None})
+    b = make_cache_key("daily", {"start_date": "20240101", "ts_code": " 000001.SZ "})
+    c = make_cache_key("daily", {"ts_code": "000001.SZ", "start_date": "20240101"}, "ts_code,close")
+    assert a == b
+    assert a != c
+    print("✅ Cache keys normalized")
+
+def test_ttl_policies():
+    """Closed historical dates are immutable, today is short-lived"""
+    print("\nTesting TTL policies...")
+    cache = _new_cache(ttl_today=60, ttl_reference=3600)
+    assert cache.ttl_for("daily", {"start_date": "20240101", "end_date": "20240131"}) is None
+    assert cache.ttl_for("index_weight", {"trade_date": "20240105"}) is None
+    assert cache.ttl_for("daily", {"trade_date": today_cst()}) == 60
+    assert cache.ttl_for("daily", {"ts_code": "000001.SZ"}) == 60
+    assert cache.ttl_for("stock_basic", {}) == 3600
+    assert cache.ttl_for("unknown_api", {}) == 0
+    # An empty answer for a closed date may just be data that is not published yet
+    empty = {"code": 0, "msg": "", "data": {"fields": ["ts_code"], "items": []}}
+    assert cache.ttl_for("daily", {"trade_date": "20240105"}, empty) == 60
+    assert cache.ttl_for("daily", {"trade_date": "20240105"}, SAMPLE) is None
+    assert cache.ttl_for("stock_basic", {}, {"code": 0, "msg": "", "data": None}) == 60
+    print("✅ TTL policies applied")
+
+def test_hit_miss_and_invalidate():
+    """Round trip through the cache with counters and invalidation"""
+    print("\nTesting hit/miss counters and invalidation...")
+    cache = _new_cache()
+    params = {"ts_code": "000001.SZ", "start_date": "20240101", "end_date": "20240105"}
+
+    async def run():
+        assert await cache.get("daily", params) is None
+        await cache.set("daily", params, None, SAMPLE)
+        assert await cache.get("daily", params) == SAMPLE
+        assert cache.invalidate("daily") == 1
+        assert await cache.get("daily", params) is None
+
+    asyncio.run(run())
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    cache.close()
+    print(f"✅ Cache stats: {stats}")
+
+def test_size_bounded_eviction():
+    """Least recently used entries are evicted once max_bytes is exceeded"""
+    print("\nTesting size-bounded eviction...")
+    cache = _new_cache(max_bytes=400)
+
+    async def run():
+        for day in range(1, 20):
+            params = {"trade_date": f"202401{day:02d}"}
+            await cache.set("daily", params, None, SAMPLE)
+
+    asyncio.run(run())
+    stats = cache.stats()
+    assert stats["bytes"] <= 400
+    assert stats["evictions"] > 0
+    cache.close()
+    print(f"✅ Evicted {stats['evictions']} entries, {stats['bytes']} bytes kept")
+
+def test_clear_command():
+    """python -m tushare_mcp_server.cache clear drops one endpoint or everything"""
+    print("\nTesting the clear command...")
+    cache = _new_cache()
+
+    async def fill():
+        for api_name in ("daily", "weekly"):
+            await cache.set(api_name, {"trade_date": "20240105"}, None, SAMPLE)
+
+    asyncio.run(fill())
+    cache.close()
+    env = dict(os.environ, CACHE_PATH=cache.path)
+
+    def run(*args):
+        return subprocess.run([sys.executable, "-m", "tushare_mcp_server.cache", *args], env=env, capture_output=True, text=True, check=True).stdout
+
+    assert "daily: 1 entries removed" in run("clear", "--api", "daily")
+    assert cache.stats()["entries"] == 1
+    assert "1 entries removed" in run("clear")
+    assert cache.stats()["entries"] == 0
+    cache.close()
+    print("✅ Cleared by endpoint and in full")
+
+def main():
+    test_cache_key_normalization()
+    test_ttl_policies()
+    test_hit_miss_and_invalidate()
+    test_size_bounded_eviction()
+    test_clear_command()
+    print("\n🎉 Cache tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
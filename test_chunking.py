@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for date-range chunking and response merging - runs offline
+"""
+import asyncio
+import sys
+from tushare_mcp_server.chunking import is_weekday, iter_dates, plan_chunks, merge_responses, split_range
+from tushare_mcp_server.models import TushareResponse
+from tushare_mcp_server.transports import Transport
+from tushare_mcp_server.tushare_client import TushareClient
+
+def test_small_request_unchanged():
+    """Requests under the row cap are sent as-is"""
+    print("Testing small requests...")
+    params = {"ts_code": "000001.SZ", "start_date": "20240101", "end_date": "20240131"}
+    assert plan_chunks("daily", params) == [params]
+    assert plan_chunks("daily", {"trade_date": "20240105"}) == [{"trade_date": "20240105"}]
+    assert plan_chunks("stock_basic", {}) == [{}]
+    print("✅ Small requests are not split")
+
+def test_long_history_split_into_windows():
+    """A 30-year single-code pull is split into date windows"""
+    print("\nTesting date windows...")
+    params = {"ts_code": "000001.SZ", "start_date": "19910101", "end_date": "20201231"}
+    chunks = plan_chunks("daily", params)
+    assert len(chunks) == 2
+    assert chunks[0]["start_date"] == "19910101"
+    assert chunks[-1]["end_date"] <= "20201231"
+    assert chunks[0]["end_date"] < chunks[1]["start_date"]
+    print(f"✅ Split into {len(chunks)} windows: {[(c['start_date'], c['end_date']) for c in chunks]}")
+
+def test_code_batches():
+    """Baskets of codes are batched to fit the row cap"""
+    print("\nTesting code batches...")
+    codes = ",".join(f"{i:06d}.SZ" for i in range(1, 21))
+    chunks = plan_chunks("daily", {"ts_code": codes, "start_date": "20200101", "end_date": "20231231"})
+    assert all(len(c["ts_code"].split(",")) * 1044 <= 6000 for c in chunks)
+    assert sum(len(c["ts_code"].split(",")) for c in chunks) == 20
+
+    index_chunks = plan_chunks("index_daily", {"ts_code": "000001.SH,399300.SZ", "start_date": "20240101", "end_date": "20240131"})
+    assert [c["ts_code"] for c in index_chunks] == ["000001.SH", "399300.SZ"]
+    print(f"✅ {len(chunks)} daily batches, {len(index_chunks)} index fan-outs")
+
+def test_split_range_skips_non_trading_days():
+    """Windows start and end on trading days"""
+    print("\nTesting split_range...")
+    windows = split_range("20240101", "20240114", 5)
+    assert windows == [("20240101", "20240105"), ("20240108", "20240112")]
+    print(f"✅ Windows: {windows}")
+
+def test_merge_dedup_and_order():
+    """Merged payload is ordered by requested code, newest first, without duplicates"""
+    print("\nTesting merge...")
+    fields = ["ts_code", "trade_date", "close"]
+    a = TushareResponse(code=0, data={"fields": fields, "items": [
+        ["600000.SH", "20240103", 7.1], ["600000.SH", "20240102", 7.0],
+    ]})
+    b = TushareResponse(code=0, data={"fields": fields, "items": [
+        ["000001.SZ", "20240102", 9.2], ["600000.SH", "20240103", 7.1], ["000001.SZ", "20240103", 9.3],
+    ]})
+    merged = merge_responses([a, b], ["000001.SZ", "600000.SH"])
+    assert merged.data["fields"] == fields
+    assert merged.data["items"] == [
+        ["000001.SZ", "20240103", 9.3], ["000001.SZ", "20240102", 9.2],
+        ["600000.SH", "20240103", 7.1], ["600000.SH", "20240102", 7.0],
+    ]
+    print(f"✅ Merged {len(merged.data['items'])} rows")
+
+class FlatBars(Transport):
+    """Serves one daily bar per weekday, all with the same close"""
+
+    def __init__(self):
+        self.fields = []
+
+    async def post(self, url, request):
+        params = request["params"]
+        self.fields.append(request["fields"])
+        names = request["fields"].split(",")
+        days = [d for d in iter_dates(params["start_date"], params["end_date"]) if is_weekday(d)]
+        row = {"ts_code": params["ts_code"], "close": 9.5}
+        items = [[row.get(name, day) for name in names] for day in reversed(days)]
+        return {"code": 0, "msg": "", "data": {"fields": names, "items": items}}
+
+def test_projected_chunked_request():
+    """Bars with repeated values survive a chunked request that projects away ts_code/trade_date"""
+    print("\nTesting projected chunked request...")
+    merged = merge_responses([
+        TushareResponse(code=0, data={"fields": ["close"], "items": [[9.5], [9.4]]}),
+        TushareResponse(code=0, data={"fields": ["close"], "items": [[9.5], [9.3]]}),
+    ])
+    assert merged.data["items"] == [[9.5], [9.4], [9.5], [9.3]]
+
+    client = TushareClient(token="test")
+    client.cache = None
+    client.rate_limiter = None
+    client._calendar_retry_at = float("inf")
+    client.transport = FlatBars()
+    params = {"ts_code": "000001.SZ", "start_date": "19950101", "end_date": "20241231"}
+    response = asyncio.run(client.get_daily(params, "close"))
+    weekdays = sum(1 for d in iter_dates("19950101", "20241231") if is_weekday(d))
+    assert len(client.transport.fields) > 1 and set(client.transport.fields) == {"close,ts_code,trade_date"}
+    assert response.data["fields"] == ["close"]
+    assert len(response.data["items"]) == weekdays
+    print(f"✅ {weekdays} bars over {len(client.transport.fields)} chunks")
+
+def main():
+    test_small_request_unchanged()
+    test_long_history_split_into_windows()
+    test_code_batches()
+    test_split_range_skips_non_trading_days()
+    test_merge_dedup_and_order()
+    test_projected_chunked_request()
+    print("\n🎉 Chunking tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
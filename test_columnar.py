@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for the columnar response representation - runs offline
+"""
+import math
+import sys
+from tushare_mcp_server.columnar import ColumnarData, NumberColumn, StringColumn
+from tushare_mcp_server.models import TushareResponse
+
+FIELDS = ["ts_code", "trade_date", "open", "close", "vol", "count"]
+ITEMS = [
+    ["000001.SZ", "20240105", 9.29, 9.27, 1158366.45, 3],
+    ["000001.SZ", "20240104", 9.39, 9.29, 1024612.17, 2],
+    ["600000.SH", "20240105", 6.60, None, 534627.0, 1],
+]
+
+def test_round_trip():
+    """fields/items survive conversion to columns and back"""
+    print("Testing round trip...")
+    table = ColumnarData.from_rows(FIELDS, ITEMS)
+    assert len(table) == 3
+    assert table.to_dict() == {"fields": FIELDS, "items": ITEMS}
+    print(f"✅ {len(table)} rows, {table.nbytes()} bytes")
+
+def test_column_types():
+    """Strings are dictionary-encoded, numbers are typed buffers"""
+    print("\nTesting column types...")
+    table = ColumnarData.from_rows(FIELDS, ITEMS)
+    assert isinstance(table["ts_code"], StringColumn)
+    assert table["ts_code"].categories == ["000001.SZ", "600000.SH"]
+    assert table["close"].format == "d"
+    assert math.isnan(table["close"][2])
+    assert table["count"].format == "q"
+    print("✅ Column types selected")
+
+def test_nullable_ints():
+    """Ints next to None or floats come back as ints, so a cached to_dict() matches the upstream payload"""
+    print("\nTesting nullable and mixed int columns...")
+    fields = ["ts_code", "vol", "count"]
+    items = [["000001.SZ", 100, 3], ["600000.SH", 250.5, None], ["600519.SH", None, 0]]
+    table = ColumnarData.from_rows(fields, items)
+    assert isinstance(table["vol"], NumberColumn)
+    assert isinstance(table["count"], NumberColumn)
+    assert table.to_dict() == {"fields": fields, "items": items}
+    assert [type(v) for v in table["count"].tolist()] == [int, type(None), int]
+    assert table.to_numpy("vol").tolist()[:2] == [100.0, 250.5]
+    assert table[1:].to_dict()["items"] == items[1:]
+    assert table.take([2, 0]).to_dict()["items"] == [items[2], items[0]]
+    assert ColumnarData.from_dict(table.to_dict()).to_dict() == table.to_dict()
+    print("✅ Ints kept through to_dict, slicing and take")
+
+def test_zero_copy_slicing():
+    """Slices share the underlying buffers"""
+    print("\nTesting slicing...")
+    table = ColumnarData.from_rows(FIELDS, ITEMS)
+    head = table[:2]
+    assert len(head) == 2
+    assert head["close"].obj is table["close"].obj
+    assert head["ts_code"].categories is table["ts_code"].categories
+    assert list(head.rows()) == [tuple(row) for row in ITEMS[:2]]
+    assert table.take([2, 0]).to_dict()["items"] == [ITEMS[2], ITEMS[0]]
+    print("✅ Slices share buffers")
+
+def test_response_columnar():
+    """TushareResponse builds its columnar view once"""
+    print("\nTesting TushareResponse.to_columnar...")
+    response = TushareResponse(code=0, data={"fields": FIELDS, "items": ITEMS})
+    assert response.to_columnar() is response.to_columnar()
+    assert response.to_columnar()["trade_date"].tolist() == ["20240105", "20240104", "20240105"]
+    assert len(TushareResponse(code=0).to_columnar()) == 0
+    print("✅ Columnar view cached on the response")
+
+def main():
+    test_round_trip()
+    test_column_types()
+    test_nullable_ints()
+    test_zero_copy_slicing()
+    test_response_columnar()
+    print("\n🎉 Columnar tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for the index constituent store - runs offline against stubbed index_weight data
+"""
+import asyncio
+import sys
+import time
+from tushare_mcp_server.constituents import ConstituentStore, months_between, shift_month
+from tushare_mcp_server.models import TushareResponse
+
+# Monthly snapshots: 600000.SH leaves in March, 688981.SH joins in March
+SNAPSHOTS = {
+    "20240102": {"600519.SH": 5.1, "000001.SZ": 1.0, "600000.SH": 0.4},
+    "20240201": {"600519.SH": 5.3, "000001.SZ": 0.9, "600000.SH": 0.35},
+    "20240301": {"600519.SH": 5.6, "000001.SZ": 0.95, "688981.SH": 0.6},
+}
+
+def make_store():
+    calls = []
+
+    async def fake_fetch(name, params, fields):
+        calls.append((name, params["start_date"], params["end_date"]))
+        items = [
+            [params["index_code"], code, date, weight]
+            for date, members in SNAPSHOTS.items()
+            if params["start_date"] <= date <= params["end_date"]
+            for code, weight in members.items()
+        ]
+        return TushareResponse(code=0, data={"fields": fields.split(","), "items": items})
+
+    return ConstituentStore(fake_fetch), calls
+
+def test_month_helpers():
+    print("Testing month helpers...")
+    assert shift_month("202401", -1) == "202312"
+    assert shift_month("202412", 1) == "202501"
+    assert months_between("20231215", "20240210") == ["202312", "202401", "202402"]
+    print("✅ Month arithmetic")
+
+def test_members_and_changes():
+    """Members use the latest snapshot on or before the date; months load once"""
+    print("\nTesting members and changes...")
+    store, calls = make_store()
+    members = asyncio.run(store.members("399300.SZ", "20240215"))
+    assert [row[1] for row in members["items"]] == ["600519.SH", "000001.SZ", "600000.SH"]
+    assert members["items"][0][2] == "20240201"
+
+    # Before the month's snapshot, the previous month applies
+    early = asyncio.run(store.members("399300.SZ", "20240101"))
+    assert early["items"] == []
+    calls.clear()
+    asyncio.run(store.members("399300.SZ", "20240220"))
+    assert calls == []
+
+    changes = asyncio.run(store.changes("399300.SZ", "20240110", "20240310"))
+    assert [(row[1], row[2]) for row in changes["items"]] == [("688981.SH", "added"), ("600000.SH", "removed")]
+    assert changes["items"][1][3:] == ["20240102", "20240301", 0.4, None]
+    print("✅ Members and changes")
+
+def test_weight_history_and_latency():
+    """Weight history spans snapshots; warm lookups stay well under a millisecond"""
+    print("\nTesting weight history...")
+    store, calls = make_store()
+    history = asyncio.run(store.weight_history("399300.SZ", "600519.SH", "20240101", "20240331"))
+    assert [(row[2], row[3]) for row in history["items"]] == [("20240301", 5.6), ("20240201", 5.3), ("20240102", 5.1)]
+    assert len(calls) == 3
+
+    async def timed():
+        started = time.perf_counter()
+        for _ in range(1000):
+            await store.members("399300.SZ", "20240315")
+        return (time.perf_counter() - started) / 1000
+
+    per_call = asyncio.run(timed())
+    assert per_call < 0.001, per_call
+    assert len(calls) == 3
+    print(f"✅ Warm members lookup: {per_call * 1e6:.1f}µs")
+
+def main():
+    test_month_helpers()
+    test_members_and_changes()
+    test_weight_history_and_latency()
+    print("\n🎉 Constituent tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for index-level fundamentals aggregation - runs offline against stubbed data
+"""
+import asyncio
+import json
+import math
+import sys
+from tests_support import offline_server
+from tushare_mcp_server.models import TushareResponse
+
+WEIGHTS = {"600519.SH": 60.0, "000001.SZ": 30.0, "300750.SZ": 10.0}
+BASIC_FIELDS = ["ts_code", "trade_date", "pe", "pe_ttm", "pb", "turnover_rate", "turnover_rate_f", "total_mv", "circ_mv"]
+BASIC = {
+    "600519.SH": [30.0, 28.0, 10.0, 0.3, 0.6, 2000000.0, 2000000.0],
+    "000001.SZ": [5.0, 4.5, 0.5, 0.8, 1.2, 200000.0, 190000.0],
+    "300750.SZ": [None, None, 4.0, 2.0, 3.0, 800000.0, 700000.0],  # loss-making: no PE
+    "601318.SH": [8.0, 7.0, 1.0, 0.5, 0.9, 900000.0, 500000.0],
+}
+
+def make_server():
+    calls = []
+
+    async def fake_query(name, params, fields=None):
+        calls.append((name, params.get("trade_date") or params.get("start_date")))
+        if name == "index_weight":
+            items = [["399300.SZ", code, "20240102", w] for code, w in WEIGHTS.items()] if params["start_date"] <= "20240102" <= params["end_date"] else []
+            return TushareResponse(code=0, data={"fields": fields.split(","), "items": items})
+        if name == "daily_basic":
+            items = [[code, params["trade_date"]] + values for code, values in BASIC.items()]
+            return TushareResponse(code=0, data={"fields": BASIC_FIELDS, "items": items})
+        raise AssertionError(name)
+
+    async def fake_calendar():
+        return None
+
+    server = offline_server(fake_query)
+    server.client.get_calendar = fake_calendar
+    return server, calls
+
+def test_index_weighting():
+    """PE/PB are weight-harmonic, turnover weight-averaged, market cap summed"""
+    print("Testing index-weighted fundamentals...")
+    server, calls = make_server()
+    result = asyncio.run(server.fundamentals.compute({"index_code": "399300.SZ", "trade_date": "20240105"}))
+    row = dict(zip(result["fields"], result["items"][0]))
+    assert row["constituents"] == 3 and row["matched"] == 3 and row["weight_coverage"] == 1.0
+    assert math.isclose(row["pe"], 90 / (60 / 30 + 30 / 5), rel_tol=1e-4)
+    assert math.isclose(row["pb"], 100 / (60 / 10 + 30 / 0.5 + 10 / 4), rel_tol=1e-4)
+    assert math.isclose(row["turnover_rate"], (60 * 0.3 + 30 * 0.8 + 10 * 2.0) / 100, rel_tol=1e-4)
+    assert row["total_mv"] == 3000000.0
+
+    # Closed dates are served from the per-date result cache
+    calls.clear()
+    asyncio.run(server.fundamentals.compute({"index_code": "399300.SZ", "trade_date": "20240105"}))
+    assert calls == [] and server.fundamentals.hits == 1
+    print(f"✅ PE {row['pe']}, PB {row['pb']}")
+
+def test_basket_and_range():
+    """Baskets default to market-cap weights; ranges produce one row per trading day"""
+    print("\nTesting basket over a range...")
+    server, _ = make_server()
+    result = asyncio.run(server.handle_call_tool("index_fundamentals", {
+        "ts_code": "600519.SH,601318.SH,999999.SH", "start_date": "20240101", "end_date": "20240107",
+        "fields": "trade_date,matched,pe,total_mv",
+    }))
+    payload = json.loads(result[0].text)
+    assert [row[0] for row in payload["items"]] == ["20240105", "20240104", "20240103", "20240102", "20240101"]
+    assert payload["items"][0][1] == 2
+    assert math.isclose(payload["items"][0][2], 2900000 / (2000000 / 30 + 900000 / 8), rel_tol=1e-4)
+
+    error = asyncio.run(server.handle_call_tool("index_fundamentals", {"ts_code": "600519.SH", "weighting": "index"}))
+    assert error[0].text.startswith("Error: index weighting needs index_code")
+    print("✅ Basket aggregation")
+
+def main():
+    test_index_weighting()
+    test_basket_and_range()
+    print("\n🎉 Fundamentals tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the pooled HTTP client in TushareClient - runs offline on a local port
+"""
+import asyncio
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+from mock_tushare import MockConfig, MockTushare
+from tushare_mcp_server.tushare_client import TushareClient
+
+def start_mock():
+    """Mock server that also counts the TCP connections it accepts"""
+    mock = MockTushare(MockConfig(rows=10, latency_ms=0, jitter_ms=0))
+    mock.connections = 0
+    process_request = mock.httpd.process_request
+
+    def counting(request, client_address):
+        mock.connections += 1
+        process_request(request, client_address)
+
+    mock.httpd.process_request = counting
+    return mock.start()
+
+def make_client(url):
+    client = TushareClient(token="test")
+    client.base_url = url
+    client.cache = None
+    client.rate_limiter = None
+    client.retrier = None
+    return client
+
+def test_reuses_one_client():
+    """Sequential requests share one httpx.AsyncClient and one keep-alive connection"""
+    print("Testing pooled client reuse...")
+    mock = start_mock()
+
+    async def run():
+        client = make_client(mock.url)
+        await client._make_request("daily", {"trade_date": "20240102"})
+        first = client._http_client
+        for day in range(3, 8):
+            await client._make_request("daily", {"trade_date": f"202401{day:02d}"})
+            assert client._http_client is first
+        await client.close()
+        return first
+
+    try:
+        first = asyncio.run(run())
+    finally:
+        mock.stop()
+    assert first is not None and first.is_closed
+    assert mock.stats()["requests"] == 6
+    assert mock.connections == 1, mock.connections
+    print(f"✅ {mock.stats()['requests']} requests over {mock.connections} connection")
+
+def test_close_releases_client():
+    """close() and __aexit__ close the pooled client; the next request builds a fresh one"""
+    print("\nTesting close and re-creation...")
+    mock = start_mock()
+
+    async def run():
+        client = make_client(mock.url)
+        await client._make_request("daily", {"trade_date": "20240102"})
+        first = client._http_client
+        await client.close()
+        assert first.is_closed and client._http_client is None
+
+        await client._make_request("daily", {"trade_date": "20240103"})
+        second = client._http_client
+        assert second is not None and second is not first and not second.is_closed
+
+        async with client:
+            await client._make_request("daily", {"trade_date": "20240104"})
+            assert client._http_client is second
+        assert second.is_closed and client._http_client is None
+
+        async with client:
+            await client._make_request("daily", {"trade_date": "20240105"})
+            third = client._http_client
+        assert third is not second and third.is_closed
+
+    try:
+        asyncio.run(run())
+    finally:
+        mock.stop()
+    assert mock.stats()["requests"] == 4
+    print("✅ Released on close and re-created on demand")
+
+def main():
+    test_reuses_one_client()
+    test_close_releases_client()
+    print("\n🎉 HTTP client tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script for the HTTP transport (streamable HTTP and SSE) - runs offline on a local port
+"""
+import asyncio
+import json
+import socket
+import sys
+import httpx
+import uvicorn
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamablehttp_client
+from tests_support import offline_server
+from tushare_mcp_server.http_transport import create_app
+from tushare_mcp_server.models import TushareResponse
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def make_server():
+    calls = []
+
+    async def fake_query(name, params, fields=None):
+        calls.append(name)
+        return TushareResponse(code=0, data={"fields": ["ts_code", "name"], "items": [["000001.SZ", "平安银行"]]})
+
+    return offline_server(fake_query), calls
+
+async def call_stock_basic(session: ClientSession):
+    await session.initialize()
+    tools = await session.list_tools()
+    assert "daily" in [tool.name for tool in tools.tools]
+    result = await session.call_tool("stock_basic", {"ts_code": "000001.SZ"})
+    return json.loads(result.content[0].text)
+
+def test_sessions_share_one_server():
+    """Streamable HTTP and SSE sessions are served by the same server object"""
+    print("Testing HTTP transport...")
+    server, calls = make_server()
+    closed = []
+    original_close = server.close
+
+    async def close():
+        closed.append(True)
+        await original_close()
+
+    server.close = close
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    uvicorn_server = uvicorn.Server(uvicorn.Config(create_app(server), host="127.0.0.1", port=port, log_level="warning"))
+
+    async def streamable():
+        async with streamablehttp_client(f"{base}/mcp") as (read_stream, write_stream, _):
+            async with ClientSession(read_stream, write_stream) as session:
+                return await call_stock_basic(session)
+
+    async def sse():
+        async with sse_client(f"{base}/sse") as (read_stream, write_stream):
+            async with ClientSession(read_stream, write_stream) as session:
+                return await call_stock_basic(session)
+
+    async def run():
+        serving = asyncio.create_task(uvicorn_server.serve())
+        while not uvicorn_server.started:
+            await asyncio.sleep(0.01)
+        try:
+            results = await asyncio.gather(streamable(), streamable(), sse())
+            async with httpx.AsyncClient() as http:
+                health = (await http.get(f"{base}/health")).json()
+        finally:
+            uvicorn_server.should_exit = True
+            await serving
+        return results, health
+
+    results, health = asyncio.run(run())
+    assert all(r["items"] == [["000001.SZ", "平安银行"]] for r in results)
+    assert calls == ["stock_basic"] * 3
+    assert health["status"] == "ok" and "constituents" in health
+    assert closed == [True]
+    print(f"✅ {len(results)} sessions served by one server, health: {health['status']}")
+
+def main():
+    test_sessions_share_one_server()
+    print("\n🎉 HTTP transport tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script for the mock Tushare server and client benchmark harness - runs offline on a local port
+"""
+import asyncio
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+from bench_client import Result, percentile, regressions
+from mock_tushare import MockConfig, MockTushare
+from tushare_mcp_server.retry import Retrier, RetryPolicy
+from tushare_mcp_server.tushare_client import TushareClient
+
+def make_client(url):
+    client = TushareClient(token="test")
+    client.base_url = url
+    client.cache = None
+    client.rate_limiter = None
+    client.retrier = Retrier(RetryPolicy(max_attempts=6, base_delay=0.001, max_delay=0.01), failure_threshold=0)
+    return client
+
+def test_mock_payloads():
+    """Bars come back at the configured size and trade_cal marks weekdays open"""
+    print("Testing mock payloads...")
+    mock = MockTushare(MockConfig(rows=300, latency_ms=0, jitter_ms=0)).start()
+
+    async def run():
+        async with make_client(mock.url) as client:
+            daily = await client.query("daily", {"trade_date": "20240105"})
+            calendar = await client.get_calendar()
+            return daily, calendar
+
+    try:
+        daily, calendar = asyncio.run(run())
+    finally:
+        mock.stop()
+    assert len(daily.data["items"]) == 300 and daily.data["fields"][0] == "ts_code"
+    assert calendar.is_open("20240105") and not calendar.is_open("20240106")
+    assert mock.stats()["requests"] >= 2 and mock.stats()["errors"] == 0
+    print(f"✅ {mock.stats()['bytes_sent']:,} bytes served")
+
+def test_no_transport_stall():
+    """With no injected latency a round trip costs milliseconds, not a ~40ms Nagle/delayed-ACK stall"""
+    print("\nTesting round-trip overhead...")
+    mock = MockTushare(MockConfig(rows=10, latency_ms=0, jitter_ms=0)).start()
+
+    async def run():
+        async with make_client(mock.url) as client:
+            await client._make_request("daily", {"trade_date": "20240102"})
+            timings = []
+            for day in range(3, 23):
+                start = time.perf_counter()
+                await client._make_request("daily", {"trade_date": f"202401{day:02d}"})
+                timings.append((time.perf_counter() - start) * 1000)
+            return sorted(timings)[len(timings) // 2]
+
+    try:
+        median_ms = asyncio.run(run())
+    finally:
+        mock.stop()
+    assert median_ms < 20, f"{median_ms:.1f}ms per call"
+    print(f"✅ {median_ms:.1f}ms median round trip")
+
+def test_injected_errors():
+    """Injected -2002 errors and 503s are retried by the client"""
+    print("\nTesting error injection...")
+    mock = MockTushare(MockConfig(rows=10, latency_ms=0, jitter_ms=0, error_rate=0.3, http_error_rate=0.1, seed=1)).start()
+
+    async def run():
+        async with make_client(mock.url) as client:
+            responses = await asyncio.gather(*(
+                client._make_request("daily", {"trade_date": f"202401{day:02d}"}) for day in range(1, 21)
+            ), return_exceptions=True)
+            return [r for r in responses if not isinstance(r, Exception)]
+
+    try:
+        succeeded = asyncio.run(run())
+    finally:
+        mock.stop()
+    assert mock.stats()["errors"] > 0
+    assert len(succeeded) >= 18 and all(len(r.data["items"]) == 10 for r in succeeded)
+    print(f"✅ {mock.stats()['errors']} injected errors, {len(succeeded)}/20 calls succeeded")
+
+def test_report_helpers():
+    print("\nTesting percentiles and regression check...")
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50 and percentile(values, 99) == 99 and percentile([], 50) == 0.0
+
+    baseline = [{"scenario": "client", "concurrency": 8, "p99_ms": 100.0, "throughput": 200.0}]
+    fine = Result("client", 8, 100, 0, 40.0, 110.0, 190.0, 80.0, 0)
+    slow = Result("client", 8, 100, 0, 40.0, 150.0, 120.0, 80.0, 0)
+    assert regressions([fine], baseline, 0.2) == []
+    assert len(regressions([slow], baseline, 0.2)) == 2
+    print("✅ Nearest-rank percentiles and tolerance checks")
+
+def main():
+    test_mock_payloads()
+    test_no_transport_stall()
+    test_injected_errors()
+    test_report_helpers()
+    print("\n🎉 Mock server tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
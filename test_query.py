@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for server-side projection, filtering and paging - runs offline
+"""
+import asyncio
+import json
+import sys
+from tests_support import offline_server
+from tushare_mcp_server.models import TushareResponse
+from tushare_mcp_server.query import Predicate, ResultQuery
+
+DATA = {
+    "fields": ["ts_code", "trade_date", "close", "pct_chg"],
+    "items": [
+        ["000001.SZ", "20240105", 9.27, -0.22],
+        ["000002.SZ", "20240105", 9.80, 6.51],
+        ["600000.SH", "20240105", 6.60, 5.10],
+        ["600519.SH", "20240105", 1650.0, None],
+    ],
+}
+
+def test_predicates():
+    """Comparison predicates with numeric and string literals"""
+    print("Testing predicates...")
+    assert Predicate.parse("pct_chg > 5").matches(6.51)
+    assert not Predicate.parse("pct_chg > 5").matches(None)
+    assert Predicate.parse("trade_date >= 20240101").matches("20240105")
+    assert Predicate.parse("ts_code = '000001.SZ'").matches("000001.SZ")
+    try:
+        Predicate.parse("pct_chg >> 5")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("invalid expression accepted")
+    print("✅ Predicates parsed")
+
+def test_filter_sort_limit_project():
+    """Filters, sort, paging and projection are applied in order"""
+    print("\nTesting query pipeline...")
+    params = {"trade_date": "20240105", "where": ["pct_chg > 5"], "sort": "pct_chg desc", "limit": 1, "fields": "ts_code,close"}
+    query = ResultQuery.from_arguments(params)
+    assert params == {"trade_date": "20240105"}
+    assert query.upstream_fields() == "ts_code,close,pct_chg"
+    assert query.apply(DATA) == {"fields": ["ts_code", "close"], "items": [["000002.SZ", 9.80]]}
+
+    query = ResultQuery.from_arguments({"sort": "pct_chg", "offset": 1})
+    assert [row[0] for row in query.apply(DATA)["items"]] == ["600000.SH", "000002.SZ", "600519.SH"]
+    print("✅ Query pipeline")
+
+def test_upstream_paging():
+    """stock_basic keeps limit/offset upstream when no filter or sort is set"""
+    print("\nTesting upstream paging...")
+    params = {"list_status": "L", "limit": 10, "offset": 20}
+    query = ResultQuery.from_arguments(params, upstream_paging=True)
+    assert params == {"list_status": "L", "limit": 10, "offset": 20}
+    assert query.is_noop
+    print("✅ Paging left to Tushare")
+
+def test_handle_call_tool():
+    """Query arguments flow through the MCP tool handler"""
+    print("\nTesting handle_call_tool...")
+    calls = []
+
+    async def fake_query(name, params, fields=None):
+        calls.append((name, params, fields))
+        return TushareResponse(code=0, data=DATA)
+
+    server = offline_server(fake_query)
+    result = asyncio.run(server.handle_call_tool("daily", {
+        "trade_date": "20240105", "where": "pct_chg > 5", "sort": "-close", "fields": "ts_code",
+    }))
+    assert calls == [("daily", {"trade_date": "20240105"}, "ts_code,pct_chg,close")]
+    assert json.loads(result[0].text)["items"] == [["000002.SZ"], ["600000.SH"]]
+
+    error = asyncio.run(server.handle_call_tool("daily", {"where": ["missing > 1"]}))
+    assert error[0].text.startswith("Error: Unknown columns: missing")
+    print("✅ Tool handler applies the query")
+
+def main():
+    test_predicates()
+    test_filter_sort_limit_project()
+    test_upstream_paging()
+    test_handle_call_tool()
+    print("\n🎉 Query tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-endpoint token-bucket rate limiter - runs offline
+"""
+import asyncio
+import sys
+import time
+from tushare_mcp_server.rate_limiter import RateLimiter, TokenBucket
+
+def test_burst_then_throttle():
+    """Calls beyond the burst are queued rather than rejected"""
+    print("Testing burst and throttling...")
+    # 6000/min with a burst of 5 refills at 99.9 tokens per second
+    bucket = TokenBucket(per_minute=6000, burst=5)
+
+    async def run():
+        start = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(25)))
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(run())
+    stats = bucket.stats()
+    assert stats["acquired"] == 25
+    assert stats["max_queue_depth"] > 1
+    assert stats["queue_depth"] == 0
+    assert elapsed >= 0.15
+    print(f"✅ 25 calls in {elapsed:.2f}s, max wait {stats['max_wait']:.3f}s")
+
+def test_fifo_order():
+    """Waiters are served in arrival order"""
+    print("\nTesting FIFO ordering...")
+    bucket = TokenBucket(per_minute=6000, burst=1)
+    order = []
+
+    async def call(i):
+        await bucket.acquire()
+        order.append(i)
+
+    async def run():
+        await asyncio.gather(*(call(i) for i in range(10)))
+
+    asyncio.run(run())
+    assert order == list(range(10))
+    print(f"✅ Served in order: {order}")
+
+def test_per_endpoint_limits():
+    """Endpoint overrides and unlimited endpoints"""
+    print("\nTesting per-endpoint configuration...")
+    limiter = RateLimiter(default_per_minute=500, per_endpoint={"weekly": 200, "stock_basic": 0})
+    assert limiter.bucket("daily").per_minute == 500
+    assert limiter.bucket("weekly").per_minute == 200
+    assert limiter.bucket("stock_basic") is None
+
+    asyncio.run(limiter.acquire("daily"))
+    stats = limiter.stats()
+    assert stats["daily"]["acquired"] == 1
+    print(f"✅ Limiter stats: {stats}")
+
+def main():
+    test_burst_then_throttle()
+    test_fifo_order()
+    test_per_endpoint_limits()
+    print("\n🎉 Rate limiter tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
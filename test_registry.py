@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for the endpoint registry and registry-driven dispatch - runs offline
+"""
+import asyncio
+import sys
+from tests_support import offline_server
+from tushare_mcp_server.cache import MARKET_DATA_APIS, REFERENCE_APIS
+from tushare_mcp_server.models import TushareResponse
+from tushare_mcp_server.registry import ENDPOINTS
+from tushare_mcp_server.tushare_client import TushareClient
+
+def test_registry_entries():
+    """Entries carry schema, points and cache policy"""
+    print("Testing registry entries...")
+    for name in ("daily_basic", "stk_limit", "hsgt_top10", "income", "balancesheet", "cashflow", "forecast", "express"):
+        assert name in ENDPOINTS, name
+    assert ENDPOINTS["income"].input_schema()["required"] == ["ts_code"]
+    assert "fields" in ENDPOINTS["daily"].input_schema()["properties"]
+    assert ENDPOINTS["daily"].description == "Get daily stock prices and trading data"
+    assert ENDPOINTS["weekly"].description.endswith("(requires 2000+ Tushare points)")
+    assert "daily_basic" in MARKET_DATA_APIS and "income" in REFERENCE_APIS
+    try:
+        ENDPOINTS["new"] = ENDPOINTS["daily"]
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("registry is mutable")
+    print(f"✅ {len(ENDPOINTS)} endpoints registered")
+
+def test_client_dispatch():
+    """query() routes chunked endpoints through the calendar/chunking path"""
+    print("\nTesting client dispatch...")
+    client = TushareClient(token="test")
+    plain, chunked = [], []
+
+    async def fake_make_request(api_name, params, fields=None, use_cache=True):
+        plain.append(api_name)
+        return TushareResponse(code=0, data={"fields": [], "items": []})
+
+    async def fake_chunked(api_name, params, fields=None, use_cache=True):
+        chunked.append(api_name)
+        return TushareResponse(code=0, data={"fields": [], "items": []})
+
+    client._make_request = fake_make_request
+    client._make_chunked_request = fake_chunked
+
+    async def run():
+        await client.query("income", {"ts_code": "000001.SZ"})
+        await client.query("stk_limit", {"trade_date": "20240105"})
+        await client.get_stock_basic({})
+        await client.get_daily({"ts_code": "000001.SZ"})
+        try:
+            await client.query("nope", {})
+        except ValueError as e:
+            assert "Unknown endpoint" in str(e)
+        else:
+            raise AssertionError("unknown endpoint accepted")
+
+    asyncio.run(run())
+    assert plain == ["income", "stock_basic"]
+    assert chunked == ["stk_limit", "daily"]
+    assert not hasattr(client, "get_nope")
+    print("✅ Dispatch by registry entry")
+
+def test_list_tools():
+    """list_tools serves the precomputed tool list"""
+    print("\nTesting list_tools...")
+    from tushare_mcp_server.mcp_server import TOOLS
+    from mcp.types import ListToolsRequest
+    server = offline_server()
+    handler = server.server.request_handlers[ListToolsRequest]
+    result = asyncio.run(handler(ListToolsRequest(method="tools/list")))
+    names = [tool.name for tool in result.root.tools]
+    assert names == [tool.name for tool in TOOLS]
+    assert names[:len(ENDPOINTS)] == list(ENDPOINTS)
+    assert names[-1] == "batch"
+    print(f"✅ {len(names)} tools listed")
+
+def main():
+    test_registry_entries()
+    test_client_dispatch()
+    test_list_tools()
+    print("\n🎉 Registry tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Parity test for weekly/monthly bars resampled from daily bars - runs offline
+
+Parity is checked against upstream daily, weekly and monthly responses
+recorded from the live API into fixtures/resample/ (replay fixtures, see
+FIXTURE_MODE). The recording spans holiday weeks (National Day, Spring
+Festival, Qingming, May Day) and month ends. Capture or refresh it with:
+
+    TUSHARE_TOKEN=... python test_resample.py --record
+
+Without that recording the parity test is skipped. The remaining tests
+resample fixtures/resample_daily.json (trade_cal and daily bars in the
+upstream layout) and compare against a plain row-by-row aggregation, which
+checks the vectorized grouping but says nothing about upstream parity.
+"""
+import asyncio
+import json
+import math
+import os
+import sys
+import tempfile
+import pytest
+from tushare_mcp_server.resample import PERIOD_FIELDS, resample_bars
+from tushare_mcp_server.trade_calendar import TradeCalendar
+from tushare_mcp_server.transports import FIXTURE_SUFFIX, RecordingTransport, ReplayTransport
+from tushare_mcp_server.warehouse import MARKET_SCOPE, Warehouse
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIXTURE = os.path.join(FIXTURES, "resample_daily.json")
+RECORDED = os.path.join(FIXTURES, "resample")
+
+# Large and small caps on both exchanges, ChiNext included
+RECORDED_CODES = ("000001.SZ", "601888.SH", "600519.SH", "300750.SZ")
+# National Day 2023 through May Day 2024, starting and ending on whole weeks and months
+RECORDED_RANGE = {"start_date": "20230901", "end_date": "20240531"}
+
+def load_fixture():
+    with open(FIXTURE, encoding="utf-8") as f:
+        return json.load(f)
+
+def by_key(data):
+    fields = data["fields"]
+    return {(row[fields.index("ts_code")], row[fields.index("trade_date")]): dict(zip(fields, row)) for row in data["items"]}
+
+def assert_parity(actual, expected, abs_tol=1e-6):
+    assert set(PERIOD_FIELDS) <= set(actual["fields"])
+    got, want = by_key(actual), by_key(expected)
+    assert got.keys() == want.keys(), f"bars differ: {sorted(got.keys() ^ want.keys())[:5]}"
+    for key, row in want.items():
+        for name in PERIOD_FIELDS:
+            a, b = got[key][name], row[name]
+            if isinstance(b, float):
+                assert math.isclose(a, b, rel_tol=1e-6, abs_tol=abs_tol), f"{key} {name}: {a} != {b}"
+            else:
+                assert a == b, f"{key} {name}: {a} != {b}"
+
+def reference_bars(daily, calendar, period):
+    """Weekly/monthly bars aggregated one row at a time, unrounded"""
+    rows = sorted((dict(zip(daily["fields"], row)) for row in daily["items"]), key=lambda r: (r["ts_code"], r["trade_date"]))
+    groups = {}
+    for row in rows:
+        groups.setdefault((row["ts_code"], calendar.period_end(row["trade_date"], period)), []).append(row)
+    items = []
+    for (code, end), bars in groups.items():
+        first, last = bars[0], bars[-1]
+        change = last["close"] - first["pre_close"]
+        bar = {
+            "ts_code": code, "trade_date": end, "close": last["close"], "open": first["open"],
+            "high": max(b["high"] for b in bars), "low": min(b["low"] for b in bars),
+            "pre_close": first["pre_close"], "change": change, "pct_chg": change / first["pre_close"] * 100,
+            "vol": sum(b["vol"] for b in bars), "amount": sum(b["amount"] for b in bars),
+        }
+        items.append([bar[name] for name in PERIOD_FIELDS])
+    return {"fields": list(PERIOD_FIELDS), "items": items}
+
+# Resampled values are rounded to 2-4 decimals, the reference is not
+ROUNDED = 0.006
+
+def merge(responses):
+    """One payload from several responses with the same fields"""
+    return {"fields": responses[0].data["fields"], "items": [row for r in responses for row in r.data["items"]]}
+
+async def fetch_recorded(client):
+    """trade_cal plus daily, weekly and monthly bars of every recorded code, in the order --record captures them"""
+    calendar = await client.get_trade_cal({"exchange": "SSE", "start_date": "20230801", "end_date": "20240630"})
+    payloads = {"trade_cal": calendar.data}
+    for api_name in ("daily", "weekly", "monthly"):
+        get = getattr(client, f"get_{api_name}")
+        payloads[api_name] = merge([await get({"ts_code": code, **RECORDED_RANGE}) for code in RECORDED_CODES])
+    return payloads
+
+def replay_client():
+    from tushare_mcp_server.tushare_client import TushareClient
+    client = TushareClient(token="")
+    client.cache = None
+    client.rate_limiter = None
+    client.transport = ReplayTransport(RECORDED)
+    return client
+
+def test_resample_parity():
+    """Resampled bars match weekly and monthly bars recorded from the live API"""
+    print("Testing resample parity against recorded upstream bars...")
+    if not os.path.exists(os.path.join(RECORDED, "daily" + FIXTURE_SUFFIX)):
+        pytest.skip(f"No recorded upstream bars in {RECORDED}; capture them with: python test_resample.py --record")
+    payloads = asyncio.run(fetch_recorded(replay_client()))
+    calendar = TradeCalendar.from_response(payloads["trade_cal"])
+    for api_name, period in (("weekly", "W"), ("monthly", "M")):
+        result = resample_bars(payloads["daily"], calendar, period)
+        assert_parity(result, payloads[api_name])
+        print(f"✅ {api_name}: {len(result['items'])} bars match upstream")
+
+def test_resample_reference():
+    """Vectorized resampling matches a row-by-row aggregation of the same daily bars"""
+    print("\nTesting resampling against a row-by-row reference...")
+    fixture = load_fixture()
+    calendar = TradeCalendar.from_response(fixture["trade_cal"])
+    for api_name, period in (("weekly", "W"), ("monthly", "M")):
+        result = resample_bars(fixture["daily"], calendar, period)
+        assert result["fields"] == PERIOD_FIELDS
+        assert_parity(result, reference_bars(fixture["daily"], calendar, period), abs_tol=ROUNDED)
+        print(f"✅ {api_name}: {len(result['items'])} bars match the reference")
+
+class FixtureClient:
+    """Serves the fixture calendar and fails if the API would be called"""
+
+    def __init__(self, fixture):
+        self.calendar = TradeCalendar.from_response(fixture["trade_cal"])
+
+    async def get_calendar(self):
+        return self.calendar
+
+    async def get_weekly(self, params, fields=None):
+        raise AssertionError("weekly should be served from daily bars")
+
+    async def get_monthly(self, params, fields=None):
+        raise AssertionError("monthly should be served from daily bars")
+
+def test_warehouse_resample():
+    """The warehouse answers weekly/monthly requests from synced daily bars"""
+    print("\nTesting warehouse resampling...")
+    fixture = load_fixture()
+    wh = Warehouse(os.path.join(tempfile.mkdtemp(), "warehouse.sqlite3"))
+    wh.store("daily", fixture["daily"])
+    wh.extend_coverage("daily", MARKET_SCOPE, "20240102", "20240430")
+    client = FixtureClient(fixture)
+    reference = {period: reference_bars(fixture["daily"], client.calendar, period) for period in ("W", "M")}
+
+    params = dict(fixture["params"])
+    assert wh.supports("weekly", params)
+    weekly = asyncio.run(wh.get("weekly", params, None, client))
+    assert weekly.data["fields"] == PERIOD_FIELDS
+    assert_parity(weekly.data, reference["W"], abs_tol=ROUNDED)
+
+    # A start date mid-period still yields the full first period
+    monthly = asyncio.run(wh.get("monthly", {"ts_code": "601888.SH", "start_date": "20240315", "end_date": "20240430"}, "trade_date,close,vol", client))
+    assert monthly.data["fields"] == ["trade_date", "close", "vol"]
+    assert [row[0] for row in monthly.data["items"]] == ["20240430", "20240329"]
+    want = by_key(reference["M"])[("601888.SH", "20240329")]
+    assert math.isclose(monthly.data["items"][1][2], want["vol"], abs_tol=ROUNDED)
+    assert wh.stats()["resampled"] == 2
+    print("✅ Served from daily bars without upstream calls")
+    wh.close()
+
+async def record():
+    """Record the parity fixtures from the live API (needs TUSHARE_TOKEN)"""
+    from tushare_mcp_server.tushare_client import TushareClient
+
+    for name in os.listdir(RECORDED) if os.path.isdir(RECORDED) else ():
+        if name.endswith(FIXTURE_SUFFIX):
+            os.remove(os.path.join(RECORDED, name))
+    client = TushareClient()
+    client.cache = None
+    client.transport = RecordingTransport(client.transport, RECORDED)
+    async with client:
+        payloads = await fetch_recorded(client)
+        recorded = client.transport.recorded
+    print(f"✅ Recorded {recorded} responses ({len(payloads['daily']['items'])} daily bars) in {RECORDED}")
+
+def main():
+    if "--record" in sys.argv:
+        asyncio.run(record())
+        return 0
+    try:
+        test_resample_parity()
+    except pytest.skip.Exception as e:
+        print(f"⚠️  Skipped: {e}")
+    test_resample_reference()
+    test_warehouse_resample()
+    print("\n🎉 Resample tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test script for retries, backoff and the per-endpoint circuit breaker - runs offline against a mock transport
+"""
+import asyncio
+import sys
+import httpx
+from tushare_mcp_server.rate_limiter import RateLimiter
+from tushare_mcp_server.retry import (
+    FATAL, RATE_LIMITED, TRANSIENT, CircuitOpenError, RequestFailed, Retrier, RetryPolicy, TushareAPIError, classify,
+)
+from tushare_mcp_server.tushare_client import TushareClient
+
+OK = {"code": 0, "msg": "", "data": {"fields": ["ts_code"], "items": [["000001.SZ"]]}}
+
+def make_client(responses, failure_threshold=5):
+    """Client whose HTTP calls are answered from responses, in order"""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        answer = responses[min(len(calls), len(responses)) - 1]
+        if isinstance(answer, Exception):
+            raise answer
+        status, body, headers = answer
+        return httpx.Response(status, json=body, headers=headers)
+
+    client = TushareClient(token="test")
+    client.cache = None
+    client.singleflight = None
+    client.rate_limiter = None
+    client.retrier = Retrier(RetryPolicy(max_attempts=4, base_delay=0.01, max_delay=1.0), failure_threshold=failure_threshold, reset_timeout=0.2)
+    client._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client, calls
+
+def test_classification():
+    """Tushare codes and HTTP statuses map to retry classes"""
+    print("Testing error classification...")
+    assert classify(TushareAPIError(-2002, "系统内部错误"))[0] == TRANSIENT
+    assert classify(TushareAPIError(40203, "抱歉，您每分钟最多访问该接口500次"))[0] == RATE_LIMITED
+    assert classify(TushareAPIError(40203, "抱歉，您没有访问该接口的权限"))[0] == FATAL
+    assert classify(TushareAPIError(-2001, "参数错误"), frozenset({-2001}))[0] == TRANSIENT
+    assert classify(RequestFailed("Request failed: timeout"))[0] == TRANSIENT
+    request = httpx.Request("POST", "https://api.tushare.pro")
+    busy = httpx.Response(429, headers={"Retry-After": "3"}, request=request)
+    assert classify(httpx.HTTPStatusError("busy", request=request, response=busy)) == (RATE_LIMITED, 3.0)
+    missing = httpx.Response(404, request=request)
+    assert classify(httpx.HTTPStatusError("missing", request=request, response=missing))[0] == FATAL
+    print("✅ Classification")
+
+def test_retries_transient_failures():
+    """5xx, connection errors and internal Tushare errors are retried until success"""
+    print("\nTesting retries...")
+    client, calls = make_client([
+        (503, {}, {}),
+        httpx.ConnectError("reset"),
+        (200, {"code": -2002, "msg": "系统内部错误", "data": None}, {}),
+        (200, OK, {}),
+    ])
+    response = asyncio.run(client._make_request("daily", {"ts_code": "000001.SZ"}))
+    assert response.data["items"] == [["000001.SZ"]]
+    assert len(calls) == 4 and client.retrier.retries == 3
+    assert client.retrier.stats()["breakers"]["daily"]["state"] == "closed"
+    print(f"✅ Succeeded after {len(calls)} attempts")
+
+def test_fatal_errors_fail_fast():
+    """Permission errors are raised on the first attempt with the usual message"""
+    print("\nTesting non-retryable errors...")
+    client, calls = make_client([(200, {"code": 40203, "msg": "抱歉，您没有访问该接口的权限", "data": None}, {})])
+    try:
+        asyncio.run(client._make_request("weekly", {"ts_code": "000001.SZ"}))
+        raise AssertionError("expected an error")
+    except TushareAPIError as e:
+        assert str(e) == "Tushare API error: 抱歉，您没有访问该接口的权限" and e.code == 40203
+    assert len(calls) == 1
+    print("✅ No retry for permission errors")
+
+def test_retry_after_and_rate_limiter():
+    """Throttling defers the endpoint's token bucket; a Retry-After beyond max_delay is not waited for"""
+    print("\nTesting Retry-After...")
+    client, calls = make_client([(429, {}, {"Retry-After": "0.05"}), (200, OK, {})])
+    client.rate_limiter = RateLimiter(default_per_minute=6000, burst=5)
+    client.retrier.rate_limiter = client.rate_limiter
+    asyncio.run(client._make_request("daily", {}))
+    stats = client.rate_limiter.stats()["daily"]
+    assert len(calls) == 2 and stats["deferrals"] == 1 and stats["max_wait"] >= 0.04
+
+    client, calls = make_client([(429, {}, {"Retry-After": "120"})])
+    try:
+        asyncio.run(client._make_request("daily", {}))
+        raise AssertionError("expected an error")
+    except httpx.HTTPStatusError:
+        pass
+    assert len(calls) == 1 and client.retrier.gave_up == 1
+    print(f"✅ Waited {stats['max_wait']:.3f}s in the rate limiter")
+
+def test_circuit_breaker():
+    """Consecutive failures open the circuit; a probe after the reset timeout closes it"""
+    print("\nTesting circuit breaker...")
+    client, calls = make_client([(502, {}, {})] * 3 + [(200, OK, {})], failure_threshold=3)
+
+    async def run():
+        try:
+            await client._make_request("daily", {})
+            raise AssertionError("expected an error")
+        except CircuitOpenError:
+            pass
+        assert len(calls) == 3
+        try:
+            await client._make_request("daily", {"ts_code": "000002.SZ"})
+            raise AssertionError("expected an error")
+        except CircuitOpenError:
+            pass
+        assert len(calls) == 3
+        # Other endpoints are unaffected
+        await client._make_request("weekly", {})
+        await asyncio.sleep(0.25)
+        await client._make_request("daily", {})
+
+    asyncio.run(run())
+    breaker = client.retrier.stats()["breakers"]["daily"]
+    assert breaker["state"] == "closed" and breaker["trips"] == 1 and breaker["rejected"] == 2
+    print(f"✅ Breaker stats: {breaker}")
+
+def main():
+    test_classification()
+    test_retries_transient_failures()
+    test_fatal_errors_fail_fast()
+    test_retry_after_and_rate_limiter()
+    test_circuit_breaker()
+    print("\n🎉 Retry tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test script for the whole-market screen tool - runs offline against a stubbed cross-section
+"""
+import asyncio
+import json
+import random
+import sys
+from tests_support import offline_server
+from tushare_mcp_server.models import TushareResponse
+from tushare_mcp_server.symbols import SYMBOL_FIELDS
+
+DAILY_FIELDS = ["ts_code", "trade_date", "open", "high", "low", "close", "pre_close", "change", "pct_chg", "vol", "amount"]
+BASIC_FIELDS = ["ts_code", "trade_date", "close", "turnover_rate", "volume_ratio", "pe_ttm", "pb", "total_mv"]
+
+def make_market(n=3000, seed=7):
+    rng = random.Random(seed)
+    daily, basic, stocks = [], [], []
+    for i in range(n):
+        code = f"{600000 + i:06d}.SH"
+        pct = round(rng.uniform(-10, 10), 2)
+        close = round(rng.uniform(2, 200), 2)
+        daily.append([code, "20240105", close, close, close, close, close, 0.0, pct, float(rng.randint(100, 10 ** 6)), 1000.0])
+        if i % 10:
+            basic.append([code, "20240105", close, round(rng.uniform(0.1, 20), 4), 1.0, round(rng.uniform(5, 80), 2), 2.0, float(i)])
+        name = f"ST测试{i}" if i % 50 == 0 else f"测试{i}"
+        industry = "银行" if i % 7 == 0 else "软件"
+        stocks.append([code, code[:6], name, f"cs{i}", "上海", industry, "主板", "SSE", "L", "20000101", None])
+    return daily, basic, stocks
+
+DAILY, BASIC, STOCKS = make_market()
+
+def make_server():
+    calls = []
+
+    async def fake_query(name, params, fields=None):
+        calls.append(name)
+        if name == "daily":
+            items = DAILY if params["trade_date"] == "20240105" else []
+            return TushareResponse(code=0, data={"fields": DAILY_FIELDS, "items": items})
+        if name == "daily_basic":
+            return TushareResponse(code=0, data={"fields": BASIC_FIELDS, "items": BASIC})
+        if name == "stock_basic":
+            items = STOCKS if params["list_status"] == "L" else []
+            return TushareResponse(code=0, data={"fields": SYMBOL_FIELDS.split(","), "items": items})
+        if name == "namechange":
+            return TushareResponse(code=0, data={"fields": ["ts_code", "name", "start_date", "end_date"], "items": []})
+        raise AssertionError(name)
+
+    return offline_server(fake_query), calls
+
+def screen(server, **arguments):
+    result = asyncio.run(server.handle_call_tool("screen", {"trade_date": "20240105", **arguments}))
+    return json.loads(result[0].text)
+
+def test_top_gainers():
+    """Filter, rank and top-k match a plain Python evaluation of the same screen"""
+    print("Testing top gainers...")
+    server, calls = make_server()
+    payload = screen(server, where=["vol > 500000", "industry = 软件"], sort="pct_chg desc", limit=50, exclude_st=True)
+    industry = {row[0]: row[5] for row in STOCKS}
+    expected = sorted(
+        (row for row in DAILY if row[9] > 500000 and industry[row[0]] == "软件" and int(row[0][:6]) % 50),
+        key=lambda row: -row[8],
+    )
+    assert payload["fields"][:3] == ["rank", "ts_code", "name"]
+    assert [row[1] for row in payload["items"]] == [row[0] for row in expected[:50]]
+    assert payload["matched"] == len(expected)
+    assert [row[0] for row in payload["items"][:3]] == [1, 2, 3]
+    assert "daily_basic" not in calls
+    print(f"✅ {len(payload['items'])} of {payload['matched']} matches, best {payload['items'][0][1]}")
+
+def test_top_k_ties():
+    """Rows tied at the top-k cut-off keep their cross-section order, as in the full sort"""
+    print("\nTesting top-k ties...")
+    server, _ = make_server()
+    codes = [row[0] for row in DAILY]
+    for offset in (0, 40):
+        payload = screen(server, sort="amount desc", fields="ts_code", limit=40, offset=offset)
+        assert [row[0] for row in payload["items"]] == codes[offset:offset + 40]
+    # Stocks without daily_basic sort last, behind the tied pb values
+    payload = screen(server, sort="pb", fields="ts_code", limit=40)
+    assert [row[0] for row in payload["items"]] == [row[0] for row in BASIC[:40]]
+    print("✅ Tied rows cut in cross-section order")
+
+def test_daily_basic_join():
+    """Referencing a daily_basic column joins it; stocks without a daily_basic row never match"""
+    print("\nTesting daily_basic join...")
+    server, calls = make_server()
+    payload = screen(server, where=["pe_ttm < 10"], sort="turnover_rate desc, ts_code", fields="ts_code,pe_ttm,turnover_rate")
+    assert payload["fields"] == ["ts_code", "pe_ttm", "turnover_rate"]
+    expected = sorted((row for row in BASIC if row[5] < 10), key=lambda row: (-row[3], row[0]))
+    assert [row[0] for row in payload["items"]] == [row[0] for row in expected][:100]
+    assert calls.count("daily_basic") == 1
+
+    # The decoded cross-section is reused for later screens of the same closed date
+    screen(server, sort="pe_ttm", limit=5)
+    assert calls.count("daily") == 1 and server.screener.stats()["hits"] >= 1
+    print(f"✅ {payload['matched']} low-PE stocks")
+
+def test_errors_and_empty_dates():
+    print("\nTesting errors...")
+    server, _ = make_server()
+    assert screen(server, trade_date="20240106")["items"] == []
+    result = asyncio.run(server.handle_call_tool("screen", {"trade_date": "20240105", "where": ["bogus > 1"]}))
+    assert result[0].text.startswith("Error: Unknown columns: bogus")
+    print("✅ Non-trading dates and unknown columns")
+
+def main():
+    test_top_gainers()
+    test_top_k_ties()
+    test_daily_basic_join()
+    test_errors_and_empty_dates()
+    print("\n🎉 Screener tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script for tool result output formats - runs offline
+"""
+import json
+import sys
+from tushare_mcp_server.serialization import OUTPUT_FORMATS, serialize
+
+DATA = {
+    "fields": ["ts_code", "trade_date", "close"],
+    "items": [["000001.SZ", "20240105", 9.27], ["平安银行", "20240104", None]],
+    "has_more": False,
+}
+
+def test_json_formats():
+    """Compact and pretty JSON decode to the same payload with either backend"""
+    print("Testing JSON formats...")
+    for backend in ("json", "auto"):
+        compact = serialize(DATA, "json", backend)
+        pretty = serialize(DATA, "json_pretty", backend)
+        assert json.loads(compact) == DATA
+        assert json.loads(pretty) == DATA
+        assert len(compact) < len(pretty)
+        assert "平安银行" in compact
+    print("✅ JSON formats round trip")
+
+def test_columns_format():
+    """Columns format holds one list per field"""
+    print("\nTesting columns format...")
+    result = json.loads(serialize(DATA, "columns"))
+    assert result["fields"] == DATA["fields"]
+    assert result["columns"]["close"] == [9.27, None]
+    assert result["has_more"] is False
+    empty = json.loads(serialize({"fields": ["a"], "items": []}, "columns"))
+    assert empty["columns"] == {"a": []}
+    print("✅ Columns format")
+
+def test_delimited_formats():
+    """CSV and TSV include a header row"""
+    print("\nTesting CSV/TSV formats...")
+    assert serialize(DATA, "csv").splitlines() == [
+        "ts_code,trade_date,close", "000001.SZ,20240105,9.27", "平安银行,20240104,",
+    ]
+    assert serialize(DATA, "tsv").splitlines()[0] == "ts_code\ttrade_date\tclose"
+    print("✅ Delimited formats")
+
+def test_unknown_format():
+    """Unknown formats are rejected"""
+    print("\nTesting unknown format...")
+    try:
+        serialize(DATA, "xml")
+    except ValueError as e:
+        print(f"✅ Rejected: {e}")
+    else:
+        raise AssertionError("xml should be rejected")
+    assert "json" in OUTPUT_FORMATS
+
+def main():
+    test_json_formats()
+    test_columns_format()
+    test_delimited_formats()
+    test_unknown_format()
+    print("\n🎉 Serialization tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
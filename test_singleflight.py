@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for request coalescing of identical concurrent calls - runs offline
+"""
+import asyncio
+import sys
+from tushare_mcp_server.models import TushareResponse
+from tushare_mcp_server.singleflight import SingleFlight
+from tushare_mcp_server.tushare_client import TushareClient
+
+def test_shared_result_and_errors():
+    """Concurrent callers share one execution, including its exception"""
+    print("Testing SingleFlight...")
+    flight = SingleFlight()
+    executions = []
+
+    async def work(value):
+        executions.append(value)
+        await asyncio.sleep(0.01)
+        if value == "boom":
+            raise RuntimeError("upstream failed")
+        return value
+
+    async def run():
+        results = await asyncio.gather(*(flight.do("a", lambda: work("ok")) for _ in range(5)))
+        errors = await asyncio.gather(*(flight.do("b", lambda: work("boom")) for _ in range(3)), return_exceptions=True)
+        return results, errors
+
+    results, errors = asyncio.run(run())
+    assert results == ["ok"] * 5
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    assert executions == ["ok", "boom"]
+    assert flight.stats() == {"calls": 8, "executed": 2, "coalesced": 6, "inflight": 0}
+    print(f"✅ Stats: {flight.stats()}")
+
+def test_cancelled_caller_does_not_cancel_others():
+    """Cancelling one waiter leaves the shared call running"""
+    print("\nTesting cancellation...")
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return 42
+
+    async def run():
+        first = asyncio.ensure_future(flight.do("k", work))
+        second = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == 42
+    print("✅ Shared call survived cancellation")
+
+def test_client_coalesces_identical_requests():
+    """TushareClient sends one upstream request for identical concurrent calls"""
+    print("\nTesting TushareClient coalescing...")
+    client = TushareClient(token="test_token")
+    upstream = []
+
+    async def fake_fetch(api_name, params, fields, use_cache):
+        upstream.append((api_name, dict(params)))
+        await asyncio.sleep(0.01)
+        return TushareResponse(code=0, data={"fields": ["con_code"], "items": [["600519.SH"]]})
+
+    client._fetch = fake_fetch
+
+    async def run():
+        same = [client.get_index_weight({"index_code": "399300.SZ", "trade_date": "20240105"}) for _ in range(4)]
+        other = [client.get_index_weight({"index_code": "000300.SH", "trade_date": "20240105"})]
+        return await asyncio.gather(*same, *other)
+
+    responses = asyncio.run(run())
+    assert len(upstream) == 2
+    assert responses[0] is responses[3]
+    assert client.singleflight.coalesced == 3
+    print(f"✅ 5 calls, {len(upstream)} upstream requests, {client.singleflight.coalesced} coalesced")
+
+def main():
+    test_shared_result_and_errors()
+    test_cancelled_caller_does_not_cancel_others()
+    test_client_coalesces_identical_requests()
+    print("\n🎉 Coalescing tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Test script for incremental parsing of Tushare responses - runs offline
+"""
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import httpx
+from tushare_mcp_server.cache import ResponseCache
+from tushare_mcp_server.rate_limiter import RateLimiter
+from tushare_mcp_server.retry import RequestFailed, Retrier, RetryPolicy
+from tushare_mcp_server.streaming import IncompleteResponse, ResponseStreamParser
+from tushare_mcp_server.token_pool import TokenPool
+from tushare_mcp_server.transports import Transport
+from tushare_mcp_server.tushare_client import TushareClient
+
+BODY = {
+    "request_id": "abc",
+    "code": 0,
+    "msg": "",
+    "data": {
+        "fields": ["ts_code", "name", "close", "flag"],
+        "items": [[f"{i:06d}.SZ", f"平安银行[{i}]\\\"", i * 1.5 if i % 7 else None, i % 2 == 0] for i in range(500)],
+        "has_more": False,
+    },
+}
+
+def _chunks(raw: bytes, seed: int):
+    rng = random.Random(seed)
+    i = 0
+    while i < len(raw):
+        step = rng.randint(1, 64)
+        yield raw[i:i + step]
+        i += step
+
+def test_random_chunk_boundaries():
+    """Rows match json.loads regardless of where chunks split, including inside UTF-8 characters"""
+    print("Testing random chunk boundaries...")
+    raw = json.dumps(BODY, ensure_ascii=False).encode("utf-8")
+    for seed in range(20):
+        parser = ResponseStreamParser()
+        rows = []
+        for chunk in _chunks(raw, seed):
+            rows.extend(parser.feed(chunk))
+        rows.extend(parser.close())
+        assert rows == BODY["data"]["items"]
+        assert parser.fields == BODY["data"]["fields"]
+        assert parser.code == 0 and parser.has_more is False
+    print(f"✅ {len(rows)} rows parsed across 20 chunkings")
+
+def test_error_and_truncated_bodies():
+    """Error responses expose code/msg; truncated bodies raise"""
+    print("\nTesting error and truncated bodies...")
+    parser = ResponseStreamParser()
+    parser.feed(b'{"code": 40203, "msg": "\xe6\x8a\xb1\xe6\xad\x89", "data": null}')
+    parser.close()
+    assert parser.code == 40203 and parser.msg == "抱歉" and not parser.has_data
+
+    parser = ResponseStreamParser()
+    parser.feed(b'{"code": 0, "data": {"fields": ["a"], "items": [[1], [2')
+    try:
+        parser.close()
+    except (IncompleteResponse, ValueError):
+        print("✅ Truncated body rejected")
+    else:
+        raise AssertionError("truncated body accepted")
+
+def test_client_iter_rows():
+    """TushareClient.iter_rows yields batches from a streamed HTTP body"""
+    print("\nTesting TushareClient.iter_rows...")
+    raw = json.dumps(BODY, ensure_ascii=False).encode("utf-8")
+
+    async def body():
+        for chunk in _chunks(raw, 1):
+            yield chunk
+
+    async def handler(request):
+        return httpx.Response(200, content=body())
+
+    client = TushareClient(token="test_token")
+    client.cache = None
+    client._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def run():
+        batches = [rows async for _, rows in client.iter_rows("daily", {}, batch_size=128)]
+        table = await client.fetch_columnar("daily", {})
+        await client.close()
+        return batches, table
+
+    batches, table = asyncio.run(run())
+    assert [len(b) for b in batches] == [128, 128, 128, 116]
+    assert table.to_dict()["items"] == BODY["data"]["items"]
+    print(f"✅ {len(batches)} batches, columnar table with {len(table)} rows")
+
+class FlakyTransport(Transport):
+    """Streams BODY in small chunks; answer(token, attempt) may raise or return an error body first"""
+
+    def __init__(self, answer=None):
+        self.answer = answer
+        self.calls = []
+
+    async def post(self, url, request):
+        raise AssertionError("streaming requests should not post")
+
+    async def stream(self, url, request):
+        self.calls.append(request["token"])
+        body = self.answer(request["token"], len(self.calls)) if self.answer else None
+        raw = json.dumps(body or BODY, ensure_ascii=False).encode("utf-8")
+        for chunk in _chunks(raw, len(self.calls)):
+            yield chunk
+
+def streaming_client(transport):
+    client = TushareClient(token="test_token")
+    client.cache = None
+    client.rate_limiter = None
+    client.retrier = Retrier(RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.01))
+    client.transport = transport
+    return client
+
+def test_stream_retry_and_failover():
+    """Failures before the first batch are retried and quota errors move to another token"""
+    print("\nTesting streamed retries and token failover...")
+
+    def flaky(token, attempt):
+        if attempt == 1:
+            raise RequestFailed("connection reset")
+
+    transport = FlakyTransport(flaky)
+    client = streaming_client(transport)
+    rows = asyncio.run(client.fetch_columnar("daily", {}))
+    assert len(transport.calls) == 2 and len(rows) == len(BODY["data"]["items"])
+
+    def quota(token, attempt):
+        if token == "gold":
+            return {"code": 40203, "msg": "抱歉，您每天最多访问该接口20次", "data": None}
+
+    transport = FlakyTransport(quota)
+    client = streaming_client(transport)
+    client.token_pool = TokenPool({"gold": 2000, "platinum": 5000}, lambda: RateLimiter(default_per_minute=6000, burst=2))
+
+    async def run():
+        batches = []
+        for _ in range(3):
+            batches.append([rows async for _, rows in client.iter_rows("daily", {}, batch_size=128)])
+        return batches
+
+    runs = asyncio.run(run())
+    assert all(sum(len(b) for b in batches) == 500 for batches in runs)
+    assert transport.calls.count("gold") == 1 and client.token_pool.stats()["failovers"] == 1
+    print(f"✅ Retried a reset stream, token calls: {transport.calls}")
+
+def test_query_columnar_cache():
+    """query_columnar streams into columns once and then serves the table from the response cache"""
+    print("\nTesting query_columnar with the response cache...")
+    transport = FlakyTransport()
+    client = streaming_client(transport)
+    client.cache = ResponseCache(os.path.join(tempfile.mkdtemp(), "responses.sqlite3"))
+    client._calendar_retry_at = float("inf")
+
+    async def run():
+        first = await client.query_columnar("daily", {"ts_code": "000001.SZ", "trade_date": "20240105"})
+        again = await client.query_columnar("daily", {"trade_date": "20240105", "ts_code": "000001.SZ"})
+        await client.close()
+        return first, again
+
+    first, again = asyncio.run(run())
+    assert len(transport.calls) == 1
+    assert first.to_dict()["items"] == again.to_dict()["items"] == BODY["data"]["items"]
+    print(f"✅ {len(again)} rows, one upstream stream")
+
+def main():
+    test_random_chunk_boundaries()
+    test_error_and_truncated_bodies()
+    test_client_iter_rows()
+    test_stream_retry_and_failover()
+    test_query_columnar_cache()
+    print("\n🎉 Streaming tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
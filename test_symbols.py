@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for the in-memory symbol index and resolve_symbol - runs offline against stubbed stock_basic/namechange
+"""
+import asyncio
+import json
+import sys
+import time
+from tests_support import offline_server
+from tushare_mcp_server.models import TushareResponse
+from tushare_mcp_server.symbols import SYMBOL_FIELDS, SymbolIndex
+
+BASIC = {
+    "L": [
+        ["000001.SZ", "000001", "平安银行", "payh", "深圳", "银行", "主板", "SZSE", "L", "19910403", None],
+        ["000002.SZ", "000002", "万科A", "wka", "深圳", "全国地产", "主板", "SZSE", "L", "19910129", None],
+        ["600848.SH", "600848", "上海临港", "shlg", "上海", "园区开发", "主板", "SSE", "L", "19940324", None],
+        ["601318.SH", "601318", "中国平安", "zgpa", "深圳", "保险", "主板", "SSE", "L", "20070301", None],
+        ["300750.SZ", "300750", "宁德时代", "ndsd", "福建", "电气设备", "创业板", "SZSE", "L", "20180611", None],
+    ],
+    "D": [["000003.SZ", "000003", "PT金田A", "ptjta", "深圳", "其他", "主板", "SZSE", "D", "19910703", "20020614"]],
+    "P": [],
+}
+NAMECHANGE = [
+    ["600848.SH", "上海临港", "20151118", None],
+    ["600848.SH", "自仪股份", "20070514", "20151117"],
+    ["600848.SH", "ST自仪", "20061026", "20070513"],
+    ["000001.SZ", "深发展A", "19910403", "20120801"],
+]
+
+def make_server():
+    calls = []
+
+    async def fake_query(name, params, fields=None):
+        calls.append(name)
+        if name == "stock_basic":
+            return TushareResponse(code=0, data={"fields": SYMBOL_FIELDS.split(","), "items": BASIC[params["list_status"]]})
+        if name == "namechange":
+            items = NAMECHANGE[params["offset"]:params["offset"] + params["limit"]]
+            return TushareResponse(code=0, data={"fields": ["ts_code", "name", "start_date", "end_date"], "items": items})
+        raise AssertionError(name)
+
+    return offline_server(fake_query), calls
+
+def resolve(server, **arguments):
+    result = asyncio.run(server.handle_call_tool("resolve_symbol", arguments))
+    payload = json.loads(result[0].text)
+    return [dict(zip(payload["fields"], item)) for item in payload["items"]]
+
+def test_lookups():
+    """Codes, name prefixes, substrings, pinyin and former names all resolve"""
+    print("Testing symbol lookups...")
+    server, calls = make_server()
+    assert resolve(server, query="000001")[0]["ts_code"] == "000001.SZ"
+    assert resolve(server, query="600848.sh")[0]["match"] == "exact"
+    assert [r["ts_code"] for r in resolve(server, query="平安")] == ["000001.SZ", "601318.SH"]
+    assert resolve(server, query="平安")[1]["match"] == "contains"
+    assert resolve(server, query="万科Ａ")[0]["ts_code"] == "000002.SZ"
+    assert resolve(server, query="NDSD")[0]["matched_on"] == "cnspell"
+    former = resolve(server, query="自仪股份")[0]
+    assert former["ts_code"] == "600848.SH" and former["matched_on"] == "former_name" and former["name"] == "上海临港"
+    assert resolve(server, query="深发展")[0]["ts_code"] == "000001.SZ"
+    assert [r["ts_code"] for r in resolve(server, query="6008")] == ["600848.SH"]
+    # Only the first lookup touched upstream: three listing statuses and one namechange page
+    assert sorted(calls) == ["namechange", "stock_basic", "stock_basic", "stock_basic"]
+    print(f"✅ Lookups served from {server.symbols.stats()['stocks']} stocks")
+
+def test_filters_and_batch():
+    """Exchange/market/list_status filters and comma-separated terms"""
+    print("\nTesting filters...")
+    server, _ = make_server()
+    assert [r["ts_code"] for r in resolve(server, query="平安", exchange="SSE")] == ["601318.SH"]
+    assert resolve(server, query="金田", list_status="L") == []
+    assert resolve(server, query="金田", list_status="D,P")[0]["delist_date"] == "20020614"
+    assert [r["ts_code"] for r in resolve(server, query="宁德", market="创业板")] == ["300750.SZ"]
+    rows = resolve(server, query="万科A,宁德时代", fields="query,ts_code")
+    assert [(r["query"], r["ts_code"]) for r in rows] == [("万科A", "000002.SZ"), ("宁德时代", "300750.SZ")]
+    print("✅ Filters")
+
+def test_lookup_speed():
+    """Lookups on a 6000-stock universe stay well below a millisecond"""
+    print("\nTesting lookup speed...")
+    items = [[f"{i:06d}.SZ", f"{i:06d}", f"测试{i}号科技", f"cs{i}", "深圳", "软件", "主板", "SZSE", "L", "20000101", None] for i in range(6000)]
+    index = SymbolIndex({"fields": SYMBOL_FIELDS.split(","), "items": items})
+    start = time.perf_counter()
+    for term in ("003000", "测试12", "cs599", "5999号"):
+        for _ in range(100):
+            index.resolve([term])
+    per_lookup = (time.perf_counter() - start) / 400
+    assert index.resolve(["5999号"])["items"][0][1] == "005999.SZ"
+    assert per_lookup < 0.005
+    print(f"✅ {per_lookup * 1e6:.0f}µs per lookup")
+
+def test_scheduled_refresh():
+    """The scheduled task reloads a loaded index without any lookup arriving"""
+    print("\nTesting scheduled refresh...")
+    server, calls = make_server()
+    store = server.symbols
+
+    async def run():
+        await store.get()
+        store.refresh_interval = 0.05
+        store.start()
+        # An idle server: no lookups, only the schedule
+        await asyncio.sleep(1.3)
+        loads = store.loads
+        await store.stop()
+        return loads
+
+    loads = asyncio.run(run())
+    assert loads >= 2 and store._scheduled is None
+    print(f"✅ {loads} loads with a single lookup")
+
+def main():
+    test_lookups()
+    test_filters_and_batch()
+    test_lookup_speed()
+    test_scheduled_refresh()
+    print("\n🎉 Symbol index tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for the multi-token pool and quota-aware routing - runs offline against a mock transport
+"""
+import asyncio
+import json
+import sys
+import httpx
+from tushare_mcp_server.rate_limiter import RateLimiter
+from tushare_mcp_server.retry import QuotaExhausted, Retrier, RetryPolicy
+from tushare_mcp_server.token_pool import TokenPool
+from tushare_mcp_server.tushare_client import TushareClient
+
+BASIC = "basic-token-0000000001"
+GOLD = "gold-token-00000000002"
+PLATINUM = "platinum-token-0000003"
+
+OK = {"code": 0, "msg": "", "data": {"fields": ["ts_code"], "items": [["000001.SZ"]]}}
+
+def make_client(tokens, answer=None, per_minute=6000):
+    """Client with a token pool; answer(token, api_name) returns the response body"""
+    calls = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        calls.append((body["token"], body["api_name"]))
+        return httpx.Response(200, json=(answer or (lambda t, a: OK))(body["token"], body["api_name"]))
+
+    client = TushareClient(token="unused")
+    client.cache = None
+    client.singleflight = None
+    client.rate_limiter = None
+    client.token_pool = TokenPool(tokens, lambda: RateLimiter(default_per_minute=per_minute, burst=2))
+    client.retrier = Retrier(RetryPolicy(max_attempts=2, base_delay=0.01, max_delay=1.0))
+    client._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client, calls
+
+def test_tier_routing():
+    """Endpoints that need 2000+ points only go to tokens with that tier"""
+    print("Testing point-tier routing...")
+    client, calls = make_client({BASIC: 120, GOLD: 2000})
+
+    async def run():
+        await asyncio.gather(*(client._make_request("weekly", {"trade_date": f"202401{d:02d}"}) for d in range(1, 7)))
+        await asyncio.gather(*(client._make_request("daily", {"trade_date": f"202401{d:02d}"}) for d in range(1, 7)))
+
+    asyncio.run(run())
+    assert {token for token, api in calls if api == "weekly"} == {GOLD}
+    daily = [token for token, api in calls if api == "daily"]
+    assert daily.count(BASIC) == 3 and daily.count(GOLD) == 3
+
+    client, _ = make_client({BASIC: 120})
+    try:
+        asyncio.run(client._make_request("index_weight", {}))
+        raise AssertionError("expected an error")
+    except ValueError as e:
+        assert "2000+" in str(e)
+    print(f"✅ weekly on gold only, daily split {daily.count(BASIC)}/{daily.count(GOLD)}")
+
+def test_balances_by_budget():
+    """The token with the most per-minute budget left takes the next call"""
+    print("\nTesting budget balancing...")
+    pool = TokenPool({GOLD: 2000, PLATINUM: 5000}, lambda: RateLimiter(default_per_minute=600, burst=5))
+
+    async def run():
+        for _ in range(3):
+            await pool.tokens[0].limiter.acquire("daily")
+        return [(await pool.acquire("daily")).token for _ in range(4)]
+
+    order = asyncio.run(run())
+    # platinum starts with 5 calls of budget against gold's 2
+    assert order[:3] == [PLATINUM, PLATINUM, PLATINUM]
+    print(f"✅ Order: {[t.split('-')[0] for t in order]}")
+
+def test_quota_failover():
+    """Quota and permission errors bench the token and the call moves on"""
+    print("\nTesting quota failover...")
+
+    def answer(token, api_name):
+        if token == GOLD and api_name == "daily":
+            return {"code": 40203, "msg": "抱歉，您每天最多访问该接口20次", "data": None}
+        if token == PLATINUM and api_name == "weekly":
+            return {"code": 40203, "msg": "抱歉，您没有访问该接口的权限", "data": None}
+        return OK
+
+    client, calls = make_client({GOLD: 2000, PLATINUM: 5000}, answer)
+
+    async def run():
+        for d in range(1, 5):
+            await client._make_request("daily", {"trade_date": f"202401{d:02d}"})
+            await client._make_request("weekly", {"trade_date": f"202401{d:02d}"})
+
+    asyncio.run(run())
+    assert [t for t, a in calls if a == "daily"].count(GOLD) == 1
+    assert [t for t, a in calls if a == "weekly"].count(PLATINUM) == 1
+    stats = client.token_pool.stats()
+    assert stats["failovers"] == 2
+    assert stats["tokens"][0]["benched"]["daily"] > 0
+    assert stats["tokens"][1]["benched"] == {"weekly": None}
+    print(f"✅ Failovers: {stats['failovers']}, tokens: {stats['tokens']}")
+
+def test_all_tokens_exhausted():
+    """When every eligible token is out of quota the error says so and names a retry time"""
+    print("\nTesting exhausted pool...")
+    client, calls = make_client({GOLD: 2000}, lambda t, a: {"code": 40203, "msg": "抱歉，您每天最多访问该接口20次", "data": None})
+    try:
+        asyncio.run(client._make_request("daily", {}))
+        raise AssertionError("expected an error")
+    except QuotaExhausted as e:
+        assert "No Tushare token can call daily" in str(e) and e.retry_after > 0
+    assert len(calls) == 1
+    print("✅ Exhausted pool fails without further upstream calls")
+
+def main():
+    test_tier_routing()
+    test_balances_by_budget()
+    test_quota_failover()
+    test_all_tokens_exhausted()
+    print("\n🎉 Token pool tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
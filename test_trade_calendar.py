@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for the local trade calendar engine - runs offline
+"""
+import asyncio
+import sys
+from tushare_mcp_server.chunking import iter_dates, is_weekday, plan_chunks
+from tushare_mcp_server.models import TushareResponse
+from tushare_mcp_server.trade_calendar import TradeCalendar
+from tushare_mcp_server.tushare_client import TushareClient
+
+# 2024 Spring Festival closure on the SSE: 20240209 - 20240216
+HOLIDAYS = {"20240101"} | set(iter_dates("20240209", "20240216"))
+
+def make_calendar() -> TradeCalendar:
+    days = [(d, is_weekday(d) and d not in HOLIDAYS) for d in iter_dates("20231201", "20240331")]
+    return TradeCalendar(days)
+
+def test_lookups():
+    """is-open, previous/next and range counts"""
+    print("Testing calendar lookups...")
+    cal = make_calendar()
+    assert cal.is_open("20240102")
+    assert not cal.is_open("20240101")
+    assert not cal.is_open("20240210")
+    assert cal.previous_trading_day("20240219") == "20240208"
+    assert cal.next_trading_day("20240208") == "20240219"
+    assert cal.snap_back("20240211") == "20240208"
+    assert cal.count("20240101", "20240131") == 22
+    assert cal.count("20240201", "20240229") == 15
+    assert cal.trading_days("20240206", "20240220") == ["20240206", "20240207", "20240208", "20240219", "20240220"]
+    print("✅ Lookups match the exchange calendar")
+
+def test_period_ends():
+    """Weekly and monthly dates snap to the last trading day of the period"""
+    print("\nTesting period ends...")
+    cal = make_calendar()
+    assert cal.period_end("20240103", "W") == "20240105"
+    assert cal.period_end("20240206", "W") == "20240208"
+    assert cal.period_end("20240210", "W") == "20240208"
+    assert cal.period_end("20240215", "W") is None
+    assert cal.period_end("20240201", "M") == "20240229"
+    print("✅ Period ends")
+
+def test_windows_use_calendar():
+    """Chunk planning counts real trading days"""
+    print("\nTesting chunk windows...")
+    cal = make_calendar()
+    windows = cal.windows("20240201", "20240229", 5)
+    assert windows[1] == ("20240208", "20240222")
+    assert sum(cal.count(a, b) for a, b in windows) == 15
+    codes = ",".join(f"{i:06d}.SZ" for i in range(1, 401))
+    chunks = plan_chunks("daily", {"ts_code": codes, "start_date": "20240101", "end_date": "20240229"}, cal)
+    # 37 trading days per code -> 162 codes per call
+    assert len(chunks) == 3
+    print(f"✅ Windows: {windows}")
+
+def test_client_skips_and_snaps():
+    """Non-trading dates skip the upstream call, weekly dates are snapped"""
+    print("\nTesting client integration...")
+    client = TushareClient(token="test_token")
+    sent = []
+
+    async def fake_make_request(api_name, params, fields=None, use_cache=True):
+        sent.append((api_name, params))
+        return TushareResponse(code=0, data={"fields": ["ts_code"], "items": []})
+
+    async def fake_calendar():
+        return make_calendar()
+
+    client._make_request = fake_make_request
+    client.get_calendar = fake_calendar
+
+    async def run():
+        empty = await client.get_daily({"trade_date": "20240210"})
+        await client.get_weekly({"ts_code": "000001.SZ", "trade_date": "20240207"})
+        return empty
+
+    empty = asyncio.run(run())
+    assert empty.data["items"] == []
+    assert sent == [("weekly", {"ts_code": "000001.SZ", "trade_date": "20240208"})]
+    print("✅ Skipped holiday request and snapped weekly date")
+
+def main():
+    test_lookups()
+    test_period_ends()
+    test_windows_use_calendar()
+    test_client_skips_and_snaps()
+    print("\n🎉 Trade calendar tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test script for record/replay transports - runs offline against a mock transport and temporary fixtures
+"""
+import asyncio
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+import httpx
+from tushare_mcp_server.retry import Retrier, RetryPolicy
+from tushare_mcp_server.transports import (
+    FIXTURE_SUFFIX, FixtureMissing, HTTPTransport, RecordingTransport, ReplayTransport, Transport, request_key,
+)
+from tushare_mcp_server.tushare_client import TushareClient
+
+FIELDS = ["ts_code", "trade_date", "close"]
+URL = "https://api.tushare.pro"
+
+def body_for(params):
+    return {"code": 0, "msg": "", "data": {"fields": FIELDS, "items": [[params.get("ts_code"), params.get("trade_date"), 10.5]]}}
+
+def make_client(transport, token="test"):
+    client = TushareClient(token=token)
+    client.cache = None
+    client.rate_limiter = None
+    client.retrier = Retrier(RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.01))
+    client.transport = transport
+    return client
+
+def http_transport(calls):
+    def handler(request):
+        payload = json.loads(request.content)
+        calls.append(payload)
+        return httpx.Response(200, json=body_for(payload["params"]))
+
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return HTTPTransport(lambda: http)
+
+def test_record_then_replay():
+    """Recorded responses replay without network or token, keyed by normalized params"""
+    print("Testing record and replay...")
+    path = tempfile.mkdtemp()
+    calls = []
+    params = {"ts_code": "000001.SZ", "trade_date": "20240105"}
+
+    async def record():
+        async with make_client(RecordingTransport(http_transport(calls), path)) as client:
+            first = await client._make_request("daily", params, "ts_code,trade_date,close")
+            rows = [row async for _, batch in client.iter_rows("daily", {"ts_code": "600000.SH"}) for row in batch]
+            return first, rows
+
+    first, streamed = asyncio.run(record())
+    assert len(calls) == 2 and os.path.exists(os.path.join(path, "daily" + FIXTURE_SUFFIX))
+    with gzip.open(os.path.join(path, "daily" + FIXTURE_SUFFIX), "rt", encoding="utf-8") as f:
+        assert '"token"' not in f.read()
+
+    async def replay():
+        async with make_client(ReplayTransport(path), token="") as client:
+            # Same request with reordered params and spaced fields hits the same fixture
+            again = await client._make_request("daily", {"trade_date": "20240105", "ts_code": "000001.SZ"}, "ts_code, trade_date, close")
+            table = await client.fetch_columnar("daily", {"ts_code": "600000.SH"})
+            return again, table, client.transport.stats()
+
+    again, table, stats = asyncio.run(replay())
+    assert again.data == first.data
+    assert table.to_dict()["items"] == streamed == [["600000.SH", None, 10.5]]
+    assert stats["hits"] == 2 and stats["indexed"] == 2 and len(calls) == 2
+    print(f"✅ {stats['indexed']} fixtures replayed with no HTTP calls")
+
+def test_missing_and_latency():
+    """Unrecorded requests fail at once; replay latency is simulated"""
+    print("\nTesting misses and simulated latency...")
+    path = tempfile.mkdtemp()
+    transport = ReplayTransport(path, latency=0.05)
+    client = make_client(transport)
+    try:
+        asyncio.run(client._make_request("daily", {"trade_date": "20240105"}))
+    except FixtureMissing as e:
+        assert "No recorded response for daily" in str(e)
+    else:
+        raise AssertionError("missing fixture replayed")
+    assert transport.misses == 1
+
+    asyncio.run(RecordingTransport(http_transport([]), path).post(URL, {"api_name": "daily", "params": {"trade_date": "20240105"}, "fields": None}))
+    transport = ReplayTransport(path, latency=0.05)
+    start = time.perf_counter()
+    asyncio.run(make_client(transport)._make_request("daily", {"trade_date": "20240105"}))
+    assert time.perf_counter() - start >= 0.05
+    print("✅ Misses raise FixtureMissing, latency applied")
+
+def test_large_fixture_index():
+    """Tens of thousands of recorded calls index once and look up in constant time"""
+    print("\nTesting large fixture files...")
+    path = tempfile.mkdtemp()
+    count = 20000
+    recorder = RecordingTransport(http_transport([]), path)
+
+    async def record():
+        for i in range(count):
+            await recorder.post(URL, {"api_name": "daily", "params": {"ts_code": f"{i:06d}.SZ"}, "fields": None})
+        await recorder.close()
+
+    asyncio.run(record())
+    replay = ReplayTransport(path)
+    start = time.perf_counter()
+    replay.lookup({"api_name": "daily", "params": {"ts_code": "000000.SZ"}})
+    index_ms = (time.perf_counter() - start) * 1000
+
+    requests = [{"api_name": "daily", "params": {"ts_code": f"{i:06d}.SZ"}} for i in range(0, count, 7)]
+    start = time.perf_counter()
+    for request in requests:
+        replay.lookup(request)
+    per_lookup_us = (time.perf_counter() - start) / len(requests) * 1e6
+    assert replay.stats()["indexed"] == count and per_lookup_us < 200
+    print(f"✅ Indexed {count} calls in {index_ms:.0f}ms, {per_lookup_us:.1f}µs per lookup")
+
+def test_concurrent_recording():
+    """Concurrent recordings are written off the event loop without interleaving lines"""
+    print("\nTesting concurrent recording...")
+    path = tempfile.mkdtemp()
+    recorder = RecordingTransport(http_transport([]), path)
+    ticks = 0
+
+    async def ticker(stop):
+        nonlocal ticks
+        while not stop.is_set():
+            ticks += 1
+            await asyncio.sleep(0)
+
+    async def record():
+        stop = asyncio.Event()
+        task = asyncio.create_task(ticker(stop))
+        await asyncio.gather(*(
+            recorder.post(URL, {"api_name": api, "params": {"ts_code": f"{i:06d}.SZ"}, "fields": None})
+            for i in range(50) for api in ("daily", "weekly")
+        ))
+        stop.set()
+        await task
+        await recorder.close()
+
+    asyncio.run(record())
+    replay = ReplayTransport(path)
+    for api in ("daily", "weekly"):
+        for i in range(50):
+            assert replay.lookup({"api_name": api, "params": {"ts_code": f"{i:06d}.SZ"}})
+    assert recorder.recorded == 100 and ticks > 0
+    try:
+        Transport()
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("Transport without post instantiated")
+    print(f"✅ 100 records written while the loop ticked {ticks} times")
+
+def test_truncated_fixture():
+    """A recording cut off mid-write still replays its complete records"""
+    print("\nTesting truncated fixtures...")
+    path = tempfile.mkdtemp()
+    recorder = RecordingTransport(http_transport([]), path)
+    for code in ("000001.SZ", "000002.SZ"):
+        asyncio.run(recorder.post(URL, {"api_name": "daily", "params": {"ts_code": code}, "fields": None}))
+    # Never closed: the gzip trailer is missing, as after a crash
+    replay = ReplayTransport(path)
+    request = {"api_name": "daily", "params": {"ts_code": "000002.SZ"}, "fields": None}
+    assert replay.lookup(request) and request_key(request) in replay._index["daily"]
+    print("✅ Flushed records survive a missing trailer")
+
+def main():
+    test_record_then_replay()
+    test_missing_and_latency()
+    test_large_fixture_index()
+    test_concurrent_recording()
+    test_truncated_fixture()
+    print("\n🎉 Transport tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
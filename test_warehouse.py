@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Test script for the local OHLCV warehouse - runs offline against a fake client
+"""
+import asyncio
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from tushare_mcp_server.chunking import iter_dates, is_weekday
+from tushare_mcp_server.models import TushareResponse
+from tushare_mcp_server.trade_calendar import TradeCalendar
+from tushare_mcp_server.warehouse import BAR_FIELDS, Warehouse
+import tushare_mcp_server.warehouse as warehouse_module
+
+CODES = ["000001.SZ", "600000.SH"]
+
+def bar(code, day):
+    price = int(day[-2:]) + (0 if code.endswith("SZ") else 100)
+    return [code, day, price, price + 1, price - 1, price + 0.5, price, 0.5, 1.0, 1000.0, 10000.0]
+
+class FakeClient:
+    """Serves synthetic bars and records upstream calls"""
+
+    def __init__(self):
+        self.calls = []
+        days = [(d, is_weekday(d)) for d in iter_dates("20240101", "20240331")]
+        self.calendar = TradeCalendar(days)
+
+    async def get_calendar(self):
+        return self.calendar
+
+    async def get_daily(self, params, fields=None):
+        self.calls.append(("daily", dict(params), fields))
+        if params.get("trade_date"):
+            days = [params["trade_date"]]
+        else:
+            days = self.calendar.trading_days(params["start_date"], params["end_date"])
+        codes = params["ts_code"].split(",") if params.get("ts_code") else CODES
+        items = [bar(code, day) for code in codes for day in days]
+        if fields:
+            wanted = fields.split(",")
+            items = [[row[BAR_FIELDS.index(f)] for f in wanted] for row in items]
+            return TushareResponse(code=0, data={"fields": wanted, "items": items})
+        return TushareResponse(code=0, data={"fields": BAR_FIELDS, "items": items})
+
+    async def get_index_daily(self, params, fields=None):
+        return await self.get_daily(params, fields)
+
+class NoCalendarClient(FakeClient):
+    """A client whose trade calendar could not be loaded"""
+
+    async def get_calendar(self):
+        return None
+
+    async def get_weekly(self, params, fields=None):
+        self.calls.append(("weekly", dict(params), fields))
+        return TushareResponse(code=0, data={"fields": BAR_FIELDS, "items": [bar("000001.SZ", "20240105")]})
+
+def _warehouse() -> Warehouse:
+    return Warehouse(os.path.join(tempfile.mkdtemp(), "warehouse.sqlite3"))
+
+@contextmanager
+def closed_through(day):
+    """Pretend bars are final through day"""
+    original = warehouse_module.last_closed_date
+    warehouse_module.last_closed_date = lambda: day
+    try:
+        yield
+    finally:
+        warehouse_module.last_closed_date = original
+
+def test_incremental_market_sync():
+    """Market sync fetches each trading date once and advances the watermark"""
+    print("Testing incremental market sync...")
+    wh = _warehouse()
+    client = FakeClient()
+    with closed_through("20240112"):
+        rows = asyncio.run(wh.sync(client, "daily", "20240101", concurrency=3))
+    assert rows == 2 * 10
+    assert wh.coverage("daily", "*") == ("20240101", "20240112")
+    assert len(client.calls) == 10
+
+    client.calls.clear()
+    with closed_through("20240116"):
+        rows = asyncio.run(wh.sync(client, "daily", "20240101"))
+    assert [c[1]["trade_date"] for c in client.calls] == ["20240115", "20240116"]
+    assert wh.coverage("daily", "*") == ("20240101", "20240116")
+    print(f"✅ Watermark at {wh.coverage('daily', '*')[1]}")
+    wh.close()
+
+def test_serve_local_and_gaps():
+    """Covered ranges are served locally; uncovered dates fall back to the API"""
+    print("\nTesting local serving...")
+    wh = _warehouse()
+    client = FakeClient()
+    with closed_through("20240112"):
+        asyncio.run(wh.sync(client, "daily", "20240108"))
+    client.calls.clear()
+
+    params = {"ts_code": "000001.SZ", "start_date": "20240108", "end_date": "20240110"}
+    assert wh.supports("daily", params)
+    local = asyncio.run(wh.get("daily", params, None, client))
+    assert client.calls == []
+    assert local.data["fields"] == BAR_FIELDS
+    assert [row[1] for row in local.data["items"]] == ["20240110", "20240109", "20240108"]
+
+    params = {"ts_code": "000001.SZ", "start_date": "20240104", "end_date": "20240115"}
+    mixed = asyncio.run(wh.get("daily", params, "trade_date,close", client))
+    assert [c[1]["start_date"] for c in client.calls] == ["20240104", "20240113"]
+    assert mixed.data["fields"] == ["trade_date", "close"]
+    assert [row[0] for row in mixed.data["items"]][:2] == ["20240115", "20240112"]
+    assert len(mixed.data["items"]) == 8
+
+    assert not wh.supports("daily", {"ts_code": "000001.SZ", "start_date": "20230101", "end_date": "20230131"})
+    assert not wh.supports("stock_basic", {})
+    print(f"✅ Stats: {wh.stats()['local_hits']} local, {wh.stats()['partial_hits']} partial")
+    wh.close()
+
+def test_index_sync_per_code():
+    """Index endpoints keep one watermark per code"""
+    print("\nTesting per-code index sync...")
+    wh = _warehouse()
+    client = FakeClient()
+    with closed_through("20240105"):
+        asyncio.run(wh.sync(client, "index_daily", "20240101", ["000001.SH"]))
+    assert wh.coverage("index_daily", "000001.SH") == ("20240101", "20240105")
+    assert wh.supports("index_daily", {"ts_code": "000001.SH", "trade_date": "20240103"})
+    assert not wh.supports("index_daily", {"ts_code": "399300.SZ", "trade_date": "20240103"})
+    print("✅ Index coverage tracked per code")
+    wh.close()
+
+def test_sync_without_calendar():
+    """Without a trade calendar weekly sync stores nothing and claims no coverage"""
+    print("\nTesting weekly sync without a calendar...")
+    wh = _warehouse()
+    client = NoCalendarClient()
+    with closed_through("20240112"):
+        assert asyncio.run(wh.sync(client, "weekly", "20240101")) == 0
+    assert wh.coverage("weekly", "*") is None
+    params = {"trade_date": "20240105"}
+    assert not wh.supports("weekly", params)
+    assert asyncio.run(wh.get("weekly", params, None, client)).data["items"]
+    assert [c[0] for c in client.calls] == ["weekly"]
+    print("✅ Requests still go to the API")
+    wh.close()
+
+def test_mid_week_trade_date():
+    """A mid-week weekly trade_date is snapped to the week's last trading day, like on the API path"""
+    print("\nTesting weekly trade_date snapping...")
+    wh = _warehouse()
+    client = FakeClient()
+    with closed_through("20240112"):
+        asyncio.run(wh.sync(client, "daily", "20240101"))
+    client.calls.clear()
+    params = {"trade_date": "20240110"}
+    assert wh.supports("weekly", params)
+    weekly = asyncio.run(wh.get("weekly", params, "ts_code,trade_date,close", client))
+    assert weekly.data["items"] == [["000001.SZ", "20240112", 12.5], ["600000.SH", "20240112", 112.5]]
+    assert client.calls == [] and wh.stats()["resampled"] == 1
+    print("✅ 20240110 served as the week ending 20240112")
+    wh.close()
+
+def main():
+    test_incremental_market_sync()
+    test_serve_local_and_gaps()
+    test_index_sync_per_code()
+    test_sync_without_calendar()
+    test_mid_week_trade_date()
+    print("\n🎉 Warehouse tests passed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
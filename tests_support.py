@@ -0,0 +1,37 @@
+"""
+Shared helpers for the offline test scripts - import them with `from tests_support import offline_server`
+"""
+import os
+import tempfile
+from unittest.mock import patch
+
+def offline_server(fake_query=None):
+    """TushareMCPServer that keeps nothing on disk, with client.query replaced by fake_query
+
+    The response cache and the warehouse are switched off and pointed at a
+    temporary directory while the server is built, so tests never touch
+    ~/.cache/tushare-mcp-server. The global settings are restored afterwards.
+    query_columnar is served from the same fake, so tools that load tables
+    as columns see the same data.
+    """
+    from tushare_mcp_server.columnar import ColumnarData
+    from tushare_mcp_server.config import settings
+    from tushare_mcp_server.mcp_server import TushareMCPServer
+
+    path = tempfile.mkdtemp()
+    with patch.multiple(
+        settings,
+        cache_enabled=False,
+        cache_path=os.path.join(path, "responses.sqlite3"),
+        warehouse_enabled=False,
+        warehouse_path=os.path.join(path, "warehouse.sqlite3"),
+    ):
+        server = TushareMCPServer()
+
+    if fake_query is not None:
+        async def fake_query_columnar(name, params, fields=None):
+            return ColumnarData.from_dict((await fake_query(name, params, fields)).data)
+
+        server.client.query = fake_query
+        server.client.query_columnar = fake_query_columnar
+    return server
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+import numpy as np
+from .analytics import Fetch
+from .cache import today_cst
+from .chunking import EARLIEST_DATE
+from .columnar import ColumnarData
+
+logger = logging.getLogger(__name__)
+
+ADJ_MODES = ("qfq", "hfq")
+
+# Columns multiplied by the factor; vol and amount stay as traded, pct_chg is already adjusted upstream
+PRICE_COLUMNS = ("open", "high", "low", "close", "pre_close")
+
+# Columns a bar needs to be adjusted
+KEY_COLUMNS = ("ts_code", "trade_date")
+
+FACTOR_FIELDS = "ts_code,trade_date,adj_factor"
+
+# A code whose factors stop before the requested end is checked for new ones at most this often
+REFRESH_TTL = 300.0
+
+# Decimals of adjusted prices, as in Tushare's pro_bar
+PRICE_DIGITS = 2
+
+
+def adjust_fields(fields: Optional[str]) -> Optional[str]:
+    """Upstream fields with the columns adjusting needs added; None still means all columns"""
+    if not fields:
+        return fields
+    columns = fields.split(",")
+    needed = list(KEY_COLUMNS) + (["close", "pre_close"] if "change" in columns else [])
+    return ",".join(columns + [c for c in needed if c not in columns])
+
+
+class FactorSeries:
+    """Sorted adj_factor history of one ts_code, extended as new trading days are published"""
+
+    def __init__(self):
+        self.dates = np.empty(0, dtype=np.int64)
+        self.factors = np.empty(0, dtype=np.float64)
+        self.synced_to = ""
+        self.checked_at = 0.0
+
+    def extend(self, data: Optional[Dict[str, Any]]):
+        table = ColumnarData.from_dict(data)
+        if len(table):
+            dates = np.array([int(d) for d in table.to_numpy("trade_date").tolist()], dtype=np.int64)
+            factors = np.asarray(table.to_numpy("adj_factor"), dtype=np.float64)
+            dates = np.concatenate([self.dates, dates])
+            factors = np.concatenate([self.factors, factors])
+            # Later fetches win for a date fetched twice
+            _, last = np.unique(dates[::-1], return_index=True)
+            keep = len(dates) - 1 - last
+            self.dates = dates[keep]
+            self.factors = factors[keep]
+            self.synced_to = max(self.synced_to, str(int(self.dates[-1])))
+        self.checked_at = time.monotonic()
+
+    def lookup(self, dates: np.ndarray) -> np.ndarray:
+        """Factor in force on each date: the latest one on or before it (the earliest for older dates)"""
+        if not len(self.dates):
+            return np.full(len(dates), np.nan)
+        positions = np.searchsorted(self.dates, dates, side="right") - 1
+        return self.factors[np.clip(positions, 0, None)]
+
+    def latest(self, on_or_before: Optional[str] = None) -> float:
+        if not len(self.dates):
+            return np.nan
+        if on_or_before is None:
+            return float(self.factors[-1])
+        return float(self.lookup(np.array([int(on_or_before)], dtype=np.int64))[0])
+
+
+class AdjFactorStore:
+    """Per-code adj_factor cache used to adjust daily/weekly/monthly bars
+
+    Each code's full history is fetched once and then extended from its last
+    known date, so adjusting more bars of a warmed-up code costs no upstream
+    call. Fetches go through the server fetch path and its response cache.
+    """
+
+    def __init__(self, fetch: Fetch):
+        self._fetch = fetch
+        self.series: Dict[str, FactorSeries] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.fetches = 0
+
+    def _stale(self, series: Optional[FactorSeries], end: str) -> bool:
+        if series is None:
+            return True
+        return series.synced_to < end and time.monotonic() - series.checked_at > REFRESH_TTL
+
+    async def factors(self, ts_code: str, end: str) -> FactorSeries:
+        """Factor history of ts_code, fetching whatever is missing up to end"""
+        series = self.series.get(ts_code)
+        if not self._stale(series, end):
+            return series
+        lock = self._locks.setdefault(ts_code, asyncio.Lock())
+        async with lock:
+            series = self.series.get(ts_code)
+            if not self._stale(series, end):
+                return series
+            series = series or FactorSeries()
+            # Refetch the last known day as well, so a factor revised on it is picked up
+            start = series.synced_to or EARLIEST_DATE
+            response = await self._fetch("adj_factor", {"ts_code": ts_code, "start_date": start, "end_date": today_cst()}, FACTOR_FIELDS)
+            self.fetches += 1
+            series.extend(response.data)
+            self.series[ts_code] = series
+            logger.debug(f"adj_factor for {ts_code} synced to {series.synced_to}")
+        return series
+
+    async def adjust(self, data: Dict[str, Any], mode: str, end_date: Optional[str] = None) -> Dict[str, Any]:
+        """Return data with prices forward (qfq) or backward (hfq) adjusted
+
+        hfq multiplies each bar by its date's factor; qfq divides that by the
+        factor in force on end_date (default: the latest), so prices at the end
+        of the range are unchanged.
+        """
+        if mode not in ADJ_MODES:
+            raise ValueError(f"Unknown adj: {mode} (expected qfq or hfq)")
+        table = ColumnarData.from_dict(data)
+        if not len(table):
+            return data
+        missing = [c for c in KEY_COLUMNS if c not in table]
+        if missing:
+            raise ValueError(f"adj needs the {', '.join(missing)} column(s)")
+
+        codes = table.to_numpy("ts_code")
+        dates = np.array([int(d) for d in table.to_numpy("trade_date").tolist()], dtype=np.int64)
+        end = end_date or today_cst()
+        unique_codes = list(dict.fromkeys(codes.tolist()))
+        all_series = await asyncio.gather(*(self.factors(code, end) for code in unique_codes))
+
+        factors = np.full(len(table), np.nan)
+        for code, series in zip(unique_codes, all_series):
+            rows = codes == code
+            code_factors = series.lookup(dates[rows])
+            if mode == "qfq":
+                code_factors = code_factors / series.latest(end_date)
+            factors[rows] = code_factors
+
+        adjusted: Dict[str, np.ndarray] = {}
+        for name in PRICE_COLUMNS:
+            if name in table:
+                values = np.asarray(table.to_numpy(name), dtype=np.float64)
+                scaled = np.where(np.isnan(factors), values, np.round(values * factors, PRICE_DIGITS))
+                adjusted[name] = scaled
+        if "change" in table and "close" in adjusted and "pre_close" in adjusted:
+            adjusted["change"] = np.round(adjusted["close"] - adjusted["pre_close"], PRICE_DIGITS)
+
+        items = table.to_dict()["items"]
+        for name, values in adjusted.items():
+            i = table.fields.index(name)
+            for row, value in zip(items, values.tolist()):
+                row[i] = None if value != value else value
+        result = dict(data)
+        result["items"] = items
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {"codes": len(self.series), "fetches": self.fetches}
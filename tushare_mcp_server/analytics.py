@@ -0,0 +1,343 @@
+import asyncio
+import logging
+import warnings
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from .chunking import split_codes
+from .columnar import ColumnarData, StringColumn
+from .models import TushareResponse
+from .query import QUERY_PROPERTIES
+from .serialization import FORMAT_PROPERTY
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_PER_YEAR = 252
+
+DEFAULT_BENCHMARK = "000300.SH"
+
+PRICE_FIELDS = "ts_code,trade_date,close,pct_chg"
+
+# Fetches (tool name, params, fields) through the server's warehouse/client path
+Fetch = Callable[[str, Dict[str, Any], Optional[str]], Awaitable[TushareResponse]]
+
+
+class PriceMatrix(NamedTuple):
+    dates: List[str]       # ascending trade dates
+    codes: List[str]       # column order
+    close: np.ndarray      # [date, code], NaN where a code has no bar
+    returns: np.ndarray    # daily returns as fractions, from pct_chg
+
+
+def _floats(table: ColumnarData, name: str) -> np.ndarray:
+    values = table.to_numpy(name)
+    if values.dtype == object:
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    return values.astype(np.float64, copy=False)
+
+
+def _ids(table: ColumnarData, name: str) -> Tuple[np.ndarray, List[str]]:
+    col = table[name]
+    if not isinstance(col, StringColumn):
+        col = StringColumn.from_values(col)
+    return np.frombuffer(col.codes, dtype=np.int32), col.categories
+
+
+def price_matrix(table: ColumnarData, codes: List[str]) -> PriceMatrix:
+    """Pivot ts_code/trade_date/close/pct_chg rows into date x code matrices"""
+    code_ids, code_names = _ids(table, "ts_code")
+    date_ids, date_names = _ids(table, "trade_date")
+
+    # Requested order first, then any extra codes the API returned
+    order = [c for c in codes if c in code_names] + sorted(c for c in code_names if c not in codes)
+    column_of = np.array([order.index(c) if c in order else -1 for c in code_names], dtype=np.int64)
+    date_rank = np.argsort(np.argsort(np.array(date_names, dtype=object)))
+    dates = sorted(date_names)
+
+    rows = date_rank[date_ids]
+    cols = column_of[code_ids]
+    close = np.full((len(dates), len(order)), np.nan)
+    returns = np.full((len(dates), len(order)), np.nan)
+    close[rows, cols] = _floats(table, "close")
+    returns[rows, cols] = _floats(table, "pct_chg") / 100.0
+    return PriceMatrix(dates, order, close, returns)
+
+
+def _round(values: np.ndarray, digits: int = 6) -> List[Optional[float]]:
+    return [None if v != v else v for v in np.round(np.asarray(values, dtype=np.float64), digits).tolist()]
+
+
+def _table(fields: List[str], columns: List[List[Any]]) -> Dict[str, Any]:
+    return {"fields": fields, "items": [list(row) for row in zip(*columns)]}
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over ``window`` observations; NaN until the window is full or when it holds a gap"""
+    out = np.full(len(values), np.nan)
+    if window <= 0 or len(values) < window:
+        return out
+    filled = np.nan_to_num(values)
+    sums = np.cumsum(np.insert(filled, 0, 0.0))
+    gaps = np.cumsum(np.insert(np.isnan(values), 0, False))
+    total = sums[window:] - sums[:-window]
+    complete = (gaps[window:] - gaps[:-window]) == 0
+    out[window - 1:] = np.where(complete, total / window, np.nan)
+    return out
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing sample standard deviation over ``window`` observations"""
+    mean = rolling_mean(values, window)
+    mean_sq = rolling_mean(values * values, window)
+    with np.errstate(invalid="ignore"):
+        var = (mean_sq - mean * mean) * window / max(window - 1, 1)
+    return np.sqrt(np.clip(var, 0.0, None))
+
+
+def return_summary(prices: PriceMatrix) -> Dict[str, Any]:
+    """Total/annualized return and volatility per code"""
+    r = prices.returns
+    valid = ~np.isnan(r)
+    n = valid.sum(axis=0)
+    growth = np.where(valid, 1.0 + np.nan_to_num(r), 1.0).prod(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total = growth - 1.0
+        annual = np.where(n > 0, growth ** (TRADING_DAYS_PER_YEAR / np.maximum(n, 1)) - 1.0, np.nan)
+        with warnings.catch_warnings():
+            # Codes with fewer than two returns have no volatility
+            warnings.simplefilter("ignore", RuntimeWarning)
+            vol = np.nanstd(r, axis=0, ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR)
+        sharpe = np.where(vol > 0, annual / vol, np.nan)
+
+    first_date, last_date, first_close, last_close = [], [], [], []
+    for j in range(len(prices.codes)):
+        rows = np.flatnonzero(~np.isnan(prices.close[:, j]))
+        first_date.append(prices.dates[rows[0]] if len(rows) else None)
+        last_date.append(prices.dates[rows[-1]] if len(rows) else None)
+        first_close.append(float(prices.close[rows[0], j]) if len(rows) else None)
+        last_close.append(float(prices.close[rows[-1], j]) if len(rows) else None)
+
+    return _table(
+        ["ts_code", "start_date", "end_date", "days", "start_close", "end_close",
+         "total_return", "annual_return", "annual_volatility", "sharpe"],
+        [prices.codes, first_date, last_date, n.tolist(), first_close, last_close,
+         _round(total), _round(annual), _round(vol), _round(sharpe, 4)],
+    )
+
+
+def rolling_stats(prices: PriceMatrix, window: int) -> Dict[str, Any]:
+    """Rolling mean of close and annualized rolling volatility for each code, newest first"""
+    codes, dates, means, vols, closes, rets = [], [], [], [], [], []
+    for j, code in enumerate(prices.codes):
+        rows = np.flatnonzero(~np.isnan(prices.close[:, j]))
+        close = prices.close[rows, j]
+        r = prices.returns[rows, j]
+        mean = rolling_mean(close, window)
+        vol = rolling_std(r, window) * np.sqrt(TRADING_DAYS_PER_YEAR)
+        rows = rows[::-1]
+        codes.extend([code] * len(rows))
+        dates.extend(prices.dates[i] for i in rows)
+        closes.extend(_round(close[::-1], 4))
+        rets.extend(_round(r[::-1]))
+        means.extend(_round(mean[::-1], 4))
+        vols.extend(_round(vol[::-1]))
+    return _table(
+        ["ts_code", "trade_date", "close", "return", "rolling_mean", "rolling_volatility"],
+        [codes, dates, closes, rets, means, vols],
+    )
+
+
+def drawdown_summary(prices: PriceMatrix) -> Dict[str, Any]:
+    """Maximum drawdown of the compounded return series per code, with peak/trough/recovery dates"""
+    fields = ["ts_code", "max_drawdown", "peak_date", "trough_date", "recovery_date", "current_drawdown"]
+    columns: List[List[Any]] = [[] for _ in fields]
+    for j, code in enumerate(prices.codes):
+        rows = np.flatnonzero(~np.isnan(prices.returns[:, j]))
+        if not len(rows):
+            values = [code, None, None, None, None, None]
+        else:
+            wealth = np.cumprod(1.0 + prices.returns[rows, j])
+            peaks = np.maximum.accumulate(np.maximum(wealth, 1.0))
+            dd = wealth / peaks - 1.0
+            trough = int(np.argmin(dd))
+            if dd[trough] >= 0:
+                values = [code, 0.0, None, None, None, 0.0]
+            else:
+                # Peak is the last high before the trough; index -1 stands for the start value of 1.0
+                highs = np.flatnonzero(wealth[:trough + 1] >= peaks[trough])
+                peak = int(highs[-1]) if len(highs) else -1
+                recovered = np.flatnonzero(wealth[trough:] >= peaks[trough])
+                values = [
+                    code,
+                    _round(dd[trough:trough + 1])[0],
+                    prices.dates[rows[peak]] if peak >= 0 else prices.dates[rows[0]],
+                    prices.dates[rows[trough]],
+                    prices.dates[rows[trough + int(recovered[0])]] if len(recovered) else None,
+                    _round(dd[-1:])[0],
+                ]
+        for column, value in zip(columns, values):
+            column.append(value)
+    return _table(fields, columns)
+
+
+def beta_summary(prices: PriceMatrix, benchmark: np.ndarray, benchmark_code: str) -> Dict[str, Any]:
+    """OLS beta, annualized alpha, correlation and R² of each code against a benchmark return series"""
+    fields = ["ts_code", "benchmark", "observations", "beta", "alpha", "correlation", "r_squared"]
+    columns: List[List[Any]] = [[] for _ in fields]
+    for j, code in enumerate(prices.codes):
+        mask = ~np.isnan(prices.returns[:, j]) & ~np.isnan(benchmark)
+        x = benchmark[mask]
+        y = prices.returns[mask, j]
+        n = int(mask.sum())
+        beta = alpha = corr = np.nan
+        if n > 2 and x.var() > 0:
+            beta = np.cov(x, y, ddof=1)[0, 1] / x.var(ddof=1)
+            alpha = (y.mean() - beta * x.mean()) * TRADING_DAYS_PER_YEAR
+            if y.var() > 0:
+                corr = np.corrcoef(x, y)[0, 1]
+        for column, value in zip(columns, [
+            code, benchmark_code, n, _round([beta], 4)[0], _round([alpha])[0],
+            _round([corr], 4)[0], _round([corr * corr], 4)[0],
+        ]):
+            column.append(value)
+    return _table(fields, columns)
+
+
+def correlation_matrix(returns: np.ndarray) -> np.ndarray:
+    """Pairwise-complete Pearson correlation of the columns of a [date, code] matrix with NaN gaps"""
+    valid = (~np.isnan(returns)).astype(np.float64)
+    x = np.nan_to_num(returns)
+    n = valid.T @ valid
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_i = (x.T @ valid) / n
+        mean_j = (valid.T @ x) / n
+        cov = (x.T @ x) / n - mean_i * mean_j
+        var_i = ((x * x).T @ valid) / n - mean_i ** 2
+        var_j = (valid.T @ (x * x)) / n - mean_j ** 2
+        corr = cov / np.sqrt(var_i * var_j)
+    corr[n < 3] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def correlation_table(prices: PriceMatrix) -> Dict[str, Any]:
+    corr = correlation_matrix(prices.returns)
+    columns = [prices.codes] + [_round(corr[:, j], 4) for j in range(len(prices.codes))]
+    return _table(["ts_code"] + prices.codes, columns)
+
+
+# Tool declarations
+
+ASSET_PROPERTY = {"type": "string", "enum": ["E", "I"], "description": "Asset type: E stock (daily, default) or I index (index_daily)"}
+CODES_PROPERTY = {"type": "string", "description": "Comma-separated codes (e.g., 000001.SZ,600519.SH)"}
+RANGE_PROPERTIES = {
+    "start_date": {"type": "string", "description": "Start date (YYYYMMDD format)"},
+    "end_date": {"type": "string", "description": "End date (YYYYMMDD format)"},
+}
+
+
+class AnalyticsTool(NamedTuple):
+    name: str
+    description: str
+    properties: Dict[str, Any]
+    required: Tuple[str, ...] = ("ts_code",)
+
+    def input_schema(self) -> Dict[str, Any]:
+        properties = dict(self.properties)
+        properties.update(QUERY_PROPERTIES)
+        properties["format"] = FORMAT_PROPERTY
+        return {"type": "object", "properties": properties, "required": list(self.required)}
+
+
+ANALYTICS_TOOLS = (
+    AnalyticsTool(
+        "returns",
+        "Total and annualized return, annualized volatility and Sharpe ratio per code over a date range",
+        {"ts_code": CODES_PROPERTY, **RANGE_PROPERTIES, "asset": ASSET_PROPERTY},
+    ),
+    AnalyticsTool(
+        "rolling_stats",
+        "Rolling mean of close and annualized rolling volatility of daily returns, newest first",
+        {
+            "ts_code": CODES_PROPERTY,
+            **RANGE_PROPERTIES,
+            "window": {"type": "integer", "description": "Window length in trading days (default 20)"},
+            "asset": ASSET_PROPERTY,
+        },
+    ),
+    AnalyticsTool(
+        "drawdown",
+        "Maximum drawdown with peak, trough and recovery dates, plus the current drawdown, per code",
+        {"ts_code": CODES_PROPERTY, **RANGE_PROPERTIES, "asset": ASSET_PROPERTY},
+    ),
+    AnalyticsTool(
+        "beta",
+        "Beta, annualized alpha, correlation and R² of each code's daily returns against an index",
+        {
+            "ts_code": CODES_PROPERTY,
+            "index_code": {"type": "string", "description": f"Benchmark index code (default {DEFAULT_BENCHMARK})"},
+            **RANGE_PROPERTIES,
+            "asset": ASSET_PROPERTY,
+        },
+    ),
+    AnalyticsTool(
+        "correlation",
+        "Correlation matrix of daily returns across codes",
+        {"ts_code": CODES_PROPERTY, **RANGE_PROPERTIES, "asset": ASSET_PROPERTY},
+    ),
+)
+
+ANALYTICS = {tool.name: tool for tool in ANALYTICS_TOOLS}
+
+
+async def load_prices(fetch: Fetch, codes: List[str], params: Dict[str, Any], asset: str = "E") -> PriceMatrix:
+    if asset not in ("E", "I"):
+        raise ValueError(f"Unknown asset type: {asset} (expected E or I)")
+    source = "index_daily" if asset == "I" else "daily"
+    request = {k: params[k] for k in ("start_date", "end_date") if params.get(k)}
+    if asset == "I":
+        # index_daily takes a single ts_code per call
+        responses = await asyncio.gather(*(fetch(source, {**request, "ts_code": code}, PRICE_FIELDS) for code in codes))
+        rows: List[List[Any]] = []
+        for response in responses:
+            data = response.data or {}
+            if data.get("items"):
+                index = [data["fields"].index(f) for f in PRICE_FIELDS.split(",")]
+                rows.extend([row[i] for i in index] for row in data["items"])
+        table = ColumnarData.from_rows(PRICE_FIELDS.split(","), rows)
+    else:
+        response = await fetch(source, {**request, "ts_code": ",".join(codes)}, PRICE_FIELDS)
+        table = response.to_columnar()
+    if not len(table):
+        raise ValueError(f"No {source} data for {', '.join(codes)} in the requested range")
+    return price_matrix(table, codes)
+
+
+async def run_analytics(name: str, params: Dict[str, Any], fetch: Fetch) -> Dict[str, Any]:
+    """Fetch price history through ``fetch`` and compute the named analytic"""
+    codes = split_codes(params.get("ts_code"))
+    if not codes:
+        raise ValueError(f"{name} requires ts_code")
+    asset = params.get("asset", "E")
+    if name == "correlation" and len(codes) < 2:
+        raise ValueError("correlation requires at least two codes")
+
+    prices = await load_prices(fetch, codes, params, asset)
+    if name == "returns":
+        return return_summary(prices)
+    if name == "rolling_stats":
+        window = int(params.get("window", 20))
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        return rolling_stats(prices, window)
+    if name == "drawdown":
+        return drawdown_summary(prices)
+    if name == "correlation":
+        return correlation_table(prices)
+    if name == "beta":
+        index_code = params.get("index_code") or DEFAULT_BENCHMARK
+        index = await load_prices(fetch, [index_code], params, "I")
+        position = {d: i for i, d in enumerate(index.dates)}
+        benchmark = np.full(len(prices.dates), np.nan)
+        rows = [i for i, d in enumerate(prices.dates) if d in position]
+        benchmark[rows] = index.returns[[position[prices.dates[i]] for i in rows], 0]
+        return beta_summary(prices, benchmark, index_code)
+    raise ValueError(f"Unknown analytics tool: {name}")
@@ -0,0 +1,273 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from .registry import MARKET_DATA_APIS, REFERENCE_APIS
+
+logger = logging.getLogger(__name__)
+
+# Tushare publishes dates in China Standard Time
+CST = timezone(timedelta(hours=8))
+
+def today_cst() -> str:
+    """Return today's date in YYYYMMDD format (China Standard Time)"""
+    return datetime.now(CST).strftime("%Y%m%d")
+
+
+def normalize_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop empty values and strip whitespace so equivalent requests share a key"""
+    normalized = {}
+    for key, value in params.items():
+        if value is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if not value:
+                continue
+        normalized[key] = value
+    return normalized
+
+
+def make_cache_key(api_name: str, params: Dict[str, Any], fields: Optional[str] = None) -> str:
+    """Build a stable key from (api_name, normalized params, fields)"""
+    normalized_fields = ",".join(f.strip() for f in fields.split(",")) if fields else ""
+    payload = json.dumps(
+        [api_name, normalize_params(params), normalized_fields],
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed cache of successful Tushare responses with per-endpoint TTLs"""
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        ttl_today: float = 300.0,
+        ttl_reference: float = 86400.0,
+    ):
+        self.path = os.path.expanduser(path)
+        self.max_bytes = max_bytes
+        self.ttl_today = ttl_today
+        self.ttl_reference = ttl_reference
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings) -> "ResponseCache":
+        return cls(
+            path=settings.cache_path,
+            max_bytes=settings.cache_max_bytes,
+            ttl_today=settings.cache_ttl_today,
+            ttl_reference=settings.cache_ttl_reference,
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    api_name TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_api ON responses (api_name)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses (last_access)")
+            self._conn.commit()
+        return self._conn
+
+    def ttl_for(self, api_name: str, params: Dict[str, Any], value: Optional[Dict[str, Any]] = None) -> Optional[float]:
+        """Return the TTL in seconds, None for immutable entries, or 0 to skip caching
+
+        An empty response only gets the short "today" TTL: for a past date it
+        usually means the data was not published yet, not that there is none.
+        """
+        if api_name not in REFERENCE_APIS and api_name not in MARKET_DATA_APIS:
+            return 0
+        if value is not None and not (value.get("data") or {}).get("items"):
+            return self.ttl_today
+        if api_name in REFERENCE_APIS:
+            return self.ttl_reference
+
+        last_date = params.get("end_date") or params.get("trade_date")
+        if last_date and str(last_date) < today_cst():
+            return None
+        return self.ttl_today
+
+    def _get_sync(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, expires_at = row
+            now = time.time()
+            if expires_at is not None and expires_at <= now:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                return None
+
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            conn.commit()
+        return json.loads(zlib.decompress(value))
+
+    def _set_sync(self, key: str, api_name: str, value: Dict[str, Any], ttl: Optional[float]):
+        blob = zlib.compress(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        if len(blob) > self.max_bytes:
+            return
+
+        now = time.time()
+        expires_at = None if ttl is None else now + ttl
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, api_name, value, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, api_name, blob, len(blob), expires_at, now),
+            )
+            self._evict_locked(conn)
+            conn.commit()
+
+    def _evict_locked(self, conn: sqlite3.Connection):
+        """Drop expired entries, then least recently used ones until under max_bytes"""
+        conn.execute("DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        target = int(self.max_bytes * 0.9)
+        rows = conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= target:
+                break
+            evicted.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        self.evictions += len(evicted)
+        logger.debug(f"Evicted {len(evicted)} cache entries")
+
+    async def get(self, api_name: str, params: Dict[str, Any], fields: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return a cached response payload, or None on miss"""
+        key = make_cache_key(api_name, params, fields)
+        loop = asyncio.get_running_loop()
+        try:
+            value = await loop.run_in_executor(None, self._get_sync, key)
+        except sqlite3.Error as e:
+            logger.warning(f"Cache read failed: {e}")
+            value = None
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, api_name: str, params: Dict[str, Any], fields: Optional[str], value: Dict[str, Any]):
+        """Store a response payload according to the endpoint's TTL policy"""
+        ttl = self.ttl_for(api_name, params, value)
+        if ttl == 0:
+            return
+
+        key = make_cache_key(api_name, params, fields)
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self._set_sync, key, api_name, value, ttl)
+        except sqlite3.Error as e:
+            logger.warning(f"Cache write failed: {e}")
+
+    def invalidate(self, api_name: Optional[str] = None) -> int:
+        """Remove cached entries for one endpoint, or everything when api_name is None"""
+        with self._lock:
+            conn = self._connect()
+            if api_name is None:
+                cursor = conn.execute("DELETE FROM responses")
+            else:
+                cursor = conn.execute("DELETE FROM responses WHERE api_name = ?", (api_name,))
+            conn.commit()
+        return cursor.rowcount
+
+    def clear(self):
+        """Remove all cached entries"""
+        self.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current store size"""
+        with self._lock:
+            conn = self._connect()
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def close(self):
+        """Close the underlying SQLite connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def main():
+    """Command line entry point: python -m tushare_mcp_server.cache clear"""
+    from .config import settings
+
+    parser = argparse.ArgumentParser(description="Inspect or clear the on-disk Tushare response cache")
+    parser.add_argument("command", choices=["clear", "stats"])
+    parser.add_argument("--api", help="Comma-separated endpoints to clear (default: all)")
+    args = parser.parse_args()
+
+    cache = ResponseCache.from_settings(settings)
+    try:
+        if args.command == "stats":
+            print(cache.stats())
+            return 0
+        if args.api:
+            for api_name in (a.strip() for a in args.api.split(",") if a.strip()):
+                print(f"✅ {api_name}: {cache.invalidate(api_name)} entries removed")
+        else:
+            print(f"✅ {cache.invalidate()} entries removed from {cache.path}")
+    finally:
+        cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from .cache import today_cst
+from .models import TushareResponse
+
+# Shanghai Stock Exchange opened on 1990-12-19
+EARLIEST_DATE = "19901219"
+
+
+class ChunkPolicy(NamedTuple):
+    max_rows: int                      # documented per-call row cap
+    rows_per_day: float                # bars returned per trading day for one code
+    multi_code: bool                   # endpoint accepts comma-separated ts_code
+    market_rows: Optional[int] = None  # rows per trading day without ts_code, None to never split
+
+
+CHUNK_POLICIES: Dict[str, ChunkPolicy] = {
+    "daily": ChunkPolicy(6000, 1.0, True, 5500),
+    "weekly": ChunkPolicy(4500, 1 / 5, False),
+    "monthly": ChunkPolicy(4500, 1 / 20, False),
+    "index_daily": ChunkPolicy(8000, 1.0, False),
+    "index_weekly": ChunkPolicy(1000, 1 / 5, False),
+    "index_monthly": ChunkPolicy(1000, 1 / 20, False),
+    "index_dailybasic": ChunkPolicy(3000, 1.0, False),
+    "daily_basic": ChunkPolicy(6000, 1.0, False),
+    "stk_limit": ChunkPolicy(5800, 1.0, False),
+    "adj_factor": ChunkPolicy(6000, 1.0, False),
+}
+
+
+def _parse(value: str) -> datetime:
+    return datetime.strptime(value, "%Y%m%d")
+
+
+def is_weekday(value: str) -> bool:
+    """Fallback trading-day test used when no exchange calendar is available"""
+    return _parse(value).weekday() < 5
+
+
+def iter_dates(start: str, end: str):
+    """Yield every calendar date from start to end inclusive in YYYYMMDD format"""
+    day = _parse(start)
+    last = _parse(end)
+    while day <= last:
+        yield day.strftime("%Y%m%d")
+        day += timedelta(days=1)
+
+
+def split_codes(ts_code: Optional[str]) -> List[str]:
+    if not ts_code:
+        return []
+    return [code.strip() for code in ts_code.split(",") if code.strip()]
+
+
+class WeekdayCalendar:
+    """Treats every Monday to Friday as a trading day; used when trade_cal is unavailable"""
+
+    def is_open(self, value: str) -> bool:
+        return is_weekday(value)
+
+    def count(self, start: str, end: str) -> int:
+        """Number of weekdays in [start, end]"""
+        first = _parse(start)
+        last = _parse(end)
+        if first > last:
+            return 0
+        days = (last - first).days + 1
+        weeks, remainder = divmod(days, 7)
+        extra = sum(1 for i in range(remainder) if (first.weekday() + i) % 7 < 5)
+        return weeks * 5 + extra
+
+    def windows(self, start: str, end: str, days_per_window: int) -> List[Tuple[str, str]]:
+        """Split [start, end] into windows holding at most days_per_window weekdays"""
+        windows = []
+        window_start = None
+        previous = None
+        count = 0
+        for day in iter_dates(start, end):
+            if not self.is_open(day):
+                continue
+            if window_start is None:
+                window_start = day
+            count += 1
+            previous = day
+            if count == days_per_window:
+                windows.append((window_start, day))
+                window_start = None
+                count = 0
+        if window_start is not None:
+            windows.append((window_start, previous))
+        return windows
+
+
+WEEKDAYS = WeekdayCalendar()
+
+
+def split_range(start: str, end: str, days_per_window: int, calendar=WEEKDAYS) -> List[Tuple[str, str]]:
+    """Split [start, end] into windows holding at most days_per_window trading days"""
+    return calendar.windows(start, end, days_per_window)
+
+
+def plan_chunks(api_name: str, params: Dict[str, Any], calendar=WEEKDAYS) -> List[Dict[str, Any]]:
+    """Split a request whose estimated size exceeds the endpoint's row cap
+
+    ``calendar`` is a TradeCalendar or the weekday fallback and is used to
+    count trading days. Returns ``[params]`` unchanged when no split is needed.
+    """
+    policy = CHUNK_POLICIES.get(api_name)
+    if policy is None or params.get("trade_date"):
+        return [params]
+
+    codes = split_codes(params.get("ts_code"))
+    if not codes and (policy.market_rows is None or not (params.get("start_date") and params.get("end_date"))):
+        return [params]
+
+    start = params.get("start_date") or EARLIEST_DATE
+    end = params.get("end_date") or today_cst()
+    if start > end:
+        return [params]
+
+    trading_days = calendar.count(start, end)
+    if trading_days == 0:
+        return [params]
+
+    if codes:
+        rows_per_code = math.ceil(trading_days * policy.rows_per_day)
+        if policy.multi_code:
+            batch_size = max(1, policy.max_rows // max(rows_per_code, 1))
+        else:
+            batch_size = 1
+        batches = [codes[i:i + batch_size] for i in range(0, len(codes), batch_size)]
+
+        if rows_per_code > policy.max_rows:
+            days_per_window = max(1, int(policy.max_rows / policy.rows_per_day))
+            windows = split_range(start, end, days_per_window, calendar)
+        else:
+            windows = [(start, end)]
+
+        if len(batches) == 1 and len(windows) == 1:
+            return [params]
+    else:
+        if trading_days * policy.market_rows <= policy.max_rows:
+            return [params]
+        batches = [[]]
+        days_per_window = max(1, policy.max_rows // policy.market_rows)
+        windows = split_range(start, end, days_per_window, calendar)
+
+    chunks = []
+    for batch in batches:
+        for window_start, window_end in windows:
+            chunk = dict(params)
+            if batch:
+                chunk["ts_code"] = ",".join(batch)
+            chunk["start_date"] = window_start
+            chunk["end_date"] = window_end
+            chunks.append(chunk)
+    return chunks
+
+
+# Columns that identify a bar; chunks are de-duplicated and ordered on them
+MERGE_KEYS = ("ts_code", "trade_date")
+
+
+def with_merge_keys(fields: Optional[str]) -> Optional[str]:
+    """fields plus any missing MERGE_KEYS, so chunked rows can still be merged; None means all fields"""
+    if not fields:
+        return fields
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    return ",".join(names + [key for key in MERGE_KEYS if key not in names])
+
+
+def project_response(response: TushareResponse, fields: str) -> TushareResponse:
+    """Keep only the comma-separated fields, in that order"""
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    data = response.data or {}
+    index = {name: i for i, name in enumerate(data.get("fields") or [])}
+    positions = [index[name] for name in names if name in index]
+    items = [[row[i] for i in positions] for row in data.get("items") or []]
+    return TushareResponse(code=0, msg="", data={**data, "fields": [name for name in names if name in index], "items": items})
+
+
+def merge_responses(responses: Sequence[TushareResponse], codes: Sequence[str] = ()) -> TushareResponse:
+    """Merge chunked responses into one ordered fields/items payload without duplicates
+
+    Rows are de-duplicated on (ts_code, trade_date). Without both columns
+    there is no way to tell a repeated row from a bar that happens to have
+    the same values, so every row is kept.
+    """
+    fields: List[str] = []
+    for response in responses:
+        if response.data and response.data.get("fields"):
+            fields = response.data["fields"]
+            break
+
+    code_idx = fields.index("ts_code") if "ts_code" in fields else None
+    date_idx = fields.index("trade_date") if "trade_date" in fields else None
+
+    seen = set()
+    items = []
+    for response in responses:
+        if not response.data:
+            continue
+        for row in response.data.get("items") or []:
+            if code_idx is not None and date_idx is not None:
+                key = (row[code_idx], row[date_idx])
+                if key in seen:
+                    continue
+                seen.add(key)
+            items.append(row)
+
+    # Newest first within each code, codes in the order they were requested
+    if date_idx is not None:
+        items.sort(key=lambda row: row[date_idx] or "", reverse=True)
+    if code_idx is not None:
+        rank = {code: i for i, code in enumerate(codes)}
+        items.sort(key=lambda row: (rank.get(row[code_idx], len(rank)), row[code_idx]))
+
+    return TushareResponse(code=0, msg="", data={"fields": fields, "items": items, "has_more": False})
@@ -0,0 +1,255 @@
+import math
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+
+class StringColumn:
+    """Dictionary-encoded string column
+
+    Values are stored once in ``categories`` (interned) and referenced by an
+    int32 code per row, so repeated ``ts_code``/``trade_date`` values cost four
+    bytes each. Slicing shares the categories and a memoryview of the codes.
+    """
+
+    __slots__ = ("codes", "categories")
+
+    def __init__(self, codes: memoryview, categories: List[Optional[str]]):
+        self.codes = codes
+        self.categories = categories
+
+    @classmethod
+    def from_values(cls, values: Iterable[Optional[str]]) -> "StringColumn":
+        lookup: Dict[Optional[str], int] = {}
+        categories: List[Optional[str]] = []
+        codes = array("i")
+        for value in values:
+            code = lookup.get(value)
+            if code is None:
+                code = len(categories)
+                lookup[value] = code
+                categories.append(sys.intern(value) if isinstance(value, str) else value)
+            codes.append(code)
+        return cls(memoryview(codes), categories)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return StringColumn(self.codes[index], self.categories)
+        return self.categories[self.codes[index]]
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        categories = self.categories
+        for code in self.codes:
+            yield categories[code]
+
+    def tolist(self) -> List[Optional[str]]:
+        categories = self.categories
+        return [categories[code] for code in self.codes]
+
+
+class NumberColumn:
+    """Numeric column that mixes ints with floats or None
+
+    Values live in a float64 buffer (NaN for None), so numeric access stays
+    zero-copy like a plain float column, and one byte per row marks values
+    that arrived as ints so they come back as ints rather than floats.
+    """
+
+    __slots__ = ("values", "ints")
+
+    def __init__(self, values: memoryview, ints: memoryview):
+        self.values = values
+        self.ints = ints
+
+    @classmethod
+    def from_values(cls, values: Sequence[Any]) -> "NumberColumn":
+        return cls(
+            memoryview(array("d", [math.nan if v is None else v for v in values])),
+            memoryview(array("b", [isinstance(v, int) for v in values])),
+        )
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return NumberColumn(self.values[index], self.ints[index])
+        value = self.values[index]
+        if value != value:
+            return None
+        return int(value) if self.ints[index] else value
+
+    def __iter__(self) -> Iterator[Any]:
+        for value, is_int in zip(self.values, self.ints):
+            yield None if value != value else int(value) if is_int else value
+
+    def tolist(self) -> List[Any]:
+        return list(self)
+
+
+Column = Union[memoryview, StringColumn, NumberColumn, List[Any]]
+
+
+def join_codes(keys, codes):
+    """Sort-merge join of two string arrays: a mask of the keys found in codes, and the row in codes of each one found"""
+    import numpy as np
+
+    if not len(codes):
+        return np.zeros(len(keys), dtype=bool), np.empty(0, dtype=np.int64)
+    order = np.argsort(codes, kind="stable")
+    ordered = codes[order]
+    positions = np.minimum(np.searchsorted(ordered, keys), len(ordered) - 1)
+    matched = ordered[positions] == keys
+    return matched, np.take(order, positions[matched])
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _build_column(values: Sequence[Any]) -> Column:
+    """Pick the most compact representation that round-trips the values"""
+    non_null = [v for v in values if v is not None]
+    if non_null and all(_is_number(v) for v in non_null):
+        if not any(isinstance(v, int) for v in non_null):
+            return memoryview(array("d", [math.nan if v is None else v for v in values]))
+        if len(non_null) == len(values) and all(isinstance(v, int) for v in non_null):
+            return memoryview(array("q", values))
+        return NumberColumn.from_values(values)
+    if all(isinstance(v, str) for v in non_null):
+        return StringColumn.from_values(values)
+    return list(values)
+
+
+class ColumnarBuilder:
+    """Accumulate row batches and build a ColumnarData once all rows have arrived"""
+
+    def __init__(self, fields: Sequence[str]):
+        self.fields = list(fields)
+        self._values: List[List[Any]] = [[] for _ in self.fields]
+
+    def append_rows(self, rows: Iterable[Sequence[Any]]):
+        values = self._values
+        for row in rows:
+            for i, value in enumerate(row):
+                values[i].append(value)
+
+    def build(self) -> "ColumnarData":
+        columns = {name: _build_column(values) for name, values in zip(self.fields, self._values)}
+        self._values = [[] for _ in self.fields]
+        return ColumnarData(self.fields, columns)
+
+
+class ColumnarData:
+    """Compact column-oriented view of a Tushare ``fields``/``items`` payload
+
+    Numeric columns are typed ``array`` buffers exposed as memoryviews (floats
+    use NaN for missing values), ints mixed with floats or None keep an int
+    marker per row, string columns are dictionary-encoded. Column
+    access and slicing never copy the underlying buffers.
+    """
+
+    def __init__(self, fields: Sequence[str], columns: Dict[str, Column]):
+        self.fields = list(fields)
+        self.columns = columns
+        self._length = len(columns[self.fields[0]]) if self.fields else 0
+
+    @classmethod
+    def from_rows(cls, fields: Sequence[str], items: Iterable[Sequence[Any]]) -> "ColumnarData":
+        builder = ColumnarBuilder(fields)
+        builder.append_rows(items)
+        return builder.build()
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "ColumnarData":
+        data = data or {}
+        return cls.from_rows(data.get("fields") or [], data.get("items") or [])
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.columns[key]
+        if isinstance(key, slice):
+            return ColumnarData(self.fields, {name: col[key] for name, col in self.columns.items()})
+        raise TypeError(f"Invalid index type: {type(key).__name__}")
+
+    def column(self, name: str) -> Column:
+        return self.columns[name]
+
+    def select(self, names: Sequence[str]) -> "ColumnarData":
+        """Return a view with only the given columns"""
+        missing = [name for name in names if name not in self.columns]
+        if missing:
+            raise KeyError(f"Unknown columns: {', '.join(missing)}")
+        return ColumnarData(names, {name: self.columns[name] for name in names})
+
+    def take(self, indices: Sequence[int]) -> "ColumnarData":
+        """Return a new table with the rows at the given positions"""
+        columns: Dict[str, Column] = {}
+        for name, col in self.columns.items():
+            if isinstance(col, StringColumn):
+                codes = col.codes
+                columns[name] = StringColumn(memoryview(array("i", [codes[i] for i in indices])), col.categories)
+            elif isinstance(col, memoryview):
+                columns[name] = memoryview(array(col.format, [col[i] for i in indices]))
+            elif isinstance(col, NumberColumn):
+                values, ints = col.values, col.ints
+                columns[name] = NumberColumn(
+                    memoryview(array("d", [values[i] for i in indices])), memoryview(array("b", [ints[i] for i in indices]))
+                )
+            else:
+                columns[name] = [col[i] for i in indices]
+        return ColumnarData(self.fields, columns)
+
+    def rows(self) -> Iterator[Tuple[Any, ...]]:
+        """Iterate rows as tuples, restoring None for missing numeric values"""
+        iterators = []
+        for name in self.fields:
+            col = self.columns[name]
+            if isinstance(col, memoryview) and col.format == "d":
+                iterators.append(None if v != v else v for v in col)
+            else:
+                iterators.append(iter(col))
+        return zip(*iterators)
+
+    def __iter__(self) -> Iterator[Tuple[Any, ...]]:
+        return self.rows()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert back to the Tushare ``fields``/``items`` layout"""
+        return {"fields": list(self.fields), "items": [list(row) for row in self.rows()]}
+
+    def to_numpy(self, name: str):
+        """Return a column as a NumPy array; numeric columns share the buffer"""
+        import numpy as np
+
+        col = self.columns[name]
+        if isinstance(col, memoryview):
+            return np.frombuffer(col, dtype=np.float64 if col.format == "d" else np.int64)
+        if isinstance(col, NumberColumn):
+            return np.frombuffer(col.values, dtype=np.float64)
+        if isinstance(col, StringColumn):
+            return np.asarray(col.categories, dtype=object)[np.frombuffer(col.codes, dtype=np.int32)]
+        return np.asarray(col, dtype=object)
+
+    def nbytes(self) -> int:
+        """Approximate size of the column buffers in bytes"""
+        total = 0
+        for col in self.columns.values():
+            if isinstance(col, memoryview):
+                total += col.nbytes
+            elif isinstance(col, StringColumn):
+                total += col.codes.nbytes + sum(sys.getsizeof(c) for c in col.categories)
+            elif isinstance(col, NumberColumn):
+                total += col.values.nbytes + col.ints.nbytes
+            else:
+                total += sys.getsizeof(col)
+        return total
@@ -1,13 +1,91 @@
 import os
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     tushare_token: str = ""
+    # Token pool: JSON object of token -> Tushare points, e.g. {"token_a": 2000, "token_b": 5000}
+    tushare_tokens: Dict[str, int] = {}
+    # Tushare HTTP API; point it at a local stand-in (benchmarks/mock_tushare.py) to run offline
+    tushare_api_url: str = "https://api.tushare.pro"
+    # Upstream fixtures: "record" appends every response to gzip files under FIXTURE_PATH,
+    # "replay" serves them back without network, optionally after FIXTURE_LATENCY seconds
+    fixture_mode: str = ""
+    fixture_path: str = "fixtures/recorded"
+    fixture_latency: float = 0.0
     host: str = "0.0.0.0"
     port: int = 8000
     debug: bool = False
     
+    # stdio (one client per process) or http (streamable HTTP at /mcp and SSE at /sse on host:port)
+    transport: str = "stdio"
+    http_stateless: bool = False
+    http_json_response: bool = False
+    
+    # HTTP connection pool used by TushareClient
+    request_timeout: float = 30.0
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+    http2: bool = False
+    
+    # On-disk response cache
+    cache_enabled: bool = True
+    cache_path: str = "~/.cache/tushare-mcp-server/responses.sqlite3"
+    cache_max_bytes: int = 512 * 1024 * 1024
+    cache_ttl_today: float = 300.0
+    cache_ttl_reference: float = 86400.0
+    
+    # Per-endpoint rate limits (calls per minute); RATE_LIMITS is a JSON object, e.g. {"weekly": 200}
+    rate_limit_enabled: bool = True
+    rate_limit_per_minute: int = 500
+    rate_limit_burst: int = 10
+    rate_limits: Dict[str, int] = {}
+    
+    # Retries with exponential backoff and jitter for transient upstream failures;
+    # RETRY_POLICIES is a JSON object of per-endpoint overrides, e.g. {"stock_basic": {"max_attempts": 2}}
+    retry_enabled: bool = True
+    retry_max_attempts: int = 4
+    retry_base_delay: float = 0.5
+    retry_max_delay: float = 30.0
+    retry_codes: List[int] = []
+    retry_policies: Dict[str, Dict[str, float]] = {}
+    
+    # Per-endpoint circuit breaker: fail fast after this many consecutive upstream failures (0 disables)
+    breaker_failure_threshold: int = 5
+    breaker_reset_timeout: float = 30.0
+    
+    # Split oversized history requests into concurrent chunks
+    chunking_enabled: bool = True
+    chunk_concurrency: int = 8
+    
+    # Exchange trade calendar used to skip non-trading dates and size chunks
+    calendar_enabled: bool = True
+    calendar_exchange: str = "SSE"
+    
+    # Rows per batch yielded by TushareClient.iter_rows
+    stream_batch_size: int = 1000
+    
+    # Optional local OHLCV warehouse, filled by `python -m tushare_mcp_server.warehouse sync`
+    warehouse_enabled: bool = False
+    warehouse_path: str = "~/.cache/tushare-mcp-server/warehouse.sqlite3"
+    warehouse_start_date: str = "20150101"
+    warehouse_index_codes: str = "000001.SH,399001.SZ,399300.SZ,000905.SH,399006.SZ"
+    warehouse_sync_concurrency: int = 4
+    
+    # Share one upstream request between concurrent identical calls
+    coalesce_requests: bool = True
+    
+    # resolve_symbol: seconds between scheduled background reloads of the in-memory stock_basic/namechange index
+    symbols_refresh_interval: float = 86400.0
+    
+    # batch tool: maximum sub-calls per request
+    batch_max_calls: int = 50
+    
+    # Tool result serialization: json, json_pretty, columns, csv or tsv; JSON_BACKEND is auto, orjson or json
+    output_format: str = "json"
+    json_backend: str = "auto"
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
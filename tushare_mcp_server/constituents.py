@@ -0,0 +1,249 @@
+import asyncio
+import bisect
+import calendar
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from .analytics import AnalyticsTool, Fetch
+from .cache import today_cst
+
+logger = logging.getLogger(__name__)
+
+# index_weight publishes roughly one snapshot per month; look this far back for the latest one
+MAX_LOOKBACK_MONTHS = 12
+
+# Snapshots for the current month may still arrive; refetch it at most this often
+CURRENT_MONTH_TTL = 300.0
+
+WEIGHT_FIELDS = "index_code,con_code,trade_date,weight"
+
+
+def month_of(value: str) -> str:
+    return value[:6]
+
+
+def shift_month(month: str, delta: int) -> str:
+    index = int(month[:4]) * 12 + int(month[4:6]) - 1 + delta
+    return f"{index // 12:04d}{index % 12 + 1:02d}"
+
+
+def month_range(month: str) -> Tuple[str, str]:
+    last = calendar.monthrange(int(month[:4]), int(month[4:6]))[1]
+    return f"{month}01", f"{month}{last:02d}"
+
+
+def months_between(start: str, end: str) -> List[str]:
+    months = []
+    month = month_of(start)
+    while month <= month_of(end):
+        months.append(month)
+        month = shift_month(month, 1)
+    return months
+
+
+class IndexConstituents:
+    """Constituent snapshots of one index, indexed by date and by member"""
+
+    def __init__(self, index_code: str):
+        self.index_code = index_code
+        self.dates: List[str] = []
+        self.snapshots: Dict[str, Dict[str, Optional[float]]] = {}
+        # month -> monotonic load time; past months are final once loaded
+        self.loaded: Dict[str, float] = {}
+        self._history: Optional[Dict[str, List[Tuple[str, Optional[float]]]]] = None
+
+    def add_rows(self, fields: List[str], items: List[List[Any]]):
+        con_idx = fields.index("con_code")
+        date_idx = fields.index("trade_date")
+        weight_idx = fields.index("weight")
+        fresh: Dict[str, Dict[str, Optional[float]]] = {}
+        for row in items:
+            fresh.setdefault(row[date_idx], {})[row[con_idx]] = row[weight_idx]
+        for date, members in fresh.items():
+            if date not in self.snapshots:
+                bisect.insort(self.dates, date)
+            self.snapshots[date] = members
+        if fresh:
+            self._history = None
+
+    def snapshot_on(self, date: str) -> Optional[str]:
+        """Latest snapshot date on or before date"""
+        pos = bisect.bisect_right(self.dates, date)
+        return self.dates[pos - 1] if pos else None
+
+    def history(self, con_code: str) -> List[Tuple[str, Optional[float]]]:
+        """(date, weight) for every snapshot containing con_code, oldest first"""
+        if self._history is None:
+            history: Dict[str, List[Tuple[str, Optional[float]]]] = {}
+            for date in self.dates:
+                for code, weight in self.snapshots[date].items():
+                    history.setdefault(code, []).append((date, weight))
+            self._history = history
+        return self._history.get(con_code, [])
+
+
+class ConstituentStore:
+    """In-memory index constituent store filled month by month from index_weight
+
+    Months before the current one are fetched once; the current month is
+    refetched after CURRENT_MONTH_TTL. Fetches go through the server's fetch
+    path, so they are also cached on disk and rate limited.
+    """
+
+    def __init__(self, fetch: Fetch):
+        self._fetch = fetch
+        self.indexes: Dict[str, IndexConstituents] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.fetches = 0
+
+    def _index(self, index_code: str) -> IndexConstituents:
+        index = self.indexes.get(index_code)
+        if index is None:
+            index = self.indexes[index_code] = IndexConstituents(index_code)
+            self._locks[index_code] = asyncio.Lock()
+        return index
+
+    def _stale(self, index: IndexConstituents, month: str, current: str) -> bool:
+        loaded_at = index.loaded.get(month)
+        if loaded_at is None:
+            return True
+        return month >= current and time.monotonic() - loaded_at > CURRENT_MONTH_TTL
+
+    async def ensure_months(self, index_code: str, months: List[str]) -> IndexConstituents:
+        """Load any months not yet held for index_code"""
+        index = self._index(index_code)
+        current = month_of(today_cst())
+        months = [m for m in months if m <= current]
+        if not any(self._stale(index, m, current) for m in months):
+            return index
+
+        async with self._locks[index_code]:
+            missing = [m for m in months if self._stale(index, m, current)]
+
+            async def load(month: str):
+                start, end = month_range(month)
+                response = await self._fetch(
+                    "index_weight", {"index_code": index_code, "start_date": start, "end_date": end}, WEIGHT_FIELDS
+                )
+                self.fetches += 1
+                data = response.data or {}
+                return month, data.get("fields") or [], data.get("items") or []
+
+            for month, fields, items in await asyncio.gather(*(load(m) for m in missing)):
+                if items:
+                    index.add_rows(fields, items)
+                index.loaded[month] = time.monotonic()
+            logger.debug(f"Loaded {len(missing)} months of {index_code} constituents")
+        return index
+
+    async def snapshot_on(self, index_code: str, date: str) -> Tuple[IndexConstituents, Optional[str]]:
+        """Latest snapshot on or before date, loading earlier months until one is found"""
+        month = month_of(date)
+        index = await self.ensure_months(index_code, [shift_month(month, -1), month])
+        snapshot = index.snapshot_on(date)
+        lookback = 2
+        while snapshot is None and lookback < MAX_LOOKBACK_MONTHS:
+            earlier = [shift_month(month, -m) for m in range(lookback, min(lookback + 3, MAX_LOOKBACK_MONTHS))]
+            index = await self.ensure_months(index_code, earlier)
+            snapshot = index.snapshot_on(date)
+            lookback += 3
+        return index, snapshot
+
+    async def members(self, index_code: str, date: str) -> Dict[str, Any]:
+        index, snapshot = await self.snapshot_on(index_code, date)
+        if snapshot is None:
+            return {"fields": WEIGHT_FIELDS.split(","), "items": []}
+        members = index.snapshots[snapshot]
+        ordered = sorted(members.items(), key=lambda kv: (-(kv[1] or 0.0), kv[0]))
+        return {
+            "fields": WEIGHT_FIELDS.split(","),
+            "items": [[index_code, code, snapshot, weight] for code, weight in ordered],
+        }
+
+    async def changes(self, index_code: str, start_date: str, end_date: str) -> Dict[str, Any]:
+        """Members added and removed between the snapshots in force on start_date and end_date"""
+        _, before = await self.snapshot_on(index_code, start_date)
+        index, after = await self.snapshot_on(index_code, end_date)
+        old = index.snapshots.get(before, {}) if before else {}
+        new = index.snapshots.get(after, {}) if after else {}
+        items = [[index_code, code, "added", before, after, None, new[code]] for code in sorted(new.keys() - old.keys())]
+        items += [[index_code, code, "removed", before, after, old[code], None] for code in sorted(old.keys() - new.keys())]
+        return {
+            "fields": ["index_code", "con_code", "change", "from_date", "to_date", "weight_before", "weight_after"],
+            "items": items,
+        }
+
+    async def weight_history(self, index_code: str, con_code: str, start_date: str, end_date: str) -> Dict[str, Any]:
+        """Weight of con_code in every snapshot between start_date and end_date, newest first"""
+        index = await self.ensure_months(index_code, months_between(start_date, end_date))
+        rows = [
+            [index_code, con_code, date, weight]
+            for date, weight in reversed(index.history(con_code))
+            if start_date <= date <= end_date
+        ]
+        return {"fields": WEIGHT_FIELDS.split(","), "items": rows}
+
+    async def run(self, name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        index_code = params.get("index_code")
+        if not index_code:
+            raise ValueError(f"{name} requires index_code")
+        today = today_cst()
+        if name == "index_members":
+            return await self.members(index_code, params.get("trade_date") or today)
+        if name == "index_changes":
+            if not params.get("start_date"):
+                raise ValueError("index_changes requires start_date")
+            return await self.changes(index_code, params["start_date"], params.get("end_date") or today)
+        if name == "index_weight_history":
+            if not params.get("con_code"):
+                raise ValueError("index_weight_history requires con_code")
+            start = params.get("start_date") or month_range(shift_month(month_of(today), -(MAX_LOOKBACK_MONTHS - 1)))[0]
+            return await self.weight_history(index_code, params["con_code"], start, params.get("end_date") or today)
+        raise ValueError(f"Unknown constituent tool: {name}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "indexes": {
+                code: {"snapshots": len(index.dates), "months": len(index.loaded)}
+                for code, index in self.indexes.items()
+            },
+            "fetches": self.fetches,
+        }
+
+
+INDEX_CODE_PROPERTY = {"type": "string", "description": "Index code (e.g., 399300.SZ, 000905.SH)"}
+
+CONSTITUENT_TOOLS = (
+    AnalyticsTool(
+        "index_members",
+        "Constituents and weights of an index on a date, from the latest index_weight snapshot (requires 2000+ Tushare points)",
+        {
+            "index_code": INDEX_CODE_PROPERTY,
+            "trade_date": {"type": "string", "description": "Date (YYYYMMDD format, default today)"},
+        },
+        required=("index_code",),
+    ),
+    AnalyticsTool(
+        "index_changes",
+        "Constituents added to and removed from an index between two dates (requires 2000+ Tushare points)",
+        {
+            "index_code": INDEX_CODE_PROPERTY,
+            "start_date": {"type": "string", "description": "Start date (YYYYMMDD format)"},
+            "end_date": {"type": "string", "description": "End date (YYYYMMDD format, default today)"},
+        },
+        required=("index_code", "start_date"),
+    ),
+    AnalyticsTool(
+        "index_weight_history",
+        "Weight history of one constituent in an index, newest first (requires 2000+ Tushare points)",
+        {
+            "index_code": INDEX_CODE_PROPERTY,
+            "con_code": {"type": "string", "description": "Constituent stock code (e.g., 600519.SH)"},
+            "start_date": {"type": "string", "description": "Start date (YYYYMMDD format, default 12 months ago)"},
+            "end_date": {"type": "string", "description": "End date (YYYYMMDD format, default today)"},
+        },
+        required=("index_code", "con_code"),
+    ),
+)
+
+CONSTITUENTS = {tool.name: tool for tool in CONSTITUENT_TOOLS}
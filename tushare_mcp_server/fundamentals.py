@@ -0,0 +1,191 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from .analytics import AnalyticsTool, Fetch
+from .cache import today_cst
+from .chunking import WEEKDAYS, iter_dates, split_codes
+from .columnar import ColumnarData, join_codes
+from .config import settings
+from .constituents import ConstituentStore
+
+logger = logging.getLogger(__name__)
+
+# Each trading date costs one full-market daily_basic call (cached on disk afterwards)
+MAX_DATES = 260
+
+BASIC_FIELDS = "ts_code,trade_date,pe,pe_ttm,pb,turnover_rate,turnover_rate_f,total_mv,circ_mv"
+
+WEIGHTINGS = ("index", "mv", "equal")
+
+OUTPUT_FIELDS = [
+    "index_code", "trade_date", "constituents", "matched", "weight_coverage",
+    "pe", "pe_ttm", "pb", "turnover_rate", "turnover_rate_f", "total_mv", "circ_mv",
+]
+
+
+VALUE_COLUMNS = ("pe", "pe_ttm", "pb", "turnover_rate", "turnover_rate_f", "total_mv", "circ_mv")
+
+
+def _floats(table: ColumnarData, name: str) -> np.ndarray:
+    values = table.to_numpy(name)
+    if values.dtype != object:
+        return values.astype(np.float64, copy=False)
+    # Only a column that is entirely null decodes to objects
+    return np.array([np.nan if v is None else v for v in values.tolist()], dtype=np.float64)
+
+
+def _harmonic(weights: np.ndarray, ratios: np.ndarray) -> Optional[float]:
+    """Weighted harmonic mean over positive ratios: total weight / total weight-per-ratio (e.g. cap / earnings)"""
+    valid = ratios > 0
+    if not valid.any():
+        return None
+    return float(weights[valid].sum() / (weights[valid] / ratios[valid]).sum())
+
+
+def _mean(weights: np.ndarray, values: np.ndarray) -> Optional[float]:
+    valid = ~np.isnan(values)
+    if not valid.any() or weights[valid].sum() == 0:
+        return None
+    return float((weights[valid] * values[valid]).sum() / weights[valid].sum())
+
+
+def aggregate(
+    label: str,
+    trade_date: str,
+    members: List[str],
+    member_weights: Optional[np.ndarray],
+    basic: Dict[str, Any],
+    weighting: str,
+) -> List[Any]:
+    """Join one daily_basic cross-section onto a member list and compute index-level figures"""
+    table = ColumnarData.from_dict(basic)
+    matched, rows = join_codes(np.asarray(members, dtype=str), table.to_numpy("ts_code").astype(str))
+    columns = {name: np.take(_floats(table, name), rows) for name in VALUE_COLUMNS}
+    if weighting == "index" and member_weights is not None:
+        weights = member_weights[matched]
+        coverage = float(weights.sum() / member_weights.sum()) if member_weights.sum() else None
+    elif weighting == "mv":
+        weights = np.nan_to_num(columns["total_mv"])
+        coverage = float(matched.mean()) if len(members) else None
+    else:
+        weights = np.ones(int(matched.sum()))
+        coverage = float(matched.mean()) if len(members) else None
+
+    def rounded(value: Optional[float], digits: int) -> Optional[float]:
+        return None if value is None else round(value, digits)
+
+    return [
+        label,
+        trade_date,
+        len(members),
+        int(matched.sum()),
+        rounded(coverage, 4),
+        rounded(_harmonic(weights, columns["pe"]), 4),
+        rounded(_harmonic(weights, columns["pe_ttm"]), 4),
+        rounded(_harmonic(weights, columns["pb"]), 4),
+        rounded(_mean(weights, columns["turnover_rate"]), 4),
+        rounded(_mean(weights, columns["turnover_rate_f"]), 4),
+        rounded(float(np.nansum(columns["total_mv"])), 2),
+        rounded(float(np.nansum(columns["circ_mv"])), 2),
+    ]
+
+
+class IndexFundamentals:
+    """Index-level PE/PB/turnover/market cap from constituents joined with daily_basic
+
+    Results for closed dates are kept per (label, weighting, date); the
+    underlying daily_basic cross-sections go through the server fetch path
+    and its on-disk response cache.
+    """
+
+    def __init__(self, fetch: Fetch, constituents: ConstituentStore, get_calendar: Callable[[], Awaitable[Any]]):
+        self._fetch = fetch
+        self._constituents = constituents
+        self._get_calendar = get_calendar
+        self._results: Dict[Tuple[str, str, str], List[Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def _trading_days(self, start: str, end: str) -> List[str]:
+        calendar = await self._get_calendar()
+        if calendar is not None:
+            return calendar.trading_days(start, end)
+        return [d for d in iter_dates(start, end) if WEEKDAYS.is_open(d)]
+
+    async def _members(self, index_code: Optional[str], basket: List[str], trade_date: str) -> Tuple[List[str], Optional[np.ndarray]]:
+        if basket:
+            return basket, None
+        members = await self._constituents.members(index_code, trade_date)
+        items = members["items"]
+        weights = np.array([np.nan if row[3] is None else row[3] for row in items], dtype=np.float64)
+        return [row[1] for row in items], np.nan_to_num(weights)
+
+    async def _compute(self, label: str, index_code: Optional[str], basket: List[str], trade_date: str, weighting: str) -> List[Any]:
+        key = (label, weighting, trade_date)
+        cached = self._results.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+
+        members, weights = await self._members(index_code, basket, trade_date)
+        response = await self._fetch("daily_basic", {"trade_date": trade_date}, BASIC_FIELDS)
+        basic = response.data or {}
+        if not basic.get("items"):
+            return [label, trade_date, len(members), 0] + [None] * (len(OUTPUT_FIELDS) - 4)
+
+        row = aggregate(label, trade_date, members, weights, basic, weighting)
+        if trade_date < today_cst():
+            self._results[key] = row
+        return row
+
+    async def compute(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        index_code = params.get("index_code")
+        basket = split_codes(params.get("ts_code"))
+        if bool(index_code) == bool(basket):
+            raise ValueError("Provide either index_code or ts_code (a comma-separated basket)")
+        weighting = params.get("weighting") or ("index" if index_code else "mv")
+        if weighting not in WEIGHTINGS:
+            raise ValueError(f"Unknown weighting: {weighting} (expected one of {', '.join(WEIGHTINGS)})")
+        if weighting == "index" and basket:
+            raise ValueError("index weighting needs index_code; use mv or equal for a basket")
+
+        if params.get("trade_date"):
+            dates = [params["trade_date"]]
+        else:
+            end = params.get("end_date") or today_cst()
+            start = params.get("start_date") or end
+            dates = await self._trading_days(start, end)
+        if len(dates) > MAX_DATES:
+            raise ValueError(f"At most {MAX_DATES} trading days per request, got {len(dates)}; narrow the date range")
+
+        label = index_code or ",".join(basket)
+        semaphore = asyncio.Semaphore(settings.chunk_concurrency)
+
+        async def run(day: str) -> List[Any]:
+            async with semaphore:
+                return await self._compute(label, index_code, basket, day, weighting)
+
+        rows = await asyncio.gather(*(run(day) for day in dates))
+        return {"fields": list(OUTPUT_FIELDS), "items": sorted(rows, key=lambda r: r[1], reverse=True)}
+
+
+FUNDAMENTALS_TOOL = AnalyticsTool(
+    "index_fundamentals",
+    "Weighted PE, PE TTM, PB, turnover and total market cap of an index or stock basket per trading day, "
+    "from constituents joined with daily_basic (requires 2000+ Tushare points)",
+    {
+        "index_code": {"type": "string", "description": "Index code (e.g., 399300.SZ); constituents from index_weight"},
+        "ts_code": {"type": "string", "description": "Ad-hoc basket of comma-separated stock codes instead of an index"},
+        "trade_date": {"type": "string", "description": "Trade date (YYYYMMDD format)"},
+        "start_date": {"type": "string", "description": "Start date (YYYYMMDD format)"},
+        "end_date": {"type": "string", "description": "End date (YYYYMMDD format, default today)"},
+        "weighting": {
+            "type": "string",
+            "enum": list(WEIGHTINGS),
+            "description": "Weights: index (index_weight, default for indices), mv (total market cap, default for baskets) or equal",
+        },
+    },
+    required=(),
+)
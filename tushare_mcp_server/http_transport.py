@@ -0,0 +1,88 @@
+import contextlib
+import logging
+from typing import TYPE_CHECKING
+from .config import settings
+
+if TYPE_CHECKING:
+    from .mcp_server import TushareMCPServer
+
+logger = logging.getLogger(__name__)
+
+# Streamable HTTP endpoint, plus the older SSE pair for clients that predate it
+MCP_PATH = "/mcp"
+SSE_PATH = "/sse"
+MESSAGES_PATH = "/messages/"
+
+
+class _StreamableHTTP:
+    """ASGI endpoint handing every request to the session manager"""
+
+    def __init__(self, session_manager):
+        self.session_manager = session_manager
+
+    async def __call__(self, scope, receive, send):
+        await self.session_manager.handle_request(scope, receive, send)
+
+
+def create_app(server: "TushareMCPServer"):
+    """Starlette app serving one TushareMCPServer to any number of HTTP sessions
+
+    Every session runs against the same server object, so the connection
+    pool, response cache, rate limiter, circuit breakers and in-memory stores
+    are shared instead of being rebuilt per client.
+    """
+    try:
+        from mcp.server.sse import SseServerTransport
+        from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+        from starlette.applications import Starlette
+        from starlette.responses import JSONResponse, Response
+        from starlette.routing import Mount, Route
+    except ImportError as e:
+        raise ImportError(f"HTTP transport needs mcp>=1.8 and starlette: {e}")
+
+    session_manager = StreamableHTTPSessionManager(
+        app=server.server,
+        stateless=settings.http_stateless,
+        json_response=settings.http_json_response,
+    )
+    sse = SseServerTransport(MESSAGES_PATH)
+
+    async def handle_sse(request):
+        async with sse.connect_sse(request.scope, request.receive, request._send) as (read_stream, write_stream):
+            await server.server.run(read_stream, write_stream, server.initialization_options())
+        return Response()
+
+    async def health(request):
+        return JSONResponse(server.stats())
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        async with session_manager.run():
+            logger.info(f"Serving MCP over HTTP at {MCP_PATH} and SSE at {SSE_PATH}")
+            try:
+                yield
+            finally:
+                await server.close()
+
+    return Starlette(
+        routes=[
+            Route(MCP_PATH, endpoint=_StreamableHTTP(session_manager)),
+            Route(SSE_PATH, endpoint=handle_sse, methods=["GET"]),
+            Mount(MESSAGES_PATH, app=sse.handle_post_message),
+            Route("/health", endpoint=health, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+async def serve(server: "TushareMCPServer", host: str, port: int):
+    """Run the HTTP app with uvicorn in the current event loop until shutdown"""
+    import uvicorn
+
+    config = uvicorn.Config(
+        create_app(server),
+        host=host,
+        port=port,
+        log_level="debug" if settings.debug else "info",
+    )
+    await uvicorn.Server(config).serve()
@@ -25,8 +25,8 @@ async def main():
     """Main entry point"""
     setup_logging()
     
-    if not settings.tushare_token:
-        print("Error: TUSHARE_TOKEN environment variable is required")
+    if not settings.tushare_token and not settings.tushare_tokens and settings.fixture_mode != "replay":
+        print("Error: TUSHARE_TOKEN (or TUSHARE_TOKENS) environment variable is required")
         sys.exit(1)
     
     server = TushareMCPServer()
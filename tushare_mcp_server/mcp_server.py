@@ -1,55 +1,171 @@
+import asyncio
 import json
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from mcp.server import Server, NotificationOptions
 from mcp.server.models import InitializationOptions
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
 from .tushare_client import TushareClient
+from .columnar import ColumnarData
+from .serialization import dumps, serialize, to_payload
+from .query import ResultQuery
+from .registry import ENDPOINTS
+from .analytics import ANALYTICS, ANALYTICS_TOOLS, run_analytics
+from .constituents import CONSTITUENTS, CONSTITUENT_TOOLS, ConstituentStore
+from .fundamentals import FUNDAMENTALS_TOOL, IndexFundamentals
+from .symbols import RESOLVE_TOOL, SymbolStore
+from .screener import SCREEN_TOOL, Screener
+from .adjust import ADJ_MODES, AdjFactorStore, adjust_fields
+from .warehouse import Warehouse
 from .models import *
 from .config import settings
 
 logger = logging.getLogger(__name__)
 
+BATCH_TOOL = Tool(
+    name="batch",
+    description="Run several tool calls concurrently in one request and return each call's data or error",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "calls": {
+                "type": "array",
+                "description": "Tool calls to run, e.g. [{\"tool\": \"daily\", \"arguments\": {\"ts_code\": \"000001.SZ\"}}]",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "tool": {"type": "string", "description": "Tool name (any tool except batch)"},
+                        "arguments": {"type": "object", "description": "Arguments for the tool, including fields/where/sort/limit/format"},
+                        "id": {"type": "string", "description": "Optional label echoed back with the result"}
+                    },
+                    "required": ["tool"]
+                }
+            },
+            "format": {"type": "string", "enum": ["json", "json_pretty"], "description": "Encoding of the combined response (default json)"}
+        },
+        "required": ["calls"]
+    }
+)
+
+# Built once from the endpoint registry and analytics declarations; list_tools hands out copies of this tuple
+TOOLS: Tuple[Tool, ...] = tuple(
+    Tool(name=endpoint.name, description=endpoint.description, inputSchema=endpoint.input_schema())
+    for endpoint in ENDPOINTS.values()
+) + tuple(
+    Tool(name=tool.name, description=tool.description, inputSchema=tool.input_schema())
+    for tool in ANALYTICS_TOOLS + CONSTITUENT_TOOLS + (FUNDAMENTALS_TOOL, RESOLVE_TOOL, SCREEN_TOOL)
+) + (BATCH_TOOL,)
+
 class TushareMCPServer:
     def __init__(self):
         self.server = Server("tushare-mcp-server")
         self.client = TushareClient()
+        self.warehouse = Warehouse.from_settings(settings) if settings.warehouse_enabled else None
+        self.constituents = ConstituentStore(self.fetch)
+        self.fundamentals = IndexFundamentals(self.fetch, self.constituents, lambda: self.client.get_calendar())
+        self.symbols = SymbolStore(self.fetch, settings.symbols_refresh_interval)
+        self.screener = Screener(self.fetch_table, self.symbols)
+        self.adjuster = AdjFactorStore(self.fetch)
         self._setup_tools()
         
+    async def fetch(self, name: str, params: Dict[str, Any], fields: Optional[str] = None) -> TushareResponse:
+        """Fetch an endpoint's data, from the local warehouse when it covers the request"""
+        if self.warehouse is not None and self.warehouse.supports(name, params, fields):
+            return await self.warehouse.get(name, params, fields, self.client)
+        return await self.client.query(name, params, fields)
+    
+    async def fetch_table(self, name: str, params: Dict[str, Any], fields: Optional[str] = None) -> ColumnarData:
+        """Like fetch, but as a columnar table streamed from the API without building rows first"""
+        if self.warehouse is not None and self.warehouse.supports(name, params, fields):
+            return ColumnarData.from_dict((await self.warehouse.get(name, params, fields, self.client)).data)
+        return await self.client.query_columnar(name, params, fields)
+    
+    async def execute(self, name: str, arguments: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], str]:
+        """Run one data tool and return its filtered payload and requested output format"""
+        # Remove None values from arguments
+        params = {k: v for k, v in arguments.items() if v is not None}
+        output_format = params.pop("format", settings.output_format)
+        if name in ANALYTICS:
+            query = ResultQuery.from_arguments(params)
+            return query.apply(await run_analytics(name, params, self.fetch)), output_format
+        if name in CONSTITUENTS:
+            query = ResultQuery.from_arguments(params)
+            return query.apply(await self.constituents.run(name, params)), output_format
+        if name == FUNDAMENTALS_TOOL.name:
+            query = ResultQuery.from_arguments(params)
+            return query.apply(await self.fundamentals.compute(params)), output_format
+        if name == RESOLVE_TOOL.name:
+            query = ResultQuery.from_arguments(params)
+            return query.apply(await self.symbols.resolve(params)), output_format
+        if name == SCREEN_TOOL.name:
+            # The screener evaluates where/sort/limit itself, vectorized over the cross-section
+            query = ResultQuery.from_arguments(params)
+            return await self.screener.screen(params, query), output_format
+        
+        endpoint = ENDPOINTS.get(name)
+        if endpoint is None:
+            raise ValueError(f"Unknown tool: {name}")
+        adj = params.pop("adj", None) if endpoint.adjustable else None
+        if adj is not None and adj not in ADJ_MODES:
+            raise ValueError(f"Unknown adj: {adj} (expected qfq or hfq)")
+        query = ResultQuery.from_arguments(params, upstream_paging=endpoint.upstream_paging)
+        fields = query.upstream_fields()
+        response = await self.fetch(name, params, adjust_fields(fields) if adj else fields)
+        
+        if not response.data:
+            return None, output_format
+        data = response.data
+        if adj:
+            data = await self.adjuster.adjust(data, adj, params.get("end_date"))
+        return query.apply(data), output_format
+    
+    async def run_batch(self, calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Run sub-calls concurrently; the shared client applies caching, coalescing and rate limits"""
+        if not isinstance(calls, list) or not calls:
+            raise ValueError("batch requires a non-empty 'calls' list")
+        if len(calls) > settings.batch_max_calls:
+            raise ValueError(f"batch accepts at most {settings.batch_max_calls} calls, got {len(calls)}")
+        
+        async def run_one(index: int, call: Dict[str, Any]) -> Dict[str, Any]:
+            tool = call.get("tool") if isinstance(call, dict) else None
+            result: Dict[str, Any] = {"id": call.get("id", index) if isinstance(call, dict) else index, "tool": tool}
+            try:
+                if not tool:
+                    raise ValueError("Each call needs a 'tool' name")
+                if tool == "batch":
+                    raise ValueError("batch calls cannot be nested")
+                data, output_format = await self.execute(tool, call.get("arguments") or {})
+                result["data"] = to_payload(data, output_format) if data else None
+            except Exception as e:
+                logger.error(f"Error in batch call {index} ({tool}): {e}")
+                result["error"] = str(e)
+            return result
+        
+        results = await asyncio.gather(*(run_one(i, call) for i, call in enumerate(calls)))
+        failed = sum(1 for r in results if "error" in r)
+        return {"results": list(results), "succeeded": len(results) - failed, "failed": failed}
+    
     async def handle_call_tool(self, name: str, arguments: Dict[str, Any]) -> List[TextContent]:
         """Handle tool calls"""
         try:
             logger.info(f"Calling tool: {name} with arguments: {arguments}")
             
-            # Remove None values from arguments
-            params = {k: v for k, v in arguments.items() if v is not None}
-            
-            if name == "stock_basic":
-                response = await self.client.get_stock_basic(params)
-            elif name == "daily":
-                response = await self.client.get_daily(params)
-            elif name == "weekly":
-                response = await self.client.get_weekly(params)
-            elif name == "monthly":
-                response = await self.client.get_monthly(params)
-            elif name == "index_daily":
-                response = await self.client.get_index_daily(params)
-            elif name == "index_weekly":
-                response = await self.client.get_index_weekly(params)
-            elif name == "index_monthly":
-                response = await self.client.get_index_monthly(params)
-            elif name == "index_dailybasic":
-                response = await self.client.get_index_dailybasic(params)
-            elif name == "index_weight":
-                response = await self.client.get_index_weight(params)
-            else:
-                raise ValueError(f"Unknown tool: {name}")
+            if name == "batch":
+                output_format = arguments.get("format") or "json"
+                if output_format not in ("json", "json_pretty"):
+                    raise ValueError("batch format must be json or json_pretty; set other formats per call")
+                result = await self.run_batch(arguments.get("calls"))
+                return [TextContent(
+                    type="text",
+                    text=dumps(result, pretty=(output_format == "json_pretty"), backend=settings.json_backend)
+                )]
             
-            if response.data:
+            data, output_format = await self.execute(name, arguments)
+            if data:
                 return [TextContent(
                     type="text",
-                    text=json.dumps(response.data, ensure_ascii=False, indent=2)
+                    text=serialize(data, output_format, settings.json_backend)
                 )]
             else:
                 return [TextContent(
@@ -69,147 +185,64 @@ class TushareMCPServer:
         
         @self.server.list_tools()
         async def handle_list_tools() -> List[Tool]:
-            return [
-                Tool(
-                    name="stock_basic",
-                    description="Get basic stock information and company details",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "ts_code": {"type": "string", "description": "Stock code (e.g., 000001.SZ)"},
-                            "name": {"type": "string", "description": "Company name"},
-                            "exchange": {"type": "string", "description": "Exchange code (SSE, SZSE, BSE)"},
-                            "market": {"type": "string", "description": "Market type (主板, 科创板, 创业板, 北交所)"},
-                            "is_hs": {"type": "string", "description": "Hong Kong Stock Connect eligibility (N, H, S)"},
-                            "list_status": {"type": "string", "description": "Listing status (L, D, P)"},
-                            "limit": {"type": "integer", "description": "Number of records to return (max 2000)"},
-                            "offset": {"type": "integer", "description": "Offset for pagination"}
-                        }
-                    }
-                ),
-                Tool(
-                    name="daily",
-                    description="Get daily stock prices and trading data",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "ts_code": {"type": "string", "description": "Stock code (e.g., 000001.SZ)"},
-                            "trade_date": {"type": "string", "description": "Trade date (YYYYMMDD format)"},
-                            "start_date": {"type": "string", "description": "Start date (YYYYMMDD format)"},
-                            "end_date": {"type": "string", "description": "End date (YYYYMMDD format)"}
-                        }
-                    }
-                ),
-                Tool(
-                    name="weekly",
-                    description="Get weekly stock prices and trading data (requires 2000+ Tushare points)",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "ts_code": {"type": "string", "description": "Stock code (e.g., 000001.SZ)"},
-                            "trade_date": {"type": "string", "description": "Trade date (weekly last trading date, YYYYMMDD format)"},
-                            "start_date": {"type": "string", "description": "Start date (YYYYMMDD format)"},
-                            "end_date": {"type": "string", "description": "End date (YYYYMMDD format)"}
-                        }
-                    }
-                ),
-                Tool(
-                    name="monthly",
-                    description="Get monthly stock prices and trading data (requires 2000+ Tushare points)",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "ts_code": {"type": "string", "description": "Stock code (e.g., 000001.SZ)"},
-                            "trade_date": {"type": "string", "description": "Trade date (monthly last trading date, YYYYMMDD format)"},
-                            "start_date": {"type": "string", "description": "Start date (YYYYMMDD format)"},
-                            "end_date": {"type": "string", "description": "End date (YYYYMMDD format)"}
-                        }
-                    }
-                ),
-                Tool(
-                    name="index_daily",
-                    description="Get index daily prices and trading data (requires 2000+ Tushare points)",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "ts_code": {"type": "string", "description": "Index code (e.g., 000001.SH, 399300.SZ)"},
-                            "trade_date": {"type": "string", "description": "Trade date (YYYYMMDD format)"},
-                            "start_date": {"type": "string", "description": "Start date (YYYYMMDD format)"},
-                            "end_date": {"type": "string", "description": "End date (YYYYMMDD format)"}
-                        }
-                    }
-                ),
-                Tool(
-                    name="index_weekly",
-                    description="Get index weekly prices and trading data (requires 600+ Tushare points)",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "ts_code": {"type": "string", "description": "Index code (e.g., 000001.SH, 399300.SZ)"},
-                            "trade_date": {"type": "string", "description": "Trade date (weekly last trading date, YYYYMMDD format)"},
-                            "start_date": {"type": "string", "description": "Start date (YYYYMMDD format)"},
-                            "end_date": {"type": "string", "description": "End date (YYYYMMDD format)"}
-                        }
-                    }
-                ),
-                Tool(
-                    name="index_monthly",
-                    description="Get index monthly prices and trading data (requires 600+ Tushare points)",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "ts_code": {"type": "string", "description": "Index code (e.g., 000001.SH, 399300.SZ)"},
-                            "trade_date": {"type": "string", "description": "Trade date (monthly last trading date, YYYYMMDD format)"},
-                            "start_date": {"type": "string", "description": "Start date (YYYYMMDD format)"},
-                            "end_date": {"type": "string", "description": "End date (YYYYMMDD format)"}
-                        }
-                    }
-                ),
-                Tool(
-                    name="index_dailybasic",
-                    description="Get index daily basic indicators like PE, PB, turnover rate (requires 400+ Tushare points)",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "ts_code": {"type": "string", "description": "Index code (e.g., 000001.SH, 399300.SZ)"},
-                            "trade_date": {"type": "string", "description": "Trade date (YYYYMMDD format)"},
-                            "start_date": {"type": "string", "description": "Start date (YYYYMMDD format)"},
-                            "end_date": {"type": "string", "description": "End date (YYYYMMDD format)"}
-                        }
-                    }
-                ),
-                Tool(
-                    name="index_weight",
-                    description="Get index component weights and constituents (requires 2000+ Tushare points)",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "index_code": {"type": "string", "description": "Index code, source from index basic info interface"},
-                            "trade_date": {"type": "string", "description": "Trade date (YYYYMMDD format)"},
-                            "start_date": {"type": "string", "description": "Start date (YYYYMMDD format)"},
-                            "end_date": {"type": "string", "description": "End date (YYYYMMDD format)"}
-                        }
-                    }
-                )
-            ]
+            return list(TOOLS)
         
         @self.server.call_tool()
         async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
             """Handle tool calls"""
             return await self.handle_call_tool(name, arguments)
     
-    async def run(self):
-        """Run the MCP server"""
-        async with stdio_server() as (read_stream, write_stream):
-            await self.server.run(
-                read_stream,
-                write_stream,
-                InitializationOptions(
-                    server_name="tushare-mcp-server",
-                    server_version="0.1.0",
-                    capabilities=self.server.get_capabilities(
-                        notification_options=NotificationOptions(),
-                        experimental_capabilities={},
-                    )
+    def initialization_options(self) -> InitializationOptions:
+        return InitializationOptions(
+            server_name="tushare-mcp-server",
+            server_version="0.1.0",
+            capabilities=self.server.get_capabilities(
+                notification_options=NotificationOptions(),
+                experimental_capabilities={},
+            )
+        )
+    
+    def stats(self) -> Dict[str, Any]:
+        """Counters of the shared client components, served at /health in HTTP mode"""
+        client = self.client
+        return {
+            "status": "ok",
+            "cache": client.cache.stats() if client.cache is not None else None,
+            "rate_limiter": client.rate_limiter.stats() if client.rate_limiter is not None else None,
+            "retry": client.retrier.stats() if client.retrier is not None else None,
+            "tokens": client.token_pool.stats() if client.token_pool is not None else None,
+            "singleflight": client.singleflight.stats() if client.singleflight is not None else None,
+            "fixtures": client.transport.stats() or None,
+            "warehouse": self.warehouse.stats() if self.warehouse is not None else None,
+            "constituents": self.constituents.stats(),
+            "symbols": self.symbols.stats(),
+            "screener": self.screener.stats(),
+            "adj_factor": self.adjuster.stats(),
+        }
+    
+    async def close(self):
+        await self.symbols.stop()
+        await self.client.close()
+        if self.warehouse is not None:
+            self.warehouse.close()
+    
+    async def run(self, transport: Optional[str] = None):
+        """Run the MCP server over stdio, or over HTTP on settings.host/settings.port"""
+        transport = transport or settings.transport
+        if transport not in ("stdio", "http"):
+            raise ValueError(f"Unknown transport: {transport} (expected stdio or http)")
+        # Keep the symbol index current while the server runs, even when idle
+        self.symbols.start()
+        if transport == "http":
+            from .http_transport import serve
+            await serve(self, settings.host, settings.port)
+            return
+        try:
+            async with stdio_server() as (read_stream, write_stream):
+                await self.server.run(
+                    read_stream,
+                    write_stream,
+                    self.initialization_options()
                 )
-            )
\ No newline at end of file
+        finally:
+            await self.close()
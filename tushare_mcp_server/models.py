@@ -1,6 +1,7 @@
 from typing import Dict, List, Optional, Any, Union
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from datetime import date
+from .columnar import ColumnarData
 
 class TushareRequest(BaseModel):
     api_name: str
@@ -12,6 +13,14 @@ class TushareResponse(BaseModel):
     code: int
     msg: Optional[str] = None
     data: Optional[Dict[str, Any]] = None
+    
+    _columnar: Optional[ColumnarData] = PrivateAttr(default=None)
+    
+    def to_columnar(self) -> ColumnarData:
+        """Return the fields/items payload as a compact columnar table (built once)"""
+        if self._columnar is None:
+            self._columnar = ColumnarData.from_dict(self.data)
+        return self._columnar
 
 class StockBasicParams(BaseModel):
     ts_code: Optional[str] = None
@@ -0,0 +1,182 @@
+import operator
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+QUERY_PROPERTIES = {
+    "fields": {"type": "string", "description": "Comma-separated output columns (e.g., ts_code,trade_date,close)"},
+    "where": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Row filters such as [\"pct_chg > 5\", \"vol >= 100000\"]; all must match",
+    },
+    "sort": {"type": "string", "description": "Sort columns, e.g. \"pct_chg desc, ts_code\""},
+    "limit": {"type": "integer", "description": "Maximum number of rows to return"},
+    "offset": {"type": "integer", "description": "Number of rows to skip before returning results"},
+}
+
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    "!=": operator.ne,
+    "==": operator.eq,
+    "=": operator.eq,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+
+_PREDICATE_RE = re.compile(r"^\s*([A-Za-z_][A-Za-z0-9_]*)\s*(>=|<=|!=|==|=|>|<)\s*([^<>=!\s].*?)\s*$")
+
+
+def _parse_literal(text: str) -> Union[str, float]:
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "'\"":
+        return text[1:-1]
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+class Predicate:
+    """A single ``column op value`` row filter"""
+
+    def __init__(self, column: str, op: str, value: Union[str, float]):
+        self.column = column
+        self.op = op
+        self.value = value
+        self._compare = OPERATORS[op]
+
+    @classmethod
+    def parse(cls, expression: str) -> "Predicate":
+        match = _PREDICATE_RE.match(expression)
+        if not match:
+            raise ValueError(f"Invalid filter expression: {expression!r} (expected e.g. 'pct_chg > 5')")
+        column, op, literal = match.groups()
+        return cls(column, op, _parse_literal(literal))
+
+    def matches(self, cell: Any) -> bool:
+        if cell is None:
+            return False
+        value = self.value
+        if isinstance(value, float) and isinstance(cell, str):
+            try:
+                cell = float(cell)
+            except ValueError:
+                return False
+        elif isinstance(value, str) and not isinstance(cell, str):
+            cell = str(cell)
+        return self._compare(cell, value)
+
+
+def parse_sort(spec: Union[str, List[str], None]) -> List[Tuple[str, bool]]:
+    """Parse "col desc, other" or ["-col", "other"] into (column, descending) pairs"""
+    if not spec:
+        return []
+    parts = spec.split(",") if isinstance(spec, str) else spec
+    order = []
+    for part in parts:
+        tokens = part.split()
+        if not tokens:
+            continue
+        column = tokens[0]
+        descending = len(tokens) > 1 and tokens[1].lower() == "desc"
+        if column.startswith("-"):
+            column, descending = column[1:], True
+        order.append((column, descending))
+    return order
+
+
+class ResultQuery:
+    """Projection, filtering, ordering and paging applied to a fields/items payload"""
+
+    def __init__(
+        self,
+        fields: Optional[List[str]] = None,
+        where: Optional[List[Predicate]] = None,
+        order_by: Optional[List[Tuple[str, bool]]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ):
+        self.fields = fields
+        self.where = where or []
+        self.order_by = order_by or []
+        self.limit = limit
+        self.offset = offset
+
+    @classmethod
+    def from_arguments(cls, params: Dict[str, Any], upstream_paging: bool = False) -> "ResultQuery":
+        """Remove query arguments from tool params and build the query
+
+        When ``upstream_paging`` is set and no filter or sort is requested,
+        limit/offset stay in params so Tushare pages the result itself.
+        """
+        fields = params.pop("fields", None)
+        if isinstance(fields, str):
+            fields = [f.strip() for f in fields.split(",") if f.strip()]
+
+        where = params.pop("where", None) or []
+        if isinstance(where, str):
+            where = [w for w in re.split(r"\s+and\s+", where, flags=re.IGNORECASE) if w.strip()]
+        predicates = [Predicate.parse(expression) for expression in where]
+        order_by = parse_sort(params.pop("sort", None))
+
+        if upstream_paging and not predicates and not order_by:
+            return cls(fields=fields)
+        return cls(
+            fields=fields or None,
+            where=predicates,
+            order_by=order_by,
+            limit=params.pop("limit", None),
+            offset=params.pop("offset", 0) or 0,
+        )
+
+    @property
+    def is_noop(self) -> bool:
+        return not (self.fields or self.where or self.order_by or self.limit is not None or self.offset)
+
+    def upstream_fields(self) -> Optional[str]:
+        """Columns to request from Tushare: the projection plus filter and sort columns"""
+        if not self.fields:
+            return None
+        columns = list(self.fields)
+        for column in [p.column for p in self.where] + [c for c, _ in self.order_by]:
+            if column not in columns:
+                columns.append(column)
+        return ",".join(columns)
+
+    def apply(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        if self.is_noop or not data or not data.get("fields"):
+            return data
+
+        fields = data.get("fields") or []
+        items = data.get("items") or []
+        index = {name: i for i, name in enumerate(fields)}
+        referenced = [p.column for p in self.where] + [c for c, _ in self.order_by] + (self.fields or [])
+        unknown = [column for column in referenced if column not in index]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(dict.fromkeys(unknown))} (available: {', '.join(fields)})")
+
+        if self.where:
+            checks = [(index[p.column], p) for p in self.where]
+            items = [row for row in items if all(p.matches(row[i]) for i, p in checks)]
+
+        # Stable sorts from the last key to the first; missing values sort last
+        for column, descending in reversed(self.order_by):
+            i = index[column]
+            if descending:
+                items = sorted(items, key=lambda row: (row[i] is not None, row[i] if row[i] is not None else 0), reverse=True)
+            else:
+                items = sorted(items, key=lambda row: (row[i] is None, row[i] if row[i] is not None else 0))
+
+        if self.offset or self.limit is not None:
+            end = None if self.limit is None else self.offset + self.limit
+            items = items[self.offset:end]
+
+        if self.fields and self.fields != fields:
+            positions = [index[name] for name in self.fields]
+            items = [[row[i] for i in positions] for row in items]
+            fields = list(self.fields)
+
+        result = dict(data)
+        result["fields"] = fields
+        result["items"] = items
+        return result
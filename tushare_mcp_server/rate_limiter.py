@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Async token bucket that queues callers in FIFO order instead of failing
+
+    Tushare counts calls per minute, so the refill rate is reduced by the burst
+    size to keep any 60 second window at or below ``per_minute`` calls.
+    """
+
+    def __init__(self, per_minute: int, burst: int = 10):
+        self.per_minute = per_minute
+        self.capacity = max(1, min(burst, per_minute))
+        self.refill_rate = max(per_minute - self.capacity, 1) / 60.0
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        # asyncio.Lock wakes waiters in arrival order, which gives fair queueing
+        self._lock = asyncio.Lock()
+
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.acquired = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.deferrals = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_rate)
+        self.updated = now
+
+    async def acquire(self) -> float:
+        """Wait for a token and return the number of seconds spent waiting"""
+        start = time.monotonic()
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            async with self._lock:
+                self._refill()
+                if self.tokens < 1:
+                    await asyncio.sleep((1 - self.tokens) / self.refill_rate)
+                    self._refill()
+                self.tokens -= 1
+        finally:
+            self.queue_depth -= 1
+
+        waited = time.monotonic() - start
+        self.acquired += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    def available(self) -> float:
+        """Tokens left right now, less the callers already queued for them"""
+        self._refill()
+        return self.tokens - self.queue_depth
+
+    def defer(self, seconds: float):
+        """Hold back the next grant by at least seconds, e.g. after the upstream throttled us"""
+        self._refill()
+        self.tokens = min(self.tokens, 1 - seconds * self.refill_rate)
+        self.deferrals += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "per_minute": self.per_minute,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "acquired": self.acquired,
+            "avg_wait": self.total_wait / self.acquired if self.acquired else 0.0,
+            "max_wait": self.max_wait,
+            "deferrals": self.deferrals,
+        }
+
+
+class RateLimiter:
+    """Per-endpoint token buckets sized from Tushare per-minute quotas"""
+
+    def __init__(self, default_per_minute: int = 500, per_endpoint: Optional[Dict[str, int]] = None, burst: int = 10):
+        self.default_per_minute = default_per_minute
+        self.per_endpoint = per_endpoint or {}
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    @classmethod
+    def from_settings(cls, settings) -> "RateLimiter":
+        return cls(
+            default_per_minute=settings.rate_limit_per_minute,
+            per_endpoint=settings.rate_limits,
+            burst=settings.rate_limit_burst,
+        )
+
+    def bucket(self, api_name: str) -> Optional[TokenBucket]:
+        """Return the bucket for an endpoint, or None when it is unlimited"""
+        if api_name not in self._buckets:
+            per_minute = self.per_endpoint.get(api_name, self.default_per_minute)
+            if per_minute <= 0:
+                return None
+            self._buckets[api_name] = TokenBucket(per_minute, self.burst)
+        return self._buckets[api_name]
+
+    async def acquire(self, api_name: str) -> float:
+        """Wait until a call to api_name is allowed and return the wait time"""
+        bucket = self.bucket(api_name)
+        if bucket is None:
+            return 0.0
+
+        waited = await bucket.acquire()
+        if waited > 0.01:
+            logger.debug(f"Rate limited {api_name} for {waited:.3f}s")
+        return waited
+
+    def defer(self, api_name: str, seconds: float) -> bool:
+        """Delay the next call to api_name; False when the endpoint is unlimited"""
+        bucket = self.bucket(api_name)
+        if bucket is None:
+            return False
+        bucket.defer(seconds)
+        logger.debug(f"Deferred {api_name} by {seconds:.3f}s")
+        return True
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return queue depth and wait time metrics per endpoint"""
+        return {api_name: bucket.stats() for api_name, bucket in self._buckets.items()}
@@ -0,0 +1,192 @@
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, NamedTuple, Tuple
+from .query import QUERY_PROPERTIES
+from .serialization import FORMAT_PROPERTY
+
+# Points every registered account has; endpoints above this mention their requirement
+BASE_POINTS = 120
+
+# Shared argument descriptions
+STOCK_CODE = ("ts_code", "Stock code (e.g., 000001.SZ)")
+INDEX_CODE = ("ts_code", "Index code (e.g., 000001.SH, 399300.SZ)")
+TRADE_DATE = ("trade_date", "Trade date (YYYYMMDD format)")
+WEEK_END = ("trade_date", "Trade date (weekly last trading date, YYYYMMDD format)")
+MONTH_END = ("trade_date", "Trade date (monthly last trading date, YYYYMMDD format)")
+START_DATE = ("start_date", "Start date (YYYYMMDD format)")
+END_DATE = ("end_date", "End date (YYYYMMDD format)")
+ANN_DATE = ("ann_date", "Announcement date (YYYYMMDD format)")
+ANN_START = ("start_date", "Announcement start date (YYYYMMDD format)")
+ANN_END = ("end_date", "Announcement end date (YYYYMMDD format)")
+PERIOD = ("period", "Report period, the last day of a quarter (e.g., 20231231 annual, 20230630 interim)")
+REPORT_TYPE = ("report_type", "Report type (1 consolidated, 2 single quarter, ...; see Tushare docs)")
+COMP_TYPE = ("comp_type", "Company type (1 industrial, 2 bank, 3 insurance, 4 securities)")
+
+DATE_RANGE = (TRADE_DATE, START_DATE, END_DATE)
+
+ADJ_PROPERTY = {
+    "type": "string",
+    "enum": ["qfq", "hfq"],
+    "description": "Price adjustment with adj_factor: qfq (forward, prices as of end_date) or hfq (backward); default unadjusted",
+}
+
+
+class Endpoint(NamedTuple):
+    name: str                            # MCP tool name
+    api_name: str                        # Tushare api_name
+    summary: str                         # tool description without the points note
+    params: Tuple[Tuple[str, str], ...]  # (argument, description), all strings
+    points: int = BASE_POINTS            # minimum Tushare points to call the endpoint
+    cache: str = "none"                  # "market" (immutable once the date has closed), "reference" (TTL) or "none"
+    chunked: bool = False                # trading-date endpoint: calendar checks and chunking of large ranges
+    upstream_paging: bool = False        # Tushare pages with limit/offset itself
+    required: Tuple[str, ...] = ()
+    adjustable: bool = False             # accepts adj=qfq/hfq, applied with cached adj_factor
+
+    @property
+    def description(self) -> str:
+        if self.points > BASE_POINTS:
+            return f"{self.summary} (requires {self.points}+ Tushare points)"
+        return self.summary
+
+    def input_schema(self) -> Dict[str, Any]:
+        properties: Dict[str, Any] = {
+            name: {"type": "string", "description": description} for name, description in self.params
+        }
+        if self.adjustable:
+            properties["adj"] = ADJ_PROPERTY
+        properties.update(QUERY_PROPERTIES)
+        properties["format"] = FORMAT_PROPERTY
+        schema: Dict[str, Any] = {"type": "object", "properties": properties}
+        if self.required:
+            schema["required"] = list(self.required)
+        return schema
+
+
+_ENDPOINTS = (
+    Endpoint(
+        "stock_basic", "stock_basic", "Get basic stock information and company details",
+        (
+            STOCK_CODE,
+            ("name", "Company name"),
+            ("exchange", "Exchange code (SSE, SZSE, BSE)"),
+            ("market", "Market type (主板, 科创板, 创业板, 北交所)"),
+            ("is_hs", "Hong Kong Stock Connect eligibility (N, H, S)"),
+            ("list_status", "Listing status (L, D, P)"),
+        ),
+        points=2000, cache="reference", upstream_paging=True,
+    ),
+    Endpoint(
+        "namechange", "namechange", "Get the history of stock name changes (former names and the reason for each change)",
+        (STOCK_CODE, ANN_START, ANN_END),
+        cache="reference", upstream_paging=True,
+    ),
+    Endpoint(
+        "daily", "daily", "Get daily stock prices and trading data",
+        (STOCK_CODE,) + DATE_RANGE,
+        cache="market", chunked=True, adjustable=True,
+    ),
+    Endpoint(
+        "weekly", "weekly", "Get weekly stock prices and trading data",
+        (STOCK_CODE, WEEK_END, START_DATE, END_DATE),
+        points=2000, cache="market", chunked=True, adjustable=True,
+    ),
+    Endpoint(
+        "monthly", "monthly", "Get monthly stock prices and trading data",
+        (STOCK_CODE, MONTH_END, START_DATE, END_DATE),
+        points=2000, cache="market", chunked=True, adjustable=True,
+    ),
+    Endpoint(
+        "adj_factor", "adj_factor", "Get daily price adjustment factors for splits and dividends",
+        (STOCK_CODE,) + DATE_RANGE,
+        points=2000, cache="market", chunked=True,
+    ),
+    Endpoint(
+        "index_daily", "index_daily", "Get index daily prices and trading data",
+        (INDEX_CODE,) + DATE_RANGE,
+        points=2000, cache="market", chunked=True,
+    ),
+    Endpoint(
+        "index_weekly", "index_weekly", "Get index weekly prices and trading data",
+        (INDEX_CODE, WEEK_END, START_DATE, END_DATE),
+        points=600, cache="market", chunked=True,
+    ),
+    Endpoint(
+        "index_monthly", "index_monthly", "Get index monthly prices and trading data",
+        (INDEX_CODE, MONTH_END, START_DATE, END_DATE),
+        points=600, cache="market", chunked=True,
+    ),
+    Endpoint(
+        "index_dailybasic", "index_dailybasic", "Get index daily basic indicators like PE, PB, turnover rate",
+        (INDEX_CODE,) + DATE_RANGE,
+        points=400, cache="market", chunked=True,
+    ),
+    Endpoint(
+        "index_weight", "index_weight", "Get index component weights and constituents",
+        (("index_code", "Index code, source from index basic info interface"),) + DATE_RANGE,
+        points=2000, cache="market",
+    ),
+    Endpoint(
+        "trade_cal", "trade_cal", "Get exchange trading calendar",
+        (
+            ("exchange", "Exchange code (SSE, SZSE, CFFEX, SHFE, CZCE, DCE, INE), default SSE"),
+            START_DATE,
+            END_DATE,
+            ("is_open", "Trading day flag ('0' closed, '1' open)"),
+        ),
+        points=2000, cache="reference",
+    ),
+    Endpoint(
+        "daily_basic", "daily_basic", "Get daily valuation and turnover indicators per stock (PE, PB, PS, dividend yield, market cap)",
+        (STOCK_CODE,) + DATE_RANGE,
+        points=2000, cache="market", chunked=True,
+    ),
+    Endpoint(
+        "stk_limit", "stk_limit", "Get daily limit-up and limit-down prices",
+        (STOCK_CODE,) + DATE_RANGE,
+        points=2000, cache="market", chunked=True,
+    ),
+    Endpoint(
+        "hsgt_top10", "hsgt_top10", "Get the top 10 Shanghai/Shenzhen Stock Connect traded stocks per day",
+        (STOCK_CODE,) + DATE_RANGE + (("market_type", "Market type (1 Shanghai, 3 Shenzhen)"),),
+        cache="market", chunked=True,
+    ),
+    Endpoint(
+        "income", "income", "Get income statements for one stock",
+        (STOCK_CODE, ANN_DATE, ANN_START, ANN_END, PERIOD, REPORT_TYPE, COMP_TYPE),
+        points=2000, cache="reference", required=("ts_code",),
+    ),
+    Endpoint(
+        "balancesheet", "balancesheet", "Get balance sheets for one stock",
+        (STOCK_CODE, ANN_DATE, ANN_START, ANN_END, PERIOD, REPORT_TYPE, COMP_TYPE),
+        points=2000, cache="reference", required=("ts_code",),
+    ),
+    Endpoint(
+        "cashflow", "cashflow", "Get cash flow statements for one stock",
+        (STOCK_CODE, ANN_DATE, ANN_START, ANN_END, PERIOD, REPORT_TYPE, COMP_TYPE),
+        points=2000, cache="reference", required=("ts_code",),
+    ),
+    Endpoint(
+        "forecast", "forecast", "Get earnings forecasts by stock or announcement date",
+        (
+            STOCK_CODE, ANN_DATE, ANN_START, ANN_END, PERIOD,
+            ("type", "Forecast type (预增, 预减, 扭亏, 首亏, 续亏, 续盈, 略增, 略减)"),
+        ),
+        points=2000, cache="reference",
+    ),
+    Endpoint(
+        "express", "express", "Get preliminary earnings reports (业绩快报) for one stock",
+        (STOCK_CODE, ANN_DATE, ANN_START, ANN_END, PERIOD),
+        points=2000, cache="reference", required=("ts_code",),
+    ),
+)
+
+# Tool name -> endpoint, read-only
+ENDPOINTS: Mapping[str, Endpoint] = MappingProxyType({endpoint.name: endpoint for endpoint in _ENDPOINTS})
+
+# api_name -> endpoint, for components that only see the upstream name
+ENDPOINTS_BY_API: Mapping[str, Endpoint] = MappingProxyType({endpoint.api_name: endpoint for endpoint in _ENDPOINTS})
+
+# Endpoints whose rows are keyed by trading date and never change once the day is closed
+MARKET_DATA_APIS = frozenset(e.api_name for e in _ENDPOINTS if e.cache == "market")
+# Reference tables that change rarely and can be cached for a long time
+REFERENCE_APIS = frozenset(e.api_name for e in _ENDPOINTS if e.cache == "reference")
@@ -0,0 +1,94 @@
+import logging
+from typing import Any, Dict, List, Optional
+import numpy as np
+from .columnar import ColumnarData, StringColumn
+
+logger = logging.getLogger(__name__)
+
+# Period endpoints that can be derived from daily bars, with their calendar period
+RESAMPLE_APIS = {
+    "weekly": "W",
+    "monthly": "M",
+}
+
+RESAMPLE_SOURCE = "daily"
+
+# Output columns, in the default order of the weekly/monthly endpoints
+PERIOD_FIELDS = ["ts_code", "trade_date", "close", "open", "high", "low", "pre_close", "change", "pct_chg", "vol", "amount"]
+
+# weekly/monthly report vol in lots, amount in thousands of yuan and pct_chg in percent, like daily
+PCT_SCALE = 100.0
+
+
+def _round(values, digits: int) -> List[Optional[float]]:
+    return [None if v != v else v for v in np.round(values, digits).tolist()]
+
+
+def resample_bars(data: Optional[Dict[str, Any]], calendar, period: str) -> Dict[str, Any]:
+    """Aggregate daily bars into weekly ("W") or monthly ("M") bars
+
+    Rows are grouped by ``ts_code`` and the calendar period end of their
+    ``trade_date``; each bar is stamped with the last trading day of its
+    period. The input must hold every trading day of each period it touches.
+    """
+    table = ColumnarData.from_dict(data)
+    if not len(table):
+        return {"fields": list(PERIOD_FIELDS), "items": []}
+
+    codes_col = table["ts_code"]
+    dates_col = table["trade_date"]
+    if not isinstance(codes_col, StringColumn):
+        codes_col = StringColumn.from_values(codes_col)
+    if not isinstance(dates_col, StringColumn):
+        dates_col = StringColumn.from_values(dates_col)
+
+    # Resolve each distinct date once, then broadcast through the dictionary codes
+    code_ids = np.frombuffer(codes_col.codes, dtype=np.int32)
+    date_codes = np.frombuffer(dates_col.codes, dtype=np.int32)
+    ends = [calendar.period_end(d, period) for d in dates_col.categories]
+    if any(end is None for end in ends):
+        missing = [d for d, end in zip(dates_col.categories, ends) if end is None]
+        raise ValueError(f"Trade calendar does not cover {', '.join(sorted(missing)[:3])}")
+    day_keys = np.array([int(d) for d in dates_col.categories], dtype=np.int64)[date_codes]
+    end_keys = np.array([int(e) for e in ends], dtype=np.int64)[date_codes]
+
+    order = np.lexsort((day_keys, end_keys, code_ids))
+    code_ids = code_ids[order]
+    end_keys = end_keys[order]
+    n = len(order)
+    boundary = np.empty(n, dtype=bool)
+    boundary[0] = True
+    boundary[1:] = (code_ids[1:] != code_ids[:-1]) | (end_keys[1:] != end_keys[:-1])
+    starts = np.flatnonzero(boundary)
+    lasts = np.append(starts[1:] - 1, n - 1)
+
+    def column(name: str):
+        return np.asarray(table.to_numpy(name), dtype=np.float64)[order]
+
+    open_ = column("open")[starts]
+    close = column("close")[lasts]
+    pre_close = column("pre_close")[starts]
+    high = np.fmax.reduceat(column("high"), starts)
+    low = np.fmin.reduceat(column("low"), starts)
+    vol = np.add.reduceat(column("vol"), starts)
+    amount = np.add.reduceat(column("amount"), starts)
+    change = close - pre_close
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct_chg = np.where(pre_close != 0, change / pre_close * PCT_SCALE, np.nan)
+
+    categories = codes_col.categories
+    columns = {
+        "ts_code": [categories[i] for i in code_ids[starts].tolist()],
+        "trade_date": [str(e) for e in end_keys[starts].tolist()],
+        "close": _round(close, 2),
+        "open": _round(open_, 2),
+        "high": _round(high, 2),
+        "low": _round(low, 2),
+        "pre_close": _round(pre_close, 2),
+        "change": _round(change, 2),
+        "pct_chg": _round(pct_chg, 4),
+        "vol": _round(vol, 2),
+        "amount": _round(amount, 3),
+    }
+    items = [list(row) for row in zip(*(columns[name] for name in PERIOD_FIELDS))]
+    return {"fields": list(PERIOD_FIELDS), "items": items}
@@ -0,0 +1,260 @@
+import asyncio
+import email.utils
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, NamedTuple, Optional, Tuple, TypeVar
+import httpx
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Tushare codes for failures on its side that usually clear by themselves (-2002: internal system error)
+RETRYABLE_CODES = frozenset({-2002})
+
+# The per-minute frequency limit shares code 40203 with permission and daily quota errors, so match the message
+RATE_LIMIT_MARKERS = ("每分钟", "per minute")
+
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+# Failure classes
+TRANSIENT = "transient"        # upstream degraded: retry and count towards the circuit breaker
+RATE_LIMITED = "rate_limited"  # upstream healthy but throttling us: retry after slowing the rate limiter
+FATAL = "fatal"                # bad parameters, token or permissions: retrying cannot help
+
+
+class TushareAPIError(Exception):
+    """Tushare answered with a non-zero code"""
+
+    def __init__(self, code: Optional[int], msg: Optional[str]):
+        super().__init__(f"Tushare API error: {msg}")
+        self.code = code
+        self.msg = msg or ""
+
+
+class RequestFailed(Exception):
+    """The request did not complete (connection error, timeout, ...)"""
+
+
+class QuotaExhausted(Exception):
+    """Every token eligible for an endpoint is out of quota for now"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(Exception):
+    """Calls to an endpoint are failing fast while its upstream is degraded"""
+
+
+def parse_retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds requested by a Retry-After header, given as seconds or an HTTP date"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def classify(exc: BaseException, retry_codes: FrozenSet[int] = frozenset()) -> Tuple[str, Optional[float]]:
+    """Return the failure class of exc and any delay the upstream asked for"""
+    if isinstance(exc, TushareAPIError):
+        if any(marker in exc.msg for marker in RATE_LIMIT_MARKERS):
+            return RATE_LIMITED, None
+        if exc.code in RETRYABLE_CODES or exc.code in retry_codes:
+            return TRANSIENT, None
+        return FATAL, None
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        if status == 429:
+            return RATE_LIMITED, parse_retry_after(exc.response)
+        if status in RETRYABLE_STATUS:
+            return TRANSIENT, parse_retry_after(exc.response)
+        return FATAL, None
+    if isinstance(exc, QuotaExhausted):
+        return RATE_LIMITED, exc.retry_after
+    if isinstance(exc, RequestFailed):
+        return TRANSIENT, None
+    return FATAL, None
+
+
+class RetryPolicy(NamedTuple):
+    max_attempts: int = 4                   # attempts including the first call
+    base_delay: float = 0.5                 # backoff cap before the first retry, doubled per attempt
+    max_delay: float = 30.0                 # longest single wait; a longer Retry-After fails immediately
+    retry_codes: FrozenSet[int] = frozenset()  # extra Tushare codes treated as transient
+
+    def backoff(self, attempt: int, hint: Optional[float] = None) -> float:
+        """Full-jitter exponential delay after failed attempt number attempt, at least hint"""
+        delay = random.uniform(0.0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        return max(delay, hint) if hint is not None else delay
+
+
+class CircuitBreaker:
+    """Opens after consecutive upstream failures and lets one probe through after reset_timeout
+
+    While open, calls raise CircuitOpenError immediately instead of waiting on
+    a degraded upstream; a successful probe closes the circuit again.
+    """
+
+    def __init__(self, api_name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.api_name = api_name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self.trips = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self):
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return
+        self.rejected += 1
+        remaining = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+        raise CircuitOpenError(
+            f"Tushare {self.api_name} is failing, not calling it for another {remaining:.1f}s"
+        )
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._probing or (self.opened_at is None and self.failures >= self.failure_threshold):
+            if not self._probing:
+                logger.warning(f"Circuit for {self.api_name} opened after {self.failures} consecutive failures")
+            self.trips += 1
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+    def release(self):
+        """Give up a probe slot without an outcome (e.g. the call was cancelled)"""
+        self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "failures": self.failures, "trips": self.trips, "rejected": self.rejected}
+
+
+class Retrier:
+    """Per-endpoint retry policies and circuit breakers around upstream calls"""
+
+    def __init__(
+        self,
+        default: Optional[RetryPolicy] = None,
+        per_endpoint: Optional[Dict[str, RetryPolicy]] = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        rate_limiter=None,
+    ):
+        self.default = default or RetryPolicy()
+        self.per_endpoint = per_endpoint or {}
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.rate_limiter = rate_limiter
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.retries = 0
+        self.gave_up = 0
+
+    @classmethod
+    def from_settings(cls, settings, rate_limiter=None) -> "Retrier":
+        default = RetryPolicy(
+            max_attempts=settings.retry_max_attempts,
+            base_delay=settings.retry_base_delay,
+            max_delay=settings.retry_max_delay,
+            retry_codes=frozenset(settings.retry_codes),
+        )
+        per_endpoint = {api_name: default._replace(**overrides) for api_name, overrides in settings.retry_policies.items()}
+        return cls(
+            default=default,
+            per_endpoint=per_endpoint,
+            failure_threshold=settings.breaker_failure_threshold,
+            reset_timeout=settings.breaker_reset_timeout,
+            rate_limiter=rate_limiter,
+        )
+
+    def policy(self, api_name: str) -> RetryPolicy:
+        return self.per_endpoint.get(api_name, self.default)
+
+    def breaker(self, api_name: str) -> Optional[CircuitBreaker]:
+        """Return the breaker for an endpoint, or None when breakers are disabled"""
+        if self.failure_threshold <= 0:
+            return None
+        if api_name not in self._breakers:
+            self._breakers[api_name] = CircuitBreaker(api_name, self.failure_threshold, self.reset_timeout)
+        return self._breakers[api_name]
+
+    async def call(self, api_name: str, send: Callable[[], Awaitable[T]]) -> T:
+        """Run send until it succeeds, fails permanently or runs out of attempts
+
+        send should acquire the rate limiter itself, so a retry after a
+        throttling error waits in the same queue as every other caller.
+        """
+        policy = self.policy(api_name)
+        breaker = self.breaker(api_name)
+        attempt = 0
+        while True:
+            attempt += 1
+            if breaker is not None:
+                breaker.before_call()
+            try:
+                result = await send()
+            except Exception as e:
+                kind, hint = classify(e, policy.retry_codes)
+                if breaker is not None:
+                    # Any answer other than a transient failure shows the upstream is up
+                    breaker.record_failure() if kind == TRANSIENT else breaker.record_success()
+                if kind == FATAL:
+                    raise
+                if attempt >= policy.max_attempts or (hint is not None and hint > policy.max_delay):
+                    self.gave_up += 1
+                    logger.warning(f"Giving up on {api_name} after {attempt} attempts: {e}")
+                    raise
+                delay = policy.backoff(attempt, hint)
+                self.retries += 1
+                logger.warning(f"{api_name} attempt {attempt} failed ({kind}): {e}; retrying in {delay:.2f}s")
+                if kind == RATE_LIMITED and self.rate_limiter is not None and self.rate_limiter.defer(api_name, delay):
+                    # The next acquire waits out the delay, and holds back other callers too
+                    continue
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                if breaker is not None:
+                    breaker.release()
+                raise
+            if breaker is not None:
+                breaker.record_success()
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "retries": self.retries,
+            "gave_up": self.gave_up,
+            "breakers": {api_name: breaker.stats() for api_name, breaker in self._breakers.items()},
+        }
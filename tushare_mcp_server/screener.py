@@ -0,0 +1,202 @@
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import numpy as np
+from .analytics import AnalyticsTool
+from .cache import today_cst
+from .columnar import ColumnarData, join_codes
+from .query import OPERATORS, Predicate, ResultQuery
+from .symbols import SymbolStore, normalize
+
+logger = logging.getLogger(__name__)
+
+# Columns joined from stock_basic (via the symbol index) and daily_basic
+STOCK_COLUMNS = ("name", "industry", "area", "market", "exchange", "list_date")
+BASIC_COLUMNS = (
+    "turnover_rate", "turnover_rate_f", "volume_ratio", "pe", "pe_ttm", "pb", "ps", "ps_ttm",
+    "dv_ratio", "dv_ttm", "total_share", "float_share", "free_share", "total_mv", "circ_mv",
+)
+
+DEFAULT_FIELDS = ["ts_code", "name", "industry", "trade_date", "close", "pct_chg", "vol", "amount"]
+DEFAULT_BASIC_FIELDS = ["turnover_rate", "volume_ratio", "pe_ttm", "pb", "total_mv"]
+
+# Rows returned when no limit is given; "matched" still counts every row that passed the filters
+DEFAULT_LIMIT = 100
+
+# Cross-sections of closed dates kept decoded in memory
+MAX_CACHED_DATES = 8
+
+Frame = Dict[str, np.ndarray]
+
+# Fetches (tool name, params, fields) as a columnar table, streamed straight into columns when it comes from the API
+FetchTable = Callable[[str, Dict[str, Any], Optional[str]], Awaitable[ColumnarData]]
+
+
+def _join(keys: np.ndarray, table: ColumnarData, columns: Tuple[str, ...]) -> Frame:
+    """Align numeric columns of a table to keys by ts_code; missing rows become NaN"""
+    if "ts_code" not in table:
+        return {}
+    found, rows = join_codes(keys.astype(str), table.to_numpy("ts_code").astype(str))
+    joined: Frame = {}
+    for name in columns:
+        if name not in table:
+            continue
+        values = table.to_numpy(name)
+        if values.dtype == object:
+            # Only a column without a single number decodes to objects
+            values = np.full(len(values), np.nan)
+        column = np.full(len(keys), np.nan)
+        column[found] = np.take(values.astype(np.float64, copy=False), rows)
+        joined[name] = column
+    return joined
+
+
+def _mask(column: np.ndarray, predicate: Predicate) -> np.ndarray:
+    if column.dtype != object and isinstance(predicate.value, float):
+        values = column.astype(np.float64)
+        with np.errstate(invalid="ignore"):
+            return OPERATORS[predicate.op](values, predicate.value) & ~np.isnan(values)
+    return np.fromiter((predicate.matches(cell) for cell in column.tolist()), dtype=bool, count=len(column))
+
+
+def _sort_key(column: np.ndarray, descending: bool) -> np.ndarray:
+    """Float sort key with missing values last in either direction"""
+    if column.dtype != object:
+        values = column.astype(np.float64)
+        missing = np.isnan(values)
+        key = -values if descending else values
+    else:
+        missing = np.array([v is None for v in column.tolist()], dtype=bool)
+        _, codes = np.unique(np.where(missing, "", column).astype(str), return_inverse=True)
+        key = (-codes if descending else codes).astype(np.float64)
+    return np.where(missing, np.inf, key)
+
+
+def _cell(value: Any) -> Any:
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+class Screener:
+    """Filters, ranks and cuts one trading day's whole-market cross-section on the server
+
+    The daily cross-section costs one upstream call per date (cached on disk
+    like any daily request) and is streamed straight into columns; stock_basic
+    columns come from the in-memory symbol index and daily_basic is joined
+    only when a requested column needs it.
+    """
+
+    def __init__(self, fetch_table: FetchTable, symbols: SymbolStore):
+        self._fetch_table = fetch_table
+        self._symbols = symbols
+        self._frames: "OrderedDict[Tuple[str, bool], Frame]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def _stock_columns(self, codes: np.ndarray) -> Frame:
+        try:
+            index = await self._symbols.get()
+        except Exception as e:
+            logger.warning(f"stock_basic unavailable, screening without names and industries: {e}")
+            return {name: np.full(len(codes), None, dtype=object) for name in STOCK_COLUMNS}
+        rows = [index.rows[i] if i is not None else {} for i in (index.by_code.get(code) for code in codes.tolist())]
+        return {name: np.array([row.get(name) for row in rows], dtype=object) for name in STOCK_COLUMNS}
+
+    async def frame(self, trade_date: str, with_basic: bool) -> Frame:
+        """Columns of the cross-section for trade_date, joined with stock_basic and optionally daily_basic"""
+        key = (trade_date, with_basic)
+        cached = self._frames.get(key)
+        if cached is not None:
+            self._frames.move_to_end(key)
+            self.hits += 1
+            return cached
+        self.misses += 1
+
+        table = await self._fetch_table("daily", {"trade_date": trade_date}, None)
+        if not len(table):
+            return {}
+        frame: Frame = {name: table.to_numpy(name) for name in table.fields}
+        frame.update(await self._stock_columns(frame["ts_code"]))
+        if with_basic:
+            basic = await self._fetch_table("daily_basic", {"trade_date": trade_date}, None)
+            frame.update(_join(frame["ts_code"], basic, BASIC_COLUMNS))
+
+        if trade_date < today_cst():
+            self._frames[key] = frame
+            while len(self._frames) > MAX_CACHED_DATES:
+                self._frames.popitem(last=False)
+        return frame
+
+    async def screen(self, params: Dict[str, Any], query: ResultQuery) -> Dict[str, Any]:
+        trade_date = params.get("trade_date")
+        if not trade_date:
+            raise ValueError("screen requires trade_date")
+
+        referenced = [p.column for p in query.where] + [column for column, _ in query.order_by] + (query.fields or [])
+        with_basic = bool(params.get("with_basic")) or any(column in BASIC_COLUMNS for column in referenced)
+        frame = await self.frame(trade_date, with_basic)
+
+        if query.fields:
+            fields = list(query.fields)
+        else:
+            fields = DEFAULT_FIELDS + (DEFAULT_BASIC_FIELDS if with_basic else [])
+            fields += [c for c in dict.fromkeys(referenced) if c not in fields]
+        if query.order_by and "rank" not in fields and not query.fields:
+            fields = ["rank"] + fields
+        if not frame:
+            return {"fields": fields, "items": [], "matched": 0}
+
+        unknown = [c for c in dict.fromkeys(referenced) if c not in frame and c != "rank"]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)} (available: {', '.join(frame)})")
+
+        n = len(frame["ts_code"])
+        mask = np.ones(n, dtype=bool)
+        for predicate in query.where:
+            mask &= _mask(frame[predicate.column], predicate)
+        if params.get("exclude_st"):
+            mask &= np.array([name is None or "st" not in normalize(name) for name in frame["name"].tolist()], dtype=bool)
+        selected = np.flatnonzero(mask)
+        matched = len(selected)
+
+        start = query.offset
+        stop = start + (query.limit if query.limit is not None else DEFAULT_LIMIT)
+        if query.order_by:
+            keys = [_sort_key(frame[column][selected], descending) for column, descending in query.order_by]
+            if len(keys) == 1 and 0 < stop < len(selected):
+                # Top-k: keep every row up to the kth key, ties included, then order only those
+                # by (key, position) so ties at the cut-off resolve as in the full sort
+                kth = np.partition(keys[0], stop - 1)[stop - 1]
+                top = np.flatnonzero(keys[0] <= kth)
+                order = top[np.lexsort((top, keys[0][top]))][:stop]
+            else:
+                order = np.lexsort(tuple(reversed(keys)))
+            selected = selected[order]
+        page = selected[start:stop]
+
+        columns = []
+        for name in fields:
+            if name == "rank":
+                columns.append(list(range(start + 1, start + 1 + len(page))))
+            else:
+                columns.append([_cell(v) for v in frame[name][page].tolist()])
+        return {"fields": fields, "items": [list(row) for row in zip(*columns)], "matched": matched}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"dates": len(self._frames), "hits": self.hits, "misses": self.misses}
+
+
+SCREEN_TOOL = AnalyticsTool(
+    "screen",
+    "Screen the whole market on one trading day: filter (where), rank (sort) and cut (limit) the daily "
+    "cross-section joined with stock_basic (name, industry, area, market, exchange, list_date) and, when a "
+    "column needs it, daily_basic (turnover_rate, volume_ratio, pe, pe_ttm, pb, ps, dv_ratio, total_mv, circ_mv, ...). "
+    "Returns only the matching rows, at most 100 unless limit is set",
+    {
+        "trade_date": {"type": "string", "description": "Trade date (YYYYMMDD format)"},
+        "with_basic": {"type": "boolean", "description": "Join daily_basic even when no filter or sort column needs it"},
+        "exclude_st": {"type": "boolean", "description": "Drop ST and *ST stocks"},
+    },
+    required=("trade_date",),
+)
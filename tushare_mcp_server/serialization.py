@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+import logging
+from typing import Any, Dict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FORMATS = ("json", "json_pretty", "columns", "csv", "tsv")
+
+FORMAT_PROPERTY = {
+    "type": "string",
+    "enum": list(OUTPUT_FORMATS),
+    "description": "Output format: json (compact rows, default), json_pretty, columns (one list per field), csv or tsv",
+}
+
+
+def dumps(obj: Any, pretty: bool = False, backend: str = "auto") -> str:
+    """Serialize to JSON text using orjson when available"""
+    if orjson is not None and backend in ("auto", "orjson"):
+        option = orjson.OPT_INDENT_2 if pretty else 0
+        return orjson.dumps(obj, option=option).decode("utf-8")
+    if backend == "orjson":
+        logger.warning("orjson is not installed, falling back to the standard json module")
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def to_columns(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Transpose a fields/items payload into one list per field"""
+    fields = data.get("fields") or []
+    items = data.get("items") or []
+    columns = [list(col) for col in zip(*items)] if items else [[] for _ in fields]
+    result = {key: value for key, value in data.items() if key not in ("fields", "items")}
+    result["fields"] = fields
+    result["columns"] = dict(zip(fields, columns))
+    return result
+
+
+def to_delimited(data: Dict[str, Any], delimiter: str = ",") -> str:
+    """Render a fields/items payload as CSV or TSV with a header row"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter, lineterminator="\n")
+    writer.writerow(data.get("fields") or [])
+    writer.writerows(data.get("items") or [])
+    return buffer.getvalue()
+
+
+def to_payload(data: Dict[str, Any], fmt: str = "json") -> Any:
+    """Convert a payload to a JSON-compatible value in the requested format, for embedding in a larger response"""
+    if fmt in ("json", "json_pretty"):
+        return data
+    if fmt == "columns":
+        return to_columns(data)
+    if fmt == "csv":
+        return to_delimited(data, ",")
+    if fmt == "tsv":
+        return to_delimited(data, "\t")
+    raise ValueError(f"Unknown output format: {fmt} (expected one of {', '.join(OUTPUT_FORMATS)})")
+
+
+def serialize(data: Dict[str, Any], fmt: str = "json", backend: str = "auto") -> str:
+    """Serialize a Tushare fields/items payload in the requested output format"""
+    if fmt == "json":
+        return dumps(data, backend=backend)
+    if fmt == "json_pretty":
+        return dumps(data, pretty=True, backend=backend)
+    if fmt == "columns":
+        return dumps(to_columns(data), backend=backend)
+    if fmt == "csv":
+        return to_delimited(data, ",")
+    if fmt == "tsv":
+        return to_delimited(data, "\t")
+    raise ValueError(f"Unknown output format: {fmt} (expected one of {', '.join(OUTPUT_FORMATS)})")
@@ -0,0 +1,146 @@
+import codecs
+import json
+from typing import Any, List, Optional, Tuple
+
+_WHITESPACE = " \t\r\n"
+
+# Paths the parser walks into instead of decoding them as a whole value
+_TOP = ()
+_DATA = ("data",)
+_ITEMS = ("data", "items")
+
+
+class IncompleteResponse(Exception):
+    pass
+
+
+class ResponseStreamParser:
+    """Incremental parser for Tushare ``{"code", "msg", "data": {"fields", "items"}}`` bodies
+
+    Feed raw body chunks as they arrive; each call returns the ``items`` rows
+    completed so far. ``fields``, ``code`` and ``msg`` are set as soon as they
+    have been read. Only the top-level object, ``data`` and ``data.items`` are
+    walked character by character; every other value, including each row, is
+    decoded in one step by the C JSON decoder.
+    """
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buf = ""
+        # Frames are [kind, path, expect_key, pending_key]
+        self._stack: List[list] = []
+        self._started = False
+        self.code: Optional[int] = None
+        self.msg: Optional[str] = None
+        self.fields: Optional[List[str]] = None
+        self.has_more: Optional[bool] = None
+        self.has_data = False
+        self.rows = 0
+        self.done = False
+
+    def feed(self, chunk: bytes) -> List[List[Any]]:
+        """Consume a body chunk and return the rows it completed"""
+        self._buf += self._decoder.decode(chunk)
+        return self._parse(final=False)
+
+    def close(self) -> List[List[Any]]:
+        """Signal end of body; raises IncompleteResponse if the JSON was truncated"""
+        self._buf += self._decoder.decode(b"", final=True)
+        rows = self._parse(final=True)
+        if not self.done:
+            raise IncompleteResponse("Response body ended before the JSON document was complete")
+        return rows
+
+    def _decode_value(self, i: int, final: bool) -> Tuple[Any, int]:
+        buf = self._buf
+        try:
+            value, end = self._json.raw_decode(buf, i)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            raise IncompleteResponse()
+        # A number or literal touching the end of the buffer may still be growing
+        if end == len(buf) and not final and not isinstance(value, (list, dict, str)):
+            raise IncompleteResponse()
+        return value, end
+
+    def _on_value(self, path: Tuple[str, ...], value: Any):
+        if path == ("code",):
+            self.code = value
+        elif path == ("msg",):
+            self.msg = value
+        elif path == ("data", "fields"):
+            self.fields = value
+        elif path == ("data", "has_more"):
+            self.has_more = value
+
+    def _parse(self, final: bool) -> List[List[Any]]:
+        buf = self._buf
+        n = len(buf)
+        i = 0
+        rows: List[List[Any]] = []
+        try:
+            while i < n and not self.done:
+                ch = buf[i]
+                if ch in _WHITESPACE:
+                    i += 1
+                    continue
+
+                if not self._stack:
+                    if self._started:
+                        self.done = True
+                        break
+                    if ch != "{":
+                        raise ValueError(f"Unexpected response body starting with {ch!r}")
+                    self._stack.append(["obj", _TOP, True, None])
+                    self._started = True
+                    i += 1
+                    continue
+
+                frame = self._stack[-1]
+                kind, path = frame[0], frame[1]
+
+                if kind == "arr":
+                    if ch == "]":
+                        self._stack.pop()
+                        i += 1
+                    elif ch == ",":
+                        i += 1
+                    else:
+                        row, i = self._decode_value(i, final)
+                        rows.append(row)
+                    continue
+
+                if ch == "}":
+                    self._stack.pop()
+                    i += 1
+                    if not self._stack:
+                        self.done = True
+                elif ch == ",":
+                    frame[2] = True
+                    i += 1
+                elif ch == ":":
+                    i += 1
+                elif frame[2]:
+                    key, i = self._decode_value(i, final)
+                    frame[2] = False
+                    frame[3] = key
+                else:
+                    child = path + (frame[3],)
+                    if child == _DATA and ch == "{":
+                        self.has_data = True
+                        self._stack.append(["obj", child, True, None])
+                        i += 1
+                    elif child == _ITEMS and ch == "[":
+                        self._stack.append(["arr", child, False, None])
+                        i += 1
+                    else:
+                        value, i = self._decode_value(i, final)
+                        self._on_value(child, value)
+        except IncompleteResponse:
+            pass
+
+        self._buf = buf[i:]
+        self.rows += len(rows)
+        return rows
@@ -0,0 +1,295 @@
+import asyncio
+import bisect
+import logging
+import time
+import unicodedata
+from typing import Any, Dict, List, Optional, Set, Tuple
+from .analytics import AnalyticsTool, Fetch
+from .chunking import split_codes
+
+logger = logging.getLogger(__name__)
+
+SYMBOL_FIELDS = "ts_code,symbol,name,cnspell,area,industry,market,exchange,list_status,list_date,delist_date"
+NAMECHANGE_FIELDS = "ts_code,name,start_date,end_date"
+
+# stock_basic only returns listed stocks unless asked for the other statuses
+LIST_STATUSES = ("L", "D", "P")
+
+# namechange rows per upstream page
+NAMECHANGE_PAGE = 5000
+
+MAX_MATCHES = 50
+
+# Sorts after any character that appears in names, closing a prefix range
+PREFIX_END = "\uffff"
+
+OUTPUT_FIELDS = [
+    "query", "ts_code", "name", "match", "matched_on", "matched",
+    "exchange", "market", "industry", "list_status", "list_date", "delist_date",
+]
+
+# Ranking: exact before prefix before substring, current names before pinyin and former names, listed first
+MATCH_RANK = {"exact": 0, "prefix": 1, "contains": 2}
+KIND_RANK = {"code": 0, "name": 1, "cnspell": 2, "former_name": 3}
+STATUS_RANK = {"L": 0, "P": 1, "D": 2}
+
+
+def normalize(text: str) -> str:
+    """Fold full-width characters and case so 万科Ａ, 万科a and 万科A compare equal"""
+    return unicodedata.normalize("NFKC", text).strip().lower().replace(" ", "")
+
+
+def grams(key: str) -> Set[str]:
+    """Single characters and character pairs of key, the posting keys of the substring index"""
+    return set(key) | {key[i:i + 2] for i in range(len(key) - 1)}
+
+
+class SymbolIndex:
+    """Immutable lookup structures over one stock_basic snapshot plus namechange history
+
+    Codes resolve through a dict; names, pinyin initials and former names are
+    kept in one sorted key list for prefix ranges (bisect) and a character
+    and character-pair posting index for substring search, so lookups never
+    scan the universe.
+    """
+
+    def __init__(self, basic: Dict[str, Any], namechange: Optional[Dict[str, Any]] = None):
+        fields = basic.get("fields") or []
+        self.rows: List[Dict[str, Any]] = [dict(zip(fields, item)) for item in basic.get("items") or []]
+        self.by_code: Dict[str, int] = {}
+        for i, row in enumerate(self.rows):
+            self.by_code[row["ts_code"].upper()] = i
+            if row.get("symbol"):
+                self.by_code.setdefault(row["symbol"].upper(), i)
+        self.codes = sorted(self.by_code)
+
+        # entry: (normalized key, row, kind, original text)
+        self.entries: List[Tuple[str, int, str, str]] = []
+        for i, row in enumerate(self.rows):
+            if row.get("name"):
+                self.entries.append((normalize(row["name"]), i, "name", row["name"]))
+            if row.get("cnspell"):
+                self.entries.append((normalize(row["cnspell"]), i, "cnspell", row["cnspell"]))
+        if namechange:
+            self._add_former_names(namechange)
+
+        self.keys = sorted((key, e) for e, (key, _, _, _) in enumerate(self.entries))
+        self.grams: Dict[str, Set[int]] = {}
+        for e, (key, _, _, _) in enumerate(self.entries):
+            for gram in grams(key):
+                self.grams.setdefault(gram, set()).add(e)
+
+    def _add_former_names(self, namechange: Dict[str, Any]):
+        fields = namechange.get("fields") or []
+        code_idx = fields.index("ts_code")
+        name_idx = fields.index("name")
+        seen: Set[Tuple[int, str]] = set()
+        for item in namechange.get("items") or []:
+            row = self.by_code.get((item[code_idx] or "").upper())
+            name = item[name_idx]
+            if row is None or not name or name == self.rows[row].get("name"):
+                continue
+            key = normalize(name)
+            if (row, key) not in seen:
+                seen.add((row, key))
+                self.entries.append((key, row, "former_name", name))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @staticmethod
+    def _prefix_range(sorted_keys: List[Any], low: Any, high: Any) -> List[Any]:
+        return sorted_keys[bisect.bisect_left(sorted_keys, low):bisect.bisect_left(sorted_keys, high)]
+
+    def search(self, term: str) -> Dict[int, Tuple[str, str, str]]:
+        """Best match per row for one term: row -> (match, matched_on, matched text)"""
+        best: Dict[int, Tuple[str, str, str]] = {}
+
+        def offer(row: int, match: str, kind: str, text: str):
+            current = best.get(row)
+            if current is None or (MATCH_RANK[match], KIND_RANK[kind]) < (MATCH_RANK[current[0]], KIND_RANK[current[1]]):
+                best[row] = (match, kind, text)
+
+        key = normalize(term)
+        if not key or not self.rows:
+            return best
+        code = key.upper()
+        if code in self.by_code:
+            offer(self.by_code[code], "exact", "code", self.rows[self.by_code[code]]["ts_code"])
+            return best
+        if code[0].isdigit():
+            for prefixed in self._prefix_range(self.codes, code, code + PREFIX_END):
+                offer(self.by_code[prefixed], "prefix", "code", prefixed)
+
+        if self.keys:
+            for entry_key, e in self._prefix_range(self.keys, (key,), (key + PREFIX_END,)):
+                _, row, kind, text = self.entries[e]
+                offer(row, "exact" if entry_key == key else "prefix", kind, text)
+
+            postings = [self.grams.get(gram) for gram in grams(key) if len(key) == 1 or len(gram) == 2]
+            if all(postings):
+                postings.sort(key=len)
+                for e in postings[0].intersection(*postings[1:]):
+                    entry_key, row, kind, text = self.entries[e]
+                    if key in entry_key and not entry_key.startswith(key):
+                        offer(row, "contains", kind, text)
+        return best
+
+    def resolve(
+        self,
+        terms: List[str],
+        exchange: Optional[str] = None,
+        market: Optional[str] = None,
+        list_status: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        statuses = set(split_codes(list_status)) if list_status else None
+        items = []
+        for term in terms:
+            matches = []
+            for row_id, (match, kind, text) in self.search(term).items():
+                row = self.rows[row_id]
+                if exchange and row.get("exchange") != exchange:
+                    continue
+                if market and row.get("market") != market:
+                    continue
+                if statuses and row.get("list_status") not in statuses:
+                    continue
+                rank = (MATCH_RANK[match], KIND_RANK[kind], STATUS_RANK.get(row.get("list_status"), 3), row["ts_code"])
+                matches.append((rank, [
+                    term, row["ts_code"], row.get("name"), match, kind, text,
+                    row.get("exchange"), row.get("market"), row.get("industry"),
+                    row.get("list_status"), row.get("list_date"), row.get("delist_date"),
+                ]))
+            matches.sort(key=lambda m: m[0])
+            items.extend(item for _, item in matches[:MAX_MATCHES])
+        return {"fields": list(OUTPUT_FIELDS), "items": items}
+
+
+class SymbolStore:
+    """Holds the current SymbolIndex, loading it on first use and refreshing it in the background
+
+    Once started, a scheduled task reloads the index every refresh_interval,
+    so even an idle server keeps a current universe. A lookup that still finds
+    the index stale gets the old one while the replacement loads, so lookups
+    never wait on Tushare after the first one.
+    """
+
+    def __init__(self, fetch: Fetch, refresh_interval: float = 86400.0):
+        self._fetch = fetch
+        self.refresh_interval = refresh_interval
+        self.index: Optional[SymbolIndex] = None
+        self.loaded_at = 0.0
+        self.loads = 0
+        self._lock = asyncio.Lock()
+        self._refreshing: Optional[asyncio.Task] = None
+        self._scheduled: Optional[asyncio.Task] = None
+
+    async def _namechanges(self) -> Optional[Dict[str, Any]]:
+        fields: List[str] = []
+        items: List[List[Any]] = []
+        offset = 0
+        try:
+            while True:
+                response = await self._fetch("namechange", {"limit": NAMECHANGE_PAGE, "offset": offset}, NAMECHANGE_FIELDS)
+                data = response.data or {}
+                page = data.get("items") or []
+                fields = data.get("fields") or fields
+                items.extend(page)
+                if len(page) < NAMECHANGE_PAGE:
+                    break
+                offset += NAMECHANGE_PAGE
+        except Exception as e:
+            logger.warning(f"namechange unavailable, former names will not resolve: {e}")
+            return None
+        return {"fields": fields, "items": items} if fields else None
+
+    async def refresh(self) -> SymbolIndex:
+        """Load a fresh stock_basic universe and namechange history and swap the index in"""
+        responses = await asyncio.gather(
+            *(self._fetch("stock_basic", {"list_status": status}, SYMBOL_FIELDS) for status in LIST_STATUSES)
+        )
+        items: List[List[Any]] = []
+        fields: List[str] = []
+        for response in responses:
+            data = response.data or {}
+            fields = data.get("fields") or fields
+            items.extend(data.get("items") or [])
+        index = SymbolIndex({"fields": fields, "items": items}, await self._namechanges())
+        self.index = index
+        self.loaded_at = time.monotonic()
+        self.loads += 1
+        logger.info(f"Loaded symbol index with {len(index)} stocks and {len(index.entries)} names")
+        return index
+
+    async def _refresh_quietly(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(f"Symbol index refresh failed, keeping the previous one: {e}")
+
+    async def _refresh_on_schedule(self):
+        while True:
+            due = self.loaded_at + self.refresh_interval - time.monotonic() if self.index is not None else self.refresh_interval
+            await asyncio.sleep(max(due, 1.0))
+            # Nothing to keep current until the first lookup has loaded the index
+            if self.index is not None and time.monotonic() - self.loaded_at >= self.refresh_interval:
+                await self._refresh_quietly()
+
+    def start(self):
+        """Start the scheduled background refresh in the running event loop"""
+        if self._scheduled is None or self._scheduled.done():
+            self._scheduled = asyncio.create_task(self._refresh_on_schedule())
+
+    async def stop(self):
+        for task in (self._scheduled, self._refreshing):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._scheduled = None
+        self._refreshing = None
+
+    async def get(self) -> SymbolIndex:
+        if self.index is None:
+            async with self._lock:
+                if self.index is None:
+                    return await self.refresh()
+        if time.monotonic() - self.loaded_at > self.refresh_interval and (
+            self._refreshing is None or self._refreshing.done()
+        ):
+            self._refreshing = asyncio.create_task(self._refresh_quietly())
+        return self.index
+
+    async def resolve(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        terms = [t for t in (params.get("query") or "").split(",") if t.strip()]
+        if not terms:
+            raise ValueError("resolve_symbol requires query")
+        index = await self.get()
+        return index.resolve(terms, params.get("exchange"), params.get("market"), params.get("list_status"))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "stocks": len(self.index) if self.index is not None else 0,
+            "names": len(self.index.entries) if self.index is not None else 0,
+            "loads": self.loads,
+            "age": round(time.monotonic() - self.loaded_at, 1) if self.index is not None else None,
+        }
+
+
+RESOLVE_TOOL = AnalyticsTool(
+    "resolve_symbol",
+    "Resolve stock codes, names, pinyin initials (cnspell) or former names to ts_code from an in-memory "
+    "stock_basic index: exact code, then name prefix, then substring matches (requires 2000+ Tushare points)",
+    {
+        "query": {
+            "type": "string",
+            "description": "One or more comma-separated search terms, e.g. 平安银行, 000001, payh or a former name",
+        },
+        "exchange": {"type": "string", "description": "Exchange code filter (SSE, SZSE, BSE)"},
+        "market": {"type": "string", "description": "Market filter (主板, 创业板, 科创板, CDR, 北交所)"},
+        "list_status": {"type": "string", "description": "Listing status filter (L, D, P; comma-separated), default any"},
+    },
+    required=("query",),
+)
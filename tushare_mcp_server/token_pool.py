@@ -0,0 +1,182 @@
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+from .cache import CST
+from .rate_limiter import RateLimiter
+from .registry import BASE_POINTS, ENDPOINTS_BY_API
+from .retry import RATE_LIMIT_MARKERS, QuotaExhausted, TushareAPIError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Key for benches that apply to every endpoint of a token
+ALL_APIS = "*"
+
+# How long a token sits out an endpoint after Tushare reports its per-minute limit
+MINUTE_COOLDOWN = 15.0
+
+HOUR_QUOTA_MARKERS = ("每小时", "per hour")
+DAY_QUOTA_MARKERS = ("每天", "per day")
+PERMISSION_MARKERS = ("权限", "permission")
+INVALID_TOKEN_MARKERS = ("token",)
+
+
+def seconds_to_midnight_cst() -> float:
+    """Seconds until daily quotas reset at midnight China Standard Time"""
+    now = datetime.now(CST)
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight - now).total_seconds()
+
+
+def required_points(api_name: str) -> int:
+    endpoint = ENDPOINTS_BY_API.get(api_name)
+    return endpoint.points if endpoint is not None else BASE_POINTS
+
+
+class PooledToken:
+    """One Tushare token with its point tier, rate limiter and temporary benches"""
+
+    def __init__(self, token: str, points: Optional[int], limiter: Optional[RateLimiter]):
+        self.token = token
+        self.points = points  # None: tier not declared, eligible until Tushare says otherwise
+        self.limiter = limiter
+        # api_name (or ALL_APIS) -> (monotonic time the bench ends, reason)
+        self.benched: Dict[str, Tuple[float, str]] = {}
+        self.calls = 0
+        self.errors = 0
+
+    @property
+    def label(self) -> str:
+        """Token shortened for logs and stats"""
+        return f"{self.token[:4]}...{self.token[-4:]}" if len(self.token) > 12 else "***"
+
+    def qualifies(self, points: int) -> bool:
+        return self.points is None or self.points >= points
+
+    def bench_ends(self, api_name: str, now: float) -> float:
+        """Monotonic time this token may call api_name again (<= now when it already may)"""
+        ends = 0.0
+        for key in (api_name, ALL_APIS):
+            bench = self.benched.get(key)
+            if bench is not None:
+                if bench[0] <= now:
+                    del self.benched[key]
+                else:
+                    ends = max(ends, bench[0])
+        return ends
+
+    def budget(self, api_name: str) -> float:
+        """Calls this token can make to api_name right now without waiting"""
+        bucket = self.limiter.bucket(api_name) if self.limiter is not None else None
+        return bucket.available() if bucket is not None else math.inf
+
+    def bench(self, api_name: str, seconds: float, reason: str):
+        self.benched[api_name] = (time.monotonic() + seconds, reason)
+        until = "until restart" if math.isinf(seconds) else f"for {seconds:.0f}s"
+        logger.warning(f"Token {self.label} removed from {api_name} {until}: {reason}")
+
+
+class TokenPool:
+    """Routes each call to an eligible token with the most per-minute budget left
+
+    Tokens declare their point tier; a token is only used for endpoints its
+    tier can call. Quota and permission errors take the token out of rotation
+    for that endpoint (or entirely, for an invalid token) and the call moves
+    on to the next eligible token.
+    """
+
+    def __init__(self, tokens: Dict[str, Optional[int]], limiter_factory: Optional[Callable[[], RateLimiter]] = None):
+        if not tokens:
+            raise ValueError("Token pool needs at least one token")
+        self.tokens = [
+            PooledToken(token, points, limiter_factory() if limiter_factory is not None else None)
+            for token, points in tokens.items()
+        ]
+        self.failovers = 0
+
+    @classmethod
+    def from_settings(cls, settings) -> "TokenPool":
+        tokens: Dict[str, Optional[int]] = dict(settings.tushare_tokens)
+        if settings.tushare_token and settings.tushare_token not in tokens:
+            tokens[settings.tushare_token] = None
+        limiter_factory = (lambda: RateLimiter.from_settings(settings)) if settings.rate_limit_enabled else None
+        return cls(tokens, limiter_factory)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def choose(self, api_name: str) -> PooledToken:
+        """Pick the eligible token with the largest budget for api_name"""
+        points = required_points(api_name)
+        qualified = [t for t in self.tokens if t.qualifies(points)]
+        if not qualified:
+            raise ValueError(f"{api_name} requires {points}+ Tushare points and no configured token has them")
+
+        now = time.monotonic()
+        ready = [t for t in qualified if t.bench_ends(api_name, now) <= now]
+        if not ready:
+            wait = min(t.bench_ends(api_name, now) for t in qualified) - now
+            reasons = "; ".join(
+                f"{t.label}: {(t.benched.get(api_name) or t.benched[ALL_APIS])[1]}" for t in qualified
+            )
+            raise QuotaExhausted(f"No Tushare token can call {api_name} right now ({reasons})", retry_after=wait)
+        return max(ready, key=lambda t: (t.budget(api_name), -t.calls))
+
+    async def acquire(self, api_name: str) -> PooledToken:
+        """Choose a token and wait for its rate limiter"""
+        pooled = self.choose(api_name)
+        pooled.calls += 1
+        if pooled.limiter is not None:
+            await pooled.limiter.acquire(api_name)
+        return pooled
+
+    def report_error(self, pooled: PooledToken, api_name: str, error: TushareAPIError) -> bool:
+        """Bench the token if error is about its quota or rights; True when another token should be tried"""
+        pooled.errors += 1
+        msg = error.msg
+        if any(marker in msg for marker in RATE_LIMIT_MARKERS):
+            pooled.bench(api_name, MINUTE_COOLDOWN, msg)
+        elif any(marker in msg for marker in HOUR_QUOTA_MARKERS):
+            pooled.bench(api_name, 3600.0, msg)
+        elif any(marker in msg for marker in DAY_QUOTA_MARKERS):
+            pooled.bench(api_name, seconds_to_midnight_cst(), msg)
+        elif any(marker in msg for marker in PERMISSION_MARKERS):
+            pooled.bench(api_name, math.inf, msg)
+        elif any(marker in msg.lower() for marker in INVALID_TOKEN_MARKERS):
+            pooled.bench(ALL_APIS, math.inf, msg)
+        else:
+            return False
+        self.failovers += 1
+        return True
+
+    async def call(self, api_name: str, post: Callable[[str], Awaitable[T]]) -> T:
+        """Run post(token) on eligible tokens until one succeeds or none is left"""
+        while True:
+            pooled = await self.acquire(api_name)
+            try:
+                return await post(pooled.token)
+            except TushareAPIError as e:
+                if not self.report_error(pooled, api_name, e):
+                    raise
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "failovers": self.failovers,
+            "tokens": [
+                {
+                    "token": t.label,
+                    "points": t.points,
+                    "calls": t.calls,
+                    "errors": t.errors,
+                    "benched": {
+                        api: None if math.isinf(ends) else round(ends - now, 1)
+                        for api, (ends, _) in t.benched.items() if ends > now
+                    },
+                }
+                for t in self.tokens
+            ],
+        }
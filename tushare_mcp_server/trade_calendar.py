@@ -0,0 +1,227 @@
+import logging
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .chunking import WEEKDAYS
+
+logger = logging.getLogger(__name__)
+
+# Bar endpoints whose trade_date must be the last trading day of a week or month
+PERIOD_APIS = {
+    "weekly": "W",
+    "monthly": "M",
+    "index_weekly": "W",
+    "index_monthly": "M",
+}
+
+
+def _period_key(value: str, period: str) -> Tuple[int, int]:
+    day = datetime.strptime(value, "%Y%m%d")
+    if period == "W":
+        iso = day.isocalendar()
+        return iso[0], iso[1]
+    return day.year, day.month
+
+
+def _next_day(value: str) -> str:
+    return (datetime.strptime(value, "%Y%m%d") + timedelta(days=1)).strftime("%Y%m%d")
+
+
+class TradeCalendar:
+    """Precomputed exchange calendar built from the trade_cal endpoint
+
+    Every lookup is O(1): dates map to positions, and per-position arrays hold
+    the cumulative count of open days and the nearest open day on either side.
+    Dates after the loaded range fall back to weekday rules; dates before it
+    are treated as closed.
+    """
+
+    def __init__(self, days: Iterable[Tuple[str, bool]], exchange: str = "SSE"):
+        self.exchange = exchange
+        ordered = sorted(days)
+        self.dates: List[str] = [d for d, _ in ordered]
+        self._pos: Dict[str, int] = {d: i for i, d in enumerate(self.dates)}
+        self._open = bytearray(1 if is_open else 0 for _, is_open in ordered)
+
+        n = len(self.dates)
+        # Open days up to and including each position
+        self._cum = array("i", [0]) * n
+        # Last open position <= i (-1 if none) and first open position >= i (n if none)
+        self._prev = array("i", [-1]) * n
+        self._next = array("i", [n]) * n
+        self.open_positions = array("i")
+
+        running = 0
+        last_open = -1
+        for i in range(n):
+            if self._open[i]:
+                running += 1
+                last_open = i
+                self.open_positions.append(i)
+            self._cum[i] = running
+            self._prev[i] = last_open
+        following = n
+        for i in range(n - 1, -1, -1):
+            if self._open[i]:
+                following = i
+            self._next[i] = following
+
+        # First / last open position in the same week / month for each open position
+        self._period_start: Dict[str, array] = {}
+        self._period_end: Dict[str, array] = {}
+        for period in ("W", "M"):
+            starts = array("i", [-1]) * n
+            ends = array("i", [-1]) * n
+            group: List[int] = []
+            group_key = None
+            for i in list(self.open_positions) + [None]:
+                key = _period_key(self.dates[i], period) if i is not None else None
+                if key != group_key and group:
+                    for j in group:
+                        starts[j] = group[0]
+                        ends[j] = group[-1]
+                    group = []
+                group_key = key
+                if i is not None:
+                    group.append(i)
+            self._period_start[period] = starts
+            self._period_end[period] = ends
+
+    @classmethod
+    def from_response(cls, data: Optional[Dict[str, Any]], exchange: str = "SSE") -> "TradeCalendar":
+        data = data or {}
+        fields = data.get("fields") or []
+        date_idx = fields.index("cal_date")
+        open_idx = fields.index("is_open")
+        days = [(row[date_idx], str(row[open_idx]) == "1") for row in data.get("items") or []]
+        return cls(days, exchange)
+
+    @property
+    def first_date(self) -> Optional[str]:
+        return self.dates[0] if self.dates else None
+
+    @property
+    def last_date(self) -> Optional[str]:
+        return self.dates[-1] if self.dates else None
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def covers(self, start: str, end: str) -> bool:
+        return bool(self.dates) and start >= self.dates[0] and end <= self.dates[-1]
+
+    def is_open(self, value: str) -> bool:
+        pos = self._pos.get(value)
+        if pos is not None:
+            return bool(self._open[pos])
+        if self.dates and value < self.dates[0]:
+            return False
+        return WEEKDAYS.is_open(value)
+
+    def previous_trading_day(self, value: str) -> Optional[str]:
+        """Last trading day strictly before value"""
+        pos = self._pos.get(value)
+        if pos is None or pos == 0:
+            return None
+        prev = self._prev[pos - 1]
+        return self.dates[prev] if prev >= 0 else None
+
+    def next_trading_day(self, value: str) -> Optional[str]:
+        """First trading day strictly after value"""
+        pos = self._pos.get(value)
+        if pos is None or pos + 1 >= len(self.dates):
+            return None
+        following = self._next[pos + 1]
+        return self.dates[following] if following < len(self.dates) else None
+
+    def snap_back(self, value: str) -> Optional[str]:
+        """value itself if it is a trading day, otherwise the previous trading day"""
+        pos = self._pos.get(value)
+        if pos is None:
+            return None
+        prev = self._prev[pos]
+        return self.dates[prev] if prev >= 0 else None
+
+    def count(self, start: str, end: str) -> int:
+        """Number of trading days in [start, end]"""
+        if start > end:
+            return 0
+        if not self.dates:
+            return WEEKDAYS.count(start, end)
+
+        total = 0
+        if end > self.dates[-1]:
+            total += WEEKDAYS.count(max(start, _next_day(self.dates[-1])), end)
+            end = self.dates[-1]
+        start = max(start, self.dates[0])
+        if start > end:
+            return total
+
+        first = self._pos.get(start)
+        last = self._pos.get(end)
+        if first is None or last is None:
+            return total + WEEKDAYS.count(start, end)
+        return total + self._cum[last] - (self._cum[first - 1] if first > 0 else 0)
+
+    def trading_days(self, start: str, end: str) -> List[str]:
+        """Trading days in [start, end] in ascending order"""
+        first = self._pos.get(max(start, self.first_date or start))
+        last = self._pos.get(min(end, self.last_date or end))
+        if first is None or last is None or first > last:
+            return []
+        lo = self._cum[first - 1] if first > 0 else 0
+        hi = self._cum[last]
+        return [self.dates[i] for i in self.open_positions[lo:hi]]
+
+    def _period_anchor(self, value: str, period: str) -> Optional[int]:
+        """Position of an open day in the same period as value"""
+        pos = self._pos.get(value)
+        if pos is None:
+            return None
+        # Closed days belong to the period of the nearest open day in the same period
+        candidate = pos if self._open[pos] else self._prev[pos]
+        if candidate < 0 or _period_key(self.dates[candidate], period) != _period_key(value, period):
+            candidate = self._next[pos]
+            if candidate >= len(self.dates) or _period_key(self.dates[candidate], period) != _period_key(value, period):
+                return None
+        return candidate
+
+    def period_start(self, value: str, period: str) -> Optional[str]:
+        """First trading day of the week ("W") or month ("M") containing value"""
+        candidate = self._period_anchor(value, period)
+        if candidate is None:
+            return None
+        return self.dates[self._period_start[period][candidate]]
+
+    def period_end(self, value: str, period: str) -> Optional[str]:
+        """Last trading day of the week ("W") or month ("M") containing value"""
+        candidate = self._period_anchor(value, period)
+        if candidate is None:
+            return None
+        return self.dates[self._period_end[period][candidate]]
+
+    def windows(self, start: str, end: str, days_per_window: int) -> List[Tuple[str, str]]:
+        """Split [start, end] into windows holding at most days_per_window trading days"""
+        first = self._pos.get(start)
+        last = self._pos.get(end)
+        if first is None or last is None:
+            return WEEKDAYS.windows(start, end, days_per_window)
+        # Index into open_positions of the first open day >= start
+        lo = self._cum[first] - self._open[first]
+        days = self.open_positions[lo:self._cum[last]]
+        return [
+            (self.dates[days[i]], self.dates[days[min(i + days_per_window, len(days)) - 1]])
+            for i in range(0, len(days), days_per_window)
+        ]
+
+
+def snap_period_date(api_name: str, params: Dict[str, Any], calendar: TradeCalendar) -> Dict[str, Any]:
+    """Snap weekly/monthly trade_date to the last trading day of its period"""
+    period = PERIOD_APIS.get(api_name)
+    trade_date = params.get("trade_date")
+    if period and trade_date:
+        period_end = calendar.period_end(trade_date, period)
+        if period_end and period_end != trade_date:
+            logger.debug(f"Snapped {api_name} trade_date {trade_date} to {period_end}")
+            return {**params, "trade_date": period_end}
+    return params
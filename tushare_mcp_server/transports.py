@@ -0,0 +1,232 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Callable, Dict, IO, Optional
+import httpx
+from .cache import make_cache_key
+from .retry import RequestFailed
+
+logger = logging.getLogger(__name__)
+
+FIXTURE_MODES = ("", "record", "replay")
+
+# Recorded responses of one api_name live in <fixture_path>/<api_name>.jsonl.gz
+FIXTURE_SUFFIX = ".jsonl.gz"
+
+# zlib level for fixture files; 9 costs several times the CPU for a few percent smaller files
+COMPRESS_LEVEL = 6
+
+# Replayed bodies are handed to stream readers in chunks of this size
+REPLAY_CHUNK = 64 * 1024
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    """Normalized key of a Tushare request body; the token is not part of it"""
+    return make_cache_key(request["api_name"], request.get("params") or {}, request.get("fields"))
+
+
+class FixtureMissing(Exception):
+    """Replay has no recorded response for a request"""
+
+
+class Transport(ABC):
+    """How TushareClient sends a request body to Tushare and gets the decoded body back
+
+    post returns the whole JSON body (including Tushare error codes) and
+    stream yields it as raw bytes; HTTP and network failures raise.
+    """
+
+    # False when requests never leave the process, so no token is needed
+    needs_token = True
+
+    @abstractmethod
+    async def post(self, url: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Send request to url and return the decoded response body"""
+
+    async def stream(self, url: str, request: Dict[str, Any]) -> AsyncIterator[bytes]:
+        yield json.dumps(await self.post(url, request), ensure_ascii=False).encode("utf-8")
+
+    async def close(self):
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class HTTPTransport(Transport):
+    """Sends requests over the client's pooled httpx connection"""
+
+    def __init__(self, get_client: Callable[[], httpx.AsyncClient]):
+        self._get_client = get_client
+
+    async def post(self, url: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            response = await self._get_client().post(url, json=request)
+        except httpx.RequestError as e:
+            logger.error(f"Request error: {e}")
+            raise RequestFailed(f"Request failed: {e}") from e
+        response.raise_for_status()
+        return response.json()
+
+    async def stream(self, url: str, request: Dict[str, Any]) -> AsyncIterator[bytes]:
+        try:
+            async with self._get_client().stream("POST", url, json=request) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    yield chunk
+        except httpx.RequestError as e:
+            logger.error(f"Request error: {e}")
+            raise RequestFailed(f"Request failed: {e}") from e
+
+
+class RecordingTransport(Transport):
+    """Passes requests to another transport and appends every response body to gzip fixture files
+
+    Each line is "<request key>\\t<json>" so replay can index a file without
+    decoding the bodies. Recording into existing fixtures appends; on replay
+    the latest recording of a request wins. Encoding, compressing and writing
+    run in a worker thread, one write per file at a time, so large payloads
+    do not stall other requests on the event loop.
+    """
+
+    def __init__(self, inner: Transport, path: str):
+        self.inner = inner
+        self.path = os.path.expanduser(path)
+        self._files: Dict[str, IO[str]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.recorded = 0
+
+    def _write(self, request: Dict[str, Any], body: Any):
+        """Append one record; body is the decoded response or, from stream, its raw bytes"""
+        if isinstance(body, bytes):
+            body = json.loads(body)
+        api_name = request["api_name"]
+        f = self._files.get(api_name)
+        if f is None:
+            os.makedirs(self.path, exist_ok=True)
+            f = self._files[api_name] = gzip.open(
+                os.path.join(self.path, api_name + FIXTURE_SUFFIX), "at", compresslevel=COMPRESS_LEVEL, encoding="utf-8"
+            )
+        record = {
+            "request": {"api_name": api_name, "params": request.get("params") or {}, "fields": request.get("fields")},
+            "response": body,
+        }
+        f.write(f"{request_key(request)}\t{json.dumps(record, ensure_ascii=False, separators=(',', ':'))}\n")
+        # Sync-flush so a run that dies before close still leaves readable fixtures
+        f.flush()
+
+    async def _record(self, request: Dict[str, Any], body: Any):
+        lock = self._locks.setdefault(request["api_name"], asyncio.Lock())
+        async with lock:
+            await asyncio.to_thread(self._write, request, body)
+        self.recorded += 1
+
+    async def post(self, url: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        body = await self.inner.post(url, request)
+        await self._record(request, body)
+        return body
+
+    async def stream(self, url: str, request: Dict[str, Any]) -> AsyncIterator[bytes]:
+        chunks = []
+        async for chunk in self.inner.stream(url, request):
+            chunks.append(chunk)
+            yield chunk
+        await self._record(request, b"".join(chunks))
+
+    async def close(self):
+        for api_name, f in list(self._files.items()):
+            async with self._locks[api_name]:
+                f.close()
+        self._files.clear()
+        await self.inner.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"mode": "record", "path": self.path, "recorded": self.recorded}
+
+
+class ReplayTransport(Transport):
+    """Serves recorded responses by request key without touching the network
+
+    A fixture file is indexed the first time its api_name is requested: the
+    index maps request key to the undecoded line, so lookups are a dict access
+    and only the bodies actually replayed are parsed.
+    """
+
+    needs_token = False
+
+    def __init__(self, path: str, latency: float = 0.0):
+        self.path = os.path.expanduser(path)
+        self.latency = latency
+        self._index: Dict[str, Dict[str, str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self, api_name: str) -> Dict[str, str]:
+        index: Dict[str, str] = {}
+        path = os.path.join(self.path, api_name + FIXTURE_SUFFIX)
+        if os.path.exists(path):
+            started = time.perf_counter()
+            try:
+                with gzip.open(path, "rt", encoding="utf-8") as f:
+                    for line in f:
+                        key, _, record = line.partition("\t")
+                        if record:
+                            index[key] = record
+            except EOFError:
+                # Recording was cut off; every flushed line before that is usable
+                logger.warning(f"Fixture {path} is truncated, replaying the {len(index)} complete records")
+            logger.info(f"Indexed {len(index)} {api_name} fixtures in {(time.perf_counter() - started) * 1000:.1f}ms")
+        self._index[api_name] = index
+        return index
+
+    def lookup(self, request: Dict[str, Any]) -> str:
+        """Raw JSON record of a request, raising FixtureMissing when it was never recorded"""
+        api_name = request["api_name"]
+        index = self._index.get(api_name)
+        if index is None:
+            index = self._load(api_name)
+        record = index.get(request_key(request))
+        if record is None:
+            self.misses += 1
+            raise FixtureMissing(
+                f"No recorded response for {api_name} {json.dumps(request.get('params') or {}, ensure_ascii=False)} "
+                f"(fields: {request.get('fields')}) in {self.path}"
+            )
+        self.hits += 1
+        return record
+
+    async def post(self, url: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        record = self.lookup(request)
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        return json.loads(record)["response"]
+
+    async def stream(self, url: str, request: Dict[str, Any]) -> AsyncIterator[bytes]:
+        body = json.dumps(await self.post(url, request), ensure_ascii=False).encode("utf-8")
+        for start in range(0, len(body), REPLAY_CHUNK):
+            yield body[start:start + REPLAY_CHUNK]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": "replay",
+            "path": self.path,
+            "indexed": sum(len(index) for index in self._index.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def make_transport(settings, http: Transport) -> Transport:
+    """The HTTP transport, wrapped for recording or replaced for replay per settings.fixture_mode"""
+    mode = settings.fixture_mode
+    if mode not in FIXTURE_MODES:
+        raise ValueError(f"Unknown FIXTURE_MODE: {mode} (expected record or replay)")
+    if mode == "record":
+        return RecordingTransport(http, settings.fixture_path)
+    if mode == "replay":
+        return ReplayTransport(settings.fixture_path, settings.fixture_latency)
+    return http
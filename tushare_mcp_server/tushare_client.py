@@ -1,22 +1,110 @@
 import httpx
 import asyncio
-from typing import Dict, List, Optional, Any
+import functools
+import time
+from datetime import datetime
+from typing import AsyncGenerator, AsyncIterator, Dict, List, Optional, Any, Tuple
 from .models import TushareRequest, TushareResponse
 from .config import settings
+from .cache import ResponseCache, make_cache_key, today_cst
+from .rate_limiter import RateLimiter
+from .retry import Retrier, TushareAPIError
+from .token_pool import TokenPool
+from .chunking import EARLIEST_DATE, WEEKDAYS, plan_chunks, merge_responses, project_response, split_codes, with_merge_keys
+from .trade_calendar import TradeCalendar, snap_period_date
+from .singleflight import SingleFlight
+from .streaming import ResponseStreamParser
+from .columnar import ColumnarBuilder, ColumnarData
+from .transports import HTTPTransport, Transport, make_transport
+from .registry import ENDPOINTS
 import logging
 
 logger = logging.getLogger(__name__)
 
+# (fields, rows) as yielded by iter_rows
+Batch = Tuple[List[str], List[List[Any]]]
+
 class TushareClient:
     def __init__(self, token: Optional[str] = None):
-        self.token = token or settings.tushare_token
-        self.base_url = "https://api.tushare.pro"
-        self.timeout = 30.0
+        # An explicit token or a single TUSHARE_TOKEN is used directly; TUSHARE_TOKENS routes calls through a pool
+        self.token_pool: Optional[TokenPool] = TokenPool.from_settings(settings) if token is None and settings.tushare_tokens else None
+        self.token = token or settings.tushare_token or (self.token_pool.tokens[0].token if self.token_pool is not None else "")
+        self.base_url = settings.tushare_api_url
+        self.timeout = settings.request_timeout
+        self._http_client: Optional[httpx.AsyncClient] = None
+        # HTTP, or recording to / replaying from fixture files per FIXTURE_MODE
+        self.transport: Transport = make_transport(settings, HTTPTransport(self._get_http_client))
+        # Fixture runs bypass the response cache, so recordings are complete and replays deterministic
+        self.cache: Optional[ResponseCache] = (
+            ResponseCache.from_settings(settings) if settings.cache_enabled and not settings.fixture_mode else None
+        )
+        # With a token pool every token has its own limiter, since Tushare counts calls per token
+        self.rate_limiter: Optional[RateLimiter] = (
+            RateLimiter.from_settings(settings) if settings.rate_limit_enabled and self.token_pool is None else None
+        )
+        self.retrier: Optional[Retrier] = Retrier.from_settings(settings, self.rate_limiter) if settings.retry_enabled else None
+        self.singleflight: Optional[SingleFlight] = SingleFlight() if settings.coalesce_requests else None
+        self._calendar: Optional[TradeCalendar] = None
+        self._calendar_loaded_on: Optional[str] = None
+        self._calendar_retry_at = 0.0
+        self._calendar_lock = asyncio.Lock()
+    
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Return the shared pooled HTTP client, creating it on first use"""
+        if self._http_client is None or self._http_client.is_closed:
+            http2 = settings.http2
+            if http2:
+                try:
+                    import h2  # noqa: F401
+                except ImportError:
+                    logger.warning("HTTP/2 requested but the 'h2' package is not installed, falling back to HTTP/1.1")
+                    http2 = False
+            
+            self._http_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=settings.http_max_connections,
+                    max_keepalive_connections=settings.http_max_keepalive_connections,
+                    keepalive_expiry=settings.http_keepalive_expiry,
+                ),
+            )
+        return self._http_client
+    
+    async def close(self):
+        """Close the shared HTTP client and release pooled connections"""
+        await self.transport.close()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+        if self.cache is not None:
+            self.cache.close()
+    
+    async def __aenter__(self) -> "TushareClient":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
         
-    async def _make_request(self, api_name: str, params: Dict[str, Any], fields: Optional[str] = None) -> TushareResponse:
-        """Make a request to Tushare API"""
-        if not self.token:
+    async def _make_request(self, api_name: str, params: Dict[str, Any], fields: Optional[str] = None, use_cache: bool = True) -> TushareResponse:
+        """Make a request to Tushare API, sharing identical in-flight calls"""
+        if not self.token and self.transport.needs_token:
             raise ValueError("Tushare token is required")
+        
+        if self.singleflight is None:
+            return await self._fetch(api_name, params, fields, use_cache)
+        
+        key = make_cache_key(api_name, params, fields) + ("" if use_cache else ":nocache")
+        return await self.singleflight.do(key, lambda: self._fetch(api_name, params, fields, use_cache))
+    
+    async def _fetch(self, api_name: str, params: Dict[str, Any], fields: Optional[str], use_cache: bool) -> TushareResponse:
+        """Fetch one response, serving from the response cache when possible"""
+        cache = self.cache if use_cache else None
+        if cache is not None:
+            cached = await cache.get(api_name, params, fields)
+            if cached is not None:
+                logger.debug(f"Cache hit for {api_name}")
+                return TushareResponse(**cached)
             
         request_data = TushareRequest(
             api_name=api_name,
@@ -25,62 +113,242 @@ class TushareClient:
             fields=fields
         )
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.post(
-                    self.base_url,
-                    json=request_data.model_dump()
+        async def send() -> Dict[str, Any]:
+            if self.token_pool is not None:
+                return await self.token_pool.call(
+                    api_name, lambda token: self._post(request_data.model_copy(update={"token": token}))
                 )
-                response.raise_for_status()
-                
-                result = response.json()
-                tushare_response = TushareResponse(**result)
-                
-                if tushare_response.code != 0:
-                    logger.error(f"Tushare API error: {tushare_response.msg} (code: {tushare_response.code})")
-                    raise Exception(f"Tushare API error: {tushare_response.msg}")
-                    
-                return tushare_response
-                
-            except httpx.RequestError as e:
-                logger.error(f"Request error: {e}")
-                raise Exception(f"Request failed: {e}")
-            except Exception as e:
-                logger.error(f"Unexpected error: {e}")
-                raise
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(api_name)
+            return await self._post(request_data)
+        
+        result = await (self.retrier.call(api_name, send) if self.retrier is not None else send())
+        if cache is not None:
+            await cache.set(api_name, params, fields, result)
+        return TushareResponse(**result)
     
-    async def get_stock_basic(self, params: Dict[str, Any], fields: Optional[str] = None) -> TushareResponse:
-        """Get basic stock information"""
-        return await self._make_request("stock_basic", params, fields)
+    async def _post(self, request_data: TushareRequest) -> Dict[str, Any]:
+        """Send one request and return the decoded body, raising on HTTP or Tushare errors"""
+        result = await self.transport.post(self.base_url, request_data.model_dump())
+        if result.get("code") != 0:
+            logger.error(f"Tushare API error: {result.get('msg')} (code: {result.get('code')})")
+            raise TushareAPIError(result.get("code"), result.get("msg"))
+        return result
     
-    async def get_daily(self, params: Dict[str, Any], fields: Optional[str] = None) -> TushareResponse:
-        """Get daily stock prices"""
-        return await self._make_request("daily", params, fields)
+    async def iter_rows(self, api_name: str, params: Dict[str, Any], fields: Optional[str] = None, batch_size: Optional[int] = None) -> AsyncIterator[Batch]:
+        """Stream a response and yield (fields, rows) batches while the body downloads
+        
+        The body is parsed incrementally, so the full payload is never held in
+        memory at once. Cached responses are replayed in batches; streamed
+        responses are not written back to the cache.
+        """
+        if not self.token and self.transport.needs_token:
+            raise ValueError("Tushare token is required")
+        batch_size = batch_size or settings.stream_batch_size
+        
+        if self.cache is not None:
+            cached = await self.cache.get(api_name, params, fields)
+            if cached is not None:
+                data = cached.get("data") or {}
+                items = data.get("items") or []
+                for start in range(0, max(len(items), 1), batch_size):
+                    yield data.get("fields") or [], items[start:start + batch_size]
+                return
+        
+        async for batch in self._stream_rows(api_name, params, fields, batch_size):
+            yield batch
     
-    async def get_weekly(self, params: Dict[str, Any], fields: Optional[str] = None) -> TushareResponse:
-        """Get weekly stock prices"""
-        return await self._make_request("weekly", params, fields)
+    async def _stream_rows(self, api_name: str, params: Dict[str, Any], fields: Optional[str], batch_size: int) -> AsyncIterator[Batch]:
+        """Stream batches from upstream
+        
+        Until the first batch is parsed the request goes through the retrier,
+        circuit breaker and token pool like any other call, so Tushare errors,
+        which arrive ahead of the rows, fail over and retry. A failure after
+        that is raised to the caller, since rows have already been handed out.
+        """
+        request_data = TushareRequest(api_name=api_name, token=self.token, params=params, fields=fields)
+        
+        async def send() -> Tuple[Batch, AsyncGenerator[Batch, None]]:
+            if self.token_pool is not None:
+                return await self.token_pool.call(
+                    api_name, lambda token: self._open_stream(request_data.model_copy(update={"token": token}), batch_size)
+                )
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(api_name)
+            return await self._open_stream(request_data, batch_size)
+        
+        first, batches = await (self.retrier.call(api_name, send) if self.retrier is not None else send())
+        try:
+            yield first
+            async for batch in batches:
+                yield batch
+        finally:
+            await batches.aclose()
+    
+    async def _open_stream(self, request_data: TushareRequest, batch_size: int) -> Tuple[Batch, AsyncGenerator[Batch, None]]:
+        """Start streaming a request and read up to its first batch, so errors in the header surface here"""
+        batches = self._stream_batches(request_data, batch_size)
+        try:
+            first = await batches.__anext__()
+        except BaseException:
+            await batches.aclose()
+            raise
+        return first, batches
+    
+    async def _stream_batches(self, request_data: TushareRequest, batch_size: int) -> AsyncGenerator[Batch, None]:
+        """(fields, rows) batches of one streamed response; always yields at least once"""
+        parser = ResponseStreamParser()
+        batch: List[List[Any]] = []
+        yielded = False
+        async for chunk in self.transport.stream(self.base_url, request_data.model_dump()):
+            batch.extend(parser.feed(chunk))
+            self._check_stream_code(parser)
+            while len(batch) >= batch_size:
+                yield parser.fields or [], batch[:batch_size]
+                yielded = True
+                batch = batch[batch_size:]
+        batch.extend(parser.close())
+        
+        self._check_stream_code(parser, final=True)
+        if batch or not yielded:
+            yield parser.fields or [], batch
+    
+    def _check_stream_code(self, parser: ResponseStreamParser, final: bool = False):
+        """Raise on an error code; mid-body only once its msg is parsed, which failover and retry classify"""
+        if parser.code is not None and parser.code != 0 and (final or parser.msg is not None or parser.has_data):
+            logger.error(f"Tushare API error: {parser.msg} (code: {parser.code})")
+            raise TushareAPIError(parser.code, parser.msg)
+    
+    async def fetch_columnar(self, api_name: str, params: Dict[str, Any], fields: Optional[str] = None) -> ColumnarData:
+        """Stream a response straight into a columnar table, sharing identical in-flight calls"""
+        if self.singleflight is None:
+            return await self._fetch_columnar(api_name, params, fields)
+        
+        key = make_cache_key(api_name, params, fields) + ":columnar"
+        return await self.singleflight.do(key, lambda: self._fetch_columnar(api_name, params, fields))
+    
+    async def _fetch_columnar(self, api_name: str, params: Dict[str, Any], fields: Optional[str]) -> ColumnarData:
+        if not self.token and self.transport.needs_token:
+            raise ValueError("Tushare token is required")
+        if self.cache is not None:
+            cached = await self.cache.get(api_name, params, fields)
+            if cached is not None:
+                logger.debug(f"Cache hit for {api_name}")
+                return ColumnarData.from_dict(cached.get("data") or {})
+        
+        builder: Optional[ColumnarBuilder] = None
+        async for batch_fields, rows in self._stream_rows(api_name, params, fields, settings.stream_batch_size):
+            if builder is None:
+                builder = ColumnarBuilder(batch_fields)
+            builder.append_rows(rows)
+        table = builder.build() if builder is not None else ColumnarData([], {})
+        # Unlike iter_rows the whole table is in memory anyway, so it is cached like a regular response
+        if self.cache is not None:
+            await self.cache.set(api_name, params, fields, {"code": 0, "msg": "", "data": table.to_dict()})
+        return table
     
-    async def get_monthly(self, params: Dict[str, Any], fields: Optional[str] = None) -> TushareResponse:
-        """Get monthly stock prices"""
-        return await self._make_request("monthly", params, fields)
+    async def get_calendar(self) -> Optional[TradeCalendar]:
+        """Return the exchange trade calendar, loading it from trade_cal once per day
+        
+        Returns None when the calendar is disabled or cannot be loaded (for example
+        without enough Tushare points); callers then fall back to weekday rules.
+        """
+        if not settings.calendar_enabled:
+            return None
+        today = today_cst()
+        if self._calendar is not None and self._calendar_loaded_on == today:
+            return self._calendar
+        if time.monotonic() < self._calendar_retry_at:
+            return self._calendar
+        
+        async with self._calendar_lock:
+            if self._calendar is not None and self._calendar_loaded_on == today:
+                return self._calendar
+            try:
+                end_date = f"{datetime.now().year + 1}1231"
+                response = await self.get_trade_cal(
+                    {"exchange": settings.calendar_exchange, "start_date": EARLIEST_DATE, "end_date": end_date},
+                    "cal_date,is_open",
+                )
+                self._calendar = TradeCalendar.from_response(response.data, settings.calendar_exchange)
+                self._calendar_loaded_on = today
+                logger.info(f"Loaded {settings.calendar_exchange} trade calendar with {len(self._calendar)} days")
+            except Exception as e:
+                logger.warning(f"Trade calendar unavailable, using weekday rules: {e}")
+                self._calendar_retry_at = time.monotonic() + 3600
+        return self._calendar
     
-    async def get_index_daily(self, params: Dict[str, Any], fields: Optional[str] = None) -> TushareResponse:
-        """Get index daily prices and trading data"""
-        return await self._make_request("index_daily", params, fields)
+    def _has_trading_days(self, params: Dict[str, Any], calendar: TradeCalendar) -> bool:
+        """False when the requested date or range contains no trading day"""
+        trade_date = params.get("trade_date")
+        if trade_date:
+            return calendar.is_open(trade_date)
+        start = params.get("start_date")
+        end = params.get("end_date")
+        if start and end:
+            return calendar.count(start, end) > 0
+        return True
     
-    async def get_index_weekly(self, params: Dict[str, Any], fields: Optional[str] = None) -> TushareResponse:
-        """Get index weekly prices and trading data"""
-        return await self._make_request("index_weekly", params, fields)
+    async def _plan_request(self, api_name: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Params of each chunk to fetch; empty when the requested dates contain no trading day"""
+        calendar = await self.get_calendar()
+        if calendar is not None:
+            params = snap_period_date(api_name, params, calendar)
+            if not self._has_trading_days(params, calendar):
+                logger.info(f"Skipping {api_name} request with no trading days: {params}")
+                return []
+        return plan_chunks(api_name, params, calendar or WEEKDAYS) if settings.chunking_enabled else [params]
     
-    async def get_index_monthly(self, params: Dict[str, Any], fields: Optional[str] = None) -> TushareResponse:
-        """Get index monthly prices and trading data"""
-        return await self._make_request("index_monthly", params, fields)
+    async def _make_chunked_request(self, api_name: str, params: Dict[str, Any], fields: Optional[str] = None, use_cache: bool = True) -> TushareResponse:
+        """Split requests that exceed the endpoint row cap and merge the results"""
+        chunks = await self._plan_request(api_name, params)
+        if not chunks:
+            return TushareResponse(code=0, msg="", data={"fields": [], "items": [], "has_more": False})
+        if len(chunks) == 1:
+            return await self._make_request(api_name, chunks[0], fields, use_cache)
+        
+        logger.info(f"Splitting {api_name} request into {len(chunks)} chunks")
+        semaphore = asyncio.Semaphore(settings.chunk_concurrency)
+        # Projected requests still fetch ts_code/trade_date, which the merge dedups and orders on
+        chunk_fields = with_merge_keys(fields)
+        
+        async def fetch(chunk: Dict[str, Any]) -> TushareResponse:
+            async with semaphore:
+                return await self._make_request(api_name, chunk, chunk_fields, use_cache)
+        
+        responses = await asyncio.gather(*(fetch(chunk) for chunk in chunks))
+        merged = merge_responses(responses, split_codes(params.get("ts_code")))
+        return project_response(merged, fields) if chunk_fields != fields else merged
     
-    async def get_index_dailybasic(self, params: Dict[str, Any], fields: Optional[str] = None) -> TushareResponse:
-        """Get index daily basic indicators"""
-        return await self._make_request("index_dailybasic", params, fields)
+    async def query(self, name: str, params: Dict[str, Any], fields: Optional[str] = None, use_cache: bool = True) -> TushareResponse:
+        """Call a registered endpoint by tool name; use_cache=False skips the response cache for this call"""
+        endpoint = ENDPOINTS.get(name)
+        if endpoint is None:
+            raise ValueError(f"Unknown endpoint: {name}")
+        if endpoint.chunked:
+            return await self._make_chunked_request(endpoint.api_name, params, fields, use_cache)
+        return await self._make_request(endpoint.api_name, params, fields, use_cache)
+    
+    async def query_columnar(self, name: str, params: Dict[str, Any], fields: Optional[str] = None) -> ColumnarData:
+        """Call a registered endpoint by tool name and stream the response into a columnar table
+        
+        Meant for large cross-sections: rows go from the socket into column
+        buffers without an intermediate row list. Requests that need several
+        chunks are fetched and merged as usual, then converted.
+        """
+        endpoint = ENDPOINTS.get(name)
+        if endpoint is None:
+            raise ValueError(f"Unknown endpoint: {name}")
+        chunks = await self._plan_request(endpoint.api_name, params) if endpoint.chunked else [params]
+        if not chunks:
+            return ColumnarData([], {})
+        if len(chunks) == 1:
+            return await self.fetch_columnar(endpoint.api_name, chunks[0], fields)
+        response = await self._make_chunked_request(endpoint.api_name, params, fields)
+        return ColumnarData.from_dict(response.data or {})
     
-    async def get_index_weight(self, params: Dict[str, Any], fields: Optional[str] = None) -> TushareResponse:
-        """Get index component weights"""
-        return await self._make_request("index_weight", params, fields)
\ No newline at end of file
+    def __getattr__(self, attr: str):
+        """Expose every registered endpoint as get_<name>(params, fields)"""
+        if attr.startswith("get_") and attr[4:] in ENDPOINTS:
+            return functools.partial(self.query, attr[4:])
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {attr!r}")
\ No newline at end of file
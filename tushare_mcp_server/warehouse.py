@@ -0,0 +1,414 @@
+import argparse
+import asyncio
+import logging
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from .cache import CST
+from .chunking import CHUNK_POLICIES, WEEKDAYS, iter_dates, merge_responses, split_codes
+from .models import TushareResponse
+from .resample import PERIOD_FIELDS, RESAMPLE_APIS, RESAMPLE_SOURCE, resample_bars
+from .trade_calendar import PERIOD_APIS, snap_period_date
+
+logger = logging.getLogger(__name__)
+
+# Default output columns shared by the stock and index bar endpoints
+BAR_FIELDS = ["ts_code", "trade_date", "open", "high", "low", "close", "pre_close", "change", "pct_chg", "vol", "amount"]
+
+# Market-wide endpoints are synced one trade_date cross-section at a time,
+# index endpoints one ts_code at a time
+WAREHOUSE_APIS = {
+    "daily": "market",
+    "weekly": "market",
+    "monthly": "market",
+    "index_daily": "code",
+    "index_weekly": "code",
+    "index_monthly": "code",
+}
+
+MARKET_SCOPE = "*"
+
+
+def last_closed_date(now: Optional[datetime] = None) -> str:
+    """Latest date whose bars are final; Tushare loads daily data between 15:00 and 16:00 CST"""
+    now = now or datetime.now(CST)
+    if now.hour < 17:
+        now -= timedelta(days=1)
+    return now.strftime("%Y%m%d")
+
+
+def _next_day(value: str) -> str:
+    return (datetime.strptime(value, "%Y%m%d") + timedelta(days=1)).strftime("%Y%m%d")
+
+
+def _previous_day(value: str) -> str:
+    return (datetime.strptime(value, "%Y%m%d") - timedelta(days=1)).strftime("%Y%m%d")
+
+
+def _endpoint(client, api_name: str):
+    """Bound TushareClient.get_<api_name> method"""
+    return getattr(client, f"get_{api_name}")
+
+
+class Warehouse:
+    """SQLite store of OHLCV bars with per-endpoint sync watermarks
+
+    Each endpoint has its own table keyed on (ts_code, trade_date). The
+    ``coverage`` table records the contiguous date range that has been fully
+    synced, either for the whole market (scope ``*``) or for one index code.
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.partial_hits = 0
+        self.resampled = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls, settings) -> "Warehouse":
+        return cls(settings.warehouse_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            columns = ", ".join(f'"{name}" {"TEXT" if name in ("ts_code", "trade_date") else "REAL"}' for name in BAR_FIELDS)
+            for api_name in WAREHOUSE_APIS:
+                self._conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {api_name} ({columns}, PRIMARY KEY (ts_code, trade_date))"
+                )
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{api_name}_date ON {api_name} (trade_date)")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS coverage (
+                    api_name TEXT NOT NULL,
+                    scope TEXT NOT NULL,
+                    start_date TEXT NOT NULL,
+                    end_date TEXT NOT NULL,
+                    PRIMARY KEY (api_name, scope)
+                )
+                """
+            )
+            self._conn.commit()
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # Storage
+
+    def store(self, api_name: str, data: Optional[Dict[str, Any]]) -> int:
+        """Upsert the rows of a fields/items payload and return the row count"""
+        data = data or {}
+        fields = data.get("fields") or []
+        items = data.get("items") or []
+        if not items:
+            return 0
+        positions = [fields.index(name) if name in fields else None for name in BAR_FIELDS]
+        rows = [tuple(row[i] if i is not None else None for i in positions) for row in items]
+        placeholders = ", ".join("?" for _ in BAR_FIELDS)
+        columns = ", ".join(f'"{name}"' for name in BAR_FIELDS)
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(f"INSERT OR REPLACE INTO {api_name} ({columns}) VALUES ({placeholders})", rows)
+            conn.commit()
+        return len(rows)
+
+    def coverage(self, api_name: str, scope: str) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT start_date, end_date FROM coverage WHERE api_name = ? AND scope = ?", (api_name, scope)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def extend_coverage(self, api_name: str, scope: str, start_date: str, end_date: str):
+        """Record that [start_date, end_date] is synced, merging with the existing range"""
+        current = self.coverage(api_name, scope)
+        if current is not None:
+            start_date = min(start_date, current[0])
+            end_date = max(end_date, current[1])
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO coverage (api_name, scope, start_date, end_date) VALUES (?, ?, ?, ?)",
+                (api_name, scope, start_date, end_date),
+            )
+            conn.commit()
+
+    def _select(self, api_name: str, codes: Sequence[str], start: str, end: str, fields: Sequence[str]) -> List[List[Any]]:
+        columns = ", ".join(f'"{name}"' for name in fields)
+        sql = f"SELECT {columns} FROM {api_name} WHERE trade_date BETWEEN ? AND ?"
+        args: List[Any] = [start, end]
+        if codes:
+            sql += f" AND ts_code IN ({', '.join('?' for _ in codes)})"
+            args.extend(codes)
+        sql += " ORDER BY ts_code, trade_date DESC"
+        with self._lock:
+            return [list(row) for row in self._connect().execute(sql, args).fetchall()]
+
+    # Serving
+
+    def _request_range(self, params: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        if params.get("trade_date"):
+            return params["trade_date"], params["trade_date"]
+        if params.get("start_date") and params.get("end_date"):
+            return params["start_date"], params["end_date"]
+        return None
+
+    def _covered(self, api_name: str, codes: Sequence[str], start: str, end: str) -> Optional[Tuple[str, str]]:
+        """Overlap of [start, end] with the synced range for every requested scope"""
+        if WAREHOUSE_APIS[api_name] == "market":
+            ranges = [self.coverage(api_name, MARKET_SCOPE)]
+        else:
+            if not codes:
+                return None
+            ranges = [self.coverage(api_name, code) for code in codes]
+        if any(r is None for r in ranges):
+            return None
+        lo = max([start] + [r[0] for r in ranges])
+        hi = min([end] + [r[1] for r in ranges])
+        return (lo, hi) if lo <= hi else None
+
+    def supports(self, api_name: str, params: Dict[str, Any], fields: Optional[str] = None) -> bool:
+        """True when a query can be answered at least partly from the warehouse"""
+        if api_name not in WAREHOUSE_APIS or self._request_range(params) is None:
+            return False
+        if fields and any(f.strip() not in BAR_FIELDS for f in fields.split(",")):
+            return False
+        start, end = self._request_range(params)
+        if api_name in RESAMPLE_APIS and self.coverage(RESAMPLE_SOURCE, MARKET_SCOPE):
+            return True
+        return self._covered(api_name, split_codes(params.get("ts_code")), start, end) is not None
+
+    async def get(self, api_name: str, params: Dict[str, Any], fields: Optional[str], client) -> TushareResponse:
+        """Answer a bar query from the warehouse, fetching uncovered dates from the API"""
+        if api_name in PERIOD_APIS and params.get("trade_date"):
+            # Snap to the period end as the API path does, or a mid-period date finds no bar
+            calendar = await client.get_calendar()
+            if calendar is None:
+                self.misses += 1
+                return await _endpoint(client, api_name)(params, fields)
+            params = snap_period_date(api_name, params, calendar)
+        codes = split_codes(params.get("ts_code"))
+        start, end = self._request_range(params)
+        default = PERIOD_FIELDS if api_name in RESAMPLE_APIS else BAR_FIELDS
+        output = [f.strip() for f in fields.split(",")] if fields else list(default)
+        loop = asyncio.get_running_loop()
+
+        covered = await loop.run_in_executor(None, self._covered, api_name, codes, start, end)
+        if covered != (start, end) and api_name in RESAMPLE_APIS:
+            resampled = await self._resample(api_name, codes, start, end, client)
+            if resampled is not None:
+                self.resampled += 1
+                return self._project(merge_responses([resampled], codes), output)
+
+        if covered is None:
+            self.misses += 1
+            return await _endpoint(client, api_name)(params, fields)
+
+        lo, hi = covered
+        local_fields = output + [name for name in ("ts_code", "trade_date") if name not in output]
+        items = await loop.run_in_executor(None, self._select, api_name, codes, lo, hi, local_fields)
+        responses = [TushareResponse(code=0, data={"fields": local_fields, "items": items})]
+
+        gaps = []
+        if start < lo:
+            gaps.append((start, _previous_day(lo)))
+        if hi < end:
+            gaps.append((_next_day(hi), end))
+        if gaps:
+            self.partial_hits += 1
+            # Explicit fields keep API rows in the same column order as local rows
+            fetch_fields = ",".join(local_fields)
+            for gap_start, gap_end in gaps:
+                gap_params = {k: v for k, v in params.items() if k != "trade_date"}
+                gap_params.update(start_date=gap_start, end_date=gap_end)
+                responses.append(await _endpoint(client, api_name)(gap_params, fetch_fields))
+        else:
+            self.local_hits += 1
+
+        return self._project(merge_responses(responses, codes), output)
+
+    def _project(self, response: TushareResponse, output: List[str]) -> TushareResponse:
+        """Reorder merged rows to the requested output columns"""
+        if response.data["fields"] != output:
+            index = {name: i for i, name in enumerate(response.data["fields"])}
+            positions = [index[name] for name in output]
+            response.data["items"] = [[row[i] for i in positions] for row in response.data["items"]]
+            response.data["fields"] = output
+        return response
+
+    async def _resample(self, api_name: str, codes: Sequence[str], start: str, end: str, client) -> Optional[TushareResponse]:
+        """Build weekly/monthly bars from stored daily bars when every needed period is synced"""
+        calendar = await client.get_calendar()
+        if calendar is None:
+            return None
+        period = RESAMPLE_APIS[api_name]
+        ends = {calendar.period_end(day, period) for day in calendar.trading_days(start, end)}
+        ends = sorted(e for e in ends if e is not None and e <= end)
+        if not ends:
+            return None
+
+        # The first period may begin before start, so its daily bars are needed too
+        need_start = calendar.period_start(ends[0], period)
+        need_end = ends[-1]
+        synced = self.coverage(RESAMPLE_SOURCE, MARKET_SCOPE)
+        if synced is None or synced[0] > need_start or synced[1] < need_end:
+            return None
+
+        loop = asyncio.get_running_loop()
+        items = await loop.run_in_executor(None, self._select, RESAMPLE_SOURCE, codes, need_start, need_end, BAR_FIELDS)
+        data = await loop.run_in_executor(
+            None, resample_bars, {"fields": BAR_FIELDS, "items": items}, calendar, period
+        )
+        logger.debug(f"Resampled {len(items)} daily bars into {len(data['items'])} {api_name} bars")
+        return TushareResponse(code=0, data=data)
+
+    # Sync
+
+    async def _fetch_all_pages(self, client, api_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Fetch a cross-section, paging with offset when the endpoint row cap is hit"""
+        cap = CHUNK_POLICIES[api_name].max_rows
+        fields: List[str] = []
+        items: List[List[Any]] = []
+        offset = 0
+        while True:
+            page_params = dict(params, offset=offset, limit=cap) if offset else dict(params)
+            response = await _endpoint(client, api_name)(page_params)
+            data = response.data or {}
+            fields = data.get("fields") or fields
+            page = data.get("items") or []
+            items.extend(page)
+            if len(page) < cap:
+                return {"fields": fields, "items": items}
+            offset += len(page)
+
+    def _sync_dates(self, api_name: str, calendar, start: str, end: str) -> List[str]:
+        if calendar is None:
+            if api_name in PERIOD_APIS:
+                logger.warning(f"Skipping {api_name} sync: trade calendar unavailable")
+                return []
+            return [d for d in iter_dates(start, end) if WEEKDAYS.is_open(d)]
+        days = calendar.trading_days(start, end)
+        period = PERIOD_APIS.get(api_name)
+        if period is None:
+            return days
+        ends = []
+        for day in days:
+            period_end = calendar.period_end(day, period)
+            if period_end == day:
+                ends.append(day)
+        return ends
+
+    async def sync(self, client, api_name: str, start_date: str, codes: Sequence[str] = (), concurrency: int = 4) -> int:
+        """Fetch bars for dates after the current watermark and return the number of rows stored"""
+        end_date = last_closed_date()
+        if WAREHOUSE_APIS[api_name] == "market":
+            return await self._sync_market(client, api_name, start_date, end_date, concurrency)
+
+        total = 0
+        for code in codes:
+            current = self.coverage(api_name, code)
+            first = _next_day(current[1]) if current else start_date
+            if first > end_date:
+                continue
+            response = await _endpoint(client, api_name)({"ts_code": code, "start_date": first, "end_date": end_date})
+            total += self.store(api_name, response.data)
+            self.extend_coverage(api_name, code, current[0] if current else first, end_date)
+            logger.info(f"Synced {api_name} {code} through {end_date}")
+        return total
+
+    async def _sync_market(self, client, api_name: str, start_date: str, end_date: str, concurrency: int) -> int:
+        current = self.coverage(api_name, MARKET_SCOPE)
+        first = _next_day(current[1]) if current else start_date
+        if first > end_date:
+            return 0
+
+        calendar = await client.get_calendar()
+        dates = self._sync_dates(api_name, calendar, first, end_date)
+        if not dates:
+            return 0
+        range_start = current[0] if current else first
+        total = 0
+        for i in range(0, len(dates), concurrency):
+            batch = dates[i:i + concurrency]
+            results = await asyncio.gather(
+                *(self._fetch_all_pages(client, api_name, {"trade_date": day}) for day in batch)
+            )
+            for data in results:
+                total += self.store(api_name, data)
+            # Advance the watermark only after every date in the batch is stored
+            self.extend_coverage(api_name, MARKET_SCOPE, range_start, batch[-1])
+            logger.info(f"Synced {api_name} through {batch[-1]} ({total} rows)")
+        return total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            conn = self._connect()
+            coverage = conn.execute("SELECT api_name, scope, start_date, end_date FROM coverage").fetchall()
+            rows = {api: conn.execute(f"SELECT COUNT(*) FROM {api}").fetchone()[0] for api in WAREHOUSE_APIS}
+        return {
+            "rows": rows,
+            "coverage": [{"api_name": a, "scope": s, "start_date": lo, "end_date": hi} for a, s, lo, hi in coverage],
+            "local_hits": self.local_hits,
+            "partial_hits": self.partial_hits,
+            "resampled": self.resampled,
+            "misses": self.misses,
+        }
+
+
+async def run_sync(apis: Sequence[str], start_date: str, index_codes: Sequence[str]) -> Dict[str, int]:
+    """Sync the given endpoints into the configured warehouse"""
+    from .config import settings
+    from .tushare_client import TushareClient
+
+    warehouse = Warehouse.from_settings(settings)
+    results = {}
+    async with TushareClient() as client:
+        for api_name in apis:
+            results[api_name] = await warehouse.sync(
+                client, api_name, start_date, index_codes, settings.warehouse_sync_concurrency
+            )
+    warehouse.close()
+    return results
+
+
+def main():
+    """Command line entry point: python -m tushare_mcp_server.warehouse sync"""
+    from .config import settings
+
+    parser = argparse.ArgumentParser(description="Sync Tushare OHLCV bars into the local warehouse")
+    parser.add_argument("command", choices=["sync", "stats"])
+    parser.add_argument("--apis", default=",".join(WAREHOUSE_APIS), help="Comma-separated endpoints to sync")
+    parser.add_argument("--start-date", default=settings.warehouse_start_date, help="First date for an empty warehouse")
+    parser.add_argument("--index-codes", default=settings.warehouse_index_codes, help="Index codes for index_* endpoints")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if settings.debug else logging.INFO)
+    if args.command == "stats":
+        print(Warehouse.from_settings(settings).stats())
+        return 0
+
+    if not settings.tushare_token and not settings.tushare_tokens and settings.fixture_mode != "replay":
+        print("Error: TUSHARE_TOKEN (or TUSHARE_TOKENS) environment variable is required")
+        return 1
+    apis = [api for api in split_codes(args.apis) if api in WAREHOUSE_APIS]
+    results = asyncio.run(run_sync(apis, args.start_date, split_codes(args.index_codes)))
+    for api_name, rows in results.items():
+        print(f"✅ {api_name}: {rows} rows synced")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())